@@ -0,0 +1,182 @@
+import asyncio
+import os
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Hashable, Optional, Tuple
+
+from .socket import sio
+from .metrics import metrics
+
+BROADCAST_MODE = os.getenv("BROADCAST_MODE", "batched")  # "batched" or "immediate" (one emit per event)
+BROADCAST_WINDOW_MS = float(os.getenv("BROADCAST_WINDOW_MS", "50"))
+BROADCAST_MAX_PENDING = int(os.getenv("BROADCAST_MAX_PENDING", "10000"))
+BROADCAST_MAX_ENTITIES = int(os.getenv("BROADCAST_MAX_ENTITIES", "100000"))  # Last-sent states kept for diffing, across rooms
+
+BATCH_EVENT = "batch"
+
+SOCKETIO_FRAMES = metrics.counter("socketio_frames", "Socket.IO emits (one per batch frame in batched mode).")
+SOCKETIO_EVENTS = metrics.counter("socketio_events", "Events delivered to Socket.IO, after coalescing.")
+SOCKETIO_DROPPED = metrics.counter("socketio_dropped_events", "Un-keyed events dropped because the buffer was full.")
+
+
+class Broadcaster:
+    """
+    Outbound Socket.IO event pipeline.
+
+    In batched mode `emit` only buffers the event and returns, so a slow client never
+    stalls a Blackboard mutation. Events that carry a `key` (one entity, e.g. ("task", id))
+    are coalesced: repeated updates inside a window keep one slot holding the latest state,
+    and `*_updated` entity events are sent as diffs (changed fields + id) against what was
+    last sent. Every window the buffer is flushed as a single `batch` frame per room:
+    [[event, data], ...]. An un-keyed event carrying a list of entities (e.g.
+    `tasks_updated`) names their kind as `entity`, so each item counts as last sent too.
+
+    Only one flush is in flight at a time; while it is, new events keep coalescing.
+    Un-keyed events (logs, notifications) are capped at `max_pending` per room, dropping
+    the oldest, so a flood in one project's room never costs another room its events;
+    drops are counted and logged per room. The last-sent states kept for diffing are an
+    LRU of `max_entities`: an entity evicted from it is simply sent in full next time.
+    """
+
+    def __init__(self, server, batched: bool = True, window_ms: float = 50, max_pending: int = 10000,
+                 max_entities: int = 100000):
+        self.server = server
+        self.batched = batched
+        self.window = window_ms / 1000
+        self.max_pending = max_pending
+        self.max_entities = max_entities
+        self.frames_sent = 0
+        self.events_sent = 0
+        self.dropped = 0
+
+        self._pending: Dict[Optional[str], "OrderedDict[Hashable, Tuple[str, Any, Optional[str]]]"] = {}
+        self._unkeyed: Dict[Optional[str], Deque[int]] = {}  # room -> seqs of its un-keyed events, oldest first
+        self._last_sent: "OrderedDict[Tuple[Optional[str], Hashable], dict]" = OrderedDict()  # Least recently sent first
+        self._dropped: Dict[Optional[str], int] = {}  # room -> un-keyed events dropped since the last flush
+        self._seq = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+
+    async def emit(self, event: str, payload: Any, key: Optional[Hashable] = None, room: Optional[str] = None,
+                   entity: Optional[str] = None):
+        """
+        `payload` may be a dict, a Pydantic model or a list of them; models are dumped at flush
+        time. `entity` ("task", "agent") marks an un-keyed list of such entities, each keyed (entity, id).
+        """
+        if not self.batched:
+            self.events_sent += 1
+            SOCKETIO_FRAMES.inc()
+            SOCKETIO_EVENTS.inc()
+            await self.server.emit(event, _dump(payload), room=room)
+            return
+        self.publish(event, payload, key=key, room=room, entity=entity)
+
+    def publish(self, event: str, payload: Any, key: Optional[Hashable] = None, room: Optional[str] = None,
+                entity: Optional[str] = None):
+        events = self._pending.setdefault(room, OrderedDict())
+
+        if key is None:
+            self._seq += 1
+            events[self._seq] = (event, payload, entity)
+            unkeyed = self._unkeyed.setdefault(room, deque())
+            unkeyed.append(self._seq)
+            if len(unkeyed) > self.max_pending:
+                events.pop(unkeyed.popleft(), None)
+                self.dropped += 1
+                self._dropped[room] = self._dropped.get(room, 0) + 1
+                SOCKETIO_DROPPED.inc()
+        else:
+            previous = events.get(key)
+            # An entity added and updated in the same window is still announced as added
+            if previous and previous[0].endswith("_added"):
+                event = previous[0]
+            events[key] = (event, payload, None)
+
+        self._ensure_flusher()
+        self._wakeup.set()
+
+    async def flush(self):
+        pending, self._pending = self._pending, {}
+        self._unkeyed.clear()
+        if self._dropped:
+            for room, count in self._dropped.items():
+                print(f"⚠️ Broadcast buffer full: dropped {count} un-keyed events for room {room}")
+            self._dropped.clear()
+
+        for room, events in pending.items():
+            frame = []
+            for key, (event, payload, entity) in events.items():
+                data = self._encode(room, key, event, payload, entity)
+                if data is not None:
+                    frame.append([event, data])
+            if frame:
+                self.frames_sent += 1
+                self.events_sent += len(frame)
+                SOCKETIO_FRAMES.inc()
+                SOCKETIO_EVENTS.inc(amount=len(frame))
+                await self.server.emit(BATCH_EVENT, frame, room=room)
+
+    async def stop(self):
+        if self._flusher:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+
+    def _encode(self, room: Optional[str], key: Hashable, event: str, payload: Any, entity: Optional[str] = None) -> Optional[dict]:
+        data = _dump(payload)
+        if isinstance(key, int):
+            if entity:
+                # Later `*_updated` diffs for these entities must start from what this event carried
+                for item in data:
+                    self._remember((room, (entity, item["id"])), item)
+            return data
+
+        previous = self._last_sent.get((room, key))
+        self._remember((room, key), data)
+        if previous is None or not event.endswith("_updated") or "id" not in data:
+            return data
+
+        diff = {k: v for k, v in data.items() if previous.get(k) != v}
+        if not diff:
+            return None
+        diff["id"] = data["id"]
+        return diff
+
+    def _remember(self, entry: Tuple[Optional[str], Hashable], data: dict):
+        last_sent = self._last_sent
+        last_sent[entry] = data
+        last_sent.move_to_end(entry)
+        if len(last_sent) > self.max_entities:
+            last_sent.popitem(last=False)
+
+    def _ensure_flusher(self):
+        if self._flusher is None or self._flusher.done():
+            self._wakeup = asyncio.Event()
+            self._flusher = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.window)
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"❌ Broadcast flush error: {e}")
+
+
+def _dump(payload: Any):
+    if isinstance(payload, list):
+        return [_dump(item) for item in payload]
+    if hasattr(payload, "to_dict"):
+        return payload.to_dict()  # Blackboard records cache this per version
+    return payload.model_dump() if hasattr(payload, "model_dump") else payload
+
+
+# Singleton
+broadcaster = Broadcaster(
+    sio,
+    batched=BROADCAST_MODE != "immediate",
+    window_ms=BROADCAST_WINDOW_MS,
+    max_pending=BROADCAST_MAX_PENDING,
+    max_entities=BROADCAST_MAX_ENTITIES,
+)
@@ -0,0 +1,222 @@
+"""
+Minimal message broker for running several API workers against one shared state.
+
+A stand-in for Redis with just what the workers need: pub/sub channels (optionally
+retaining their history, so a worker that starts later can replay it) and atomic
+set-if-absent keys for claims. The protocol is JSON lines over TCP:
+
+    {"op": "sub", "channel": c, "replay": bool, "echo": bool, "rid": n}
+    {"op": "pub", "channel": c, "data": ..., "retain": bool}
+    {"op": "retain", "channel": c, "key": k or null, "data": ...}
+    {"op": "setnx", "key": k, "value": v, "rid": n}  -> {"op": "reply", "rid": n, "result": bool}
+    {"op": "del", "key": k}
+
+Subscribers receive {"op": "msg", "channel": c, "seq": n, "data": ...}, in one global
+order per channel. `retain` stores a message for replay only, without delivering it:
+with a key it replaces the one last retained under that key (keeping its place, so the
+history compacts to the latest state per entity), without one it joins the channel's
+un-keyed history, of which only the last `history_max` messages are kept (as for
+`pub` with `retain`). Replay sends the keyed messages first, then the un-keyed ones.
+
+Run it with:
+    python -m apps.api.app.core.broker --port 8765
+"""
+import argparse
+import asyncio
+import json
+import os
+from collections import deque
+from typing import Deque, Dict, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+BROKER_URL = os.getenv("BROKER_URL") or None  # e.g. tcp://127.0.0.1:8765; unset = single process
+BROKER_HISTORY_MAX = int(os.getenv("BROKER_HISTORY_MAX", "10000"))  # Un-keyed retained messages kept per channel
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+
+def parse_url(url: str) -> Tuple[str, int]:
+    parsed = urlparse(url)
+    return parsed.hostname or "127.0.0.1", parsed.port or 8765
+
+
+class Broker:
+    def __init__(self, history_max: int = 10000):
+        self.keys: Dict[str, str] = {}
+        self.history_max = history_max
+        self._seq: Dict[str, int] = {}
+        self._history: Dict[str, Deque[bytes]] = {}
+        self._state: Dict[str, Dict[str, bytes]] = {}  # channel -> key -> latest retained message
+        # channel -> {writer: echo}
+        self._subscribers: Dict[str, Dict[asyncio.StreamWriter, bool]] = {}
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8765) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self._handle, host, port, limit=2 ** 24)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        channels: Set[str] = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                op = message["op"]
+                if op == "pub":
+                    self._publish(writer, message["channel"], message["data"], message.get("retain", False))
+                elif op == "retain":
+                    self._retain(message["channel"], message.get("key"), message["data"])
+                elif op == "setnx":
+                    ok = message["key"] not in self.keys
+                    if ok:
+                        self.keys[message["key"]] = message["value"]
+                    writer.write(_line({"op": "reply", "rid": message["rid"], "result": ok}))
+                elif op == "del":
+                    self.keys.pop(message["key"], None)
+                elif op == "sub":
+                    channel = message["channel"]
+                    if message.get("replay"):
+                        writer.writelines(self._state.get(channel, {}).values())
+                        writer.writelines(self._history.get(channel, ()))
+                    self._subscribers.setdefault(channel, {})[writer] = message.get("echo", True)
+                    channels.add(channel)
+                    writer.write(_line({"op": "reply", "rid": message["rid"], "result": self._seq.get(channel, 0)}))
+                if writer.transport.get_write_buffer_size() > 2 ** 20:
+                    await writer.drain()
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            for channel in channels:
+                self._subscribers.get(channel, {}).pop(writer, None)
+            writer.close()
+
+    def _publish(self, origin: asyncio.StreamWriter, channel: str, data, retain: bool):
+        seq = self._seq[channel] = self._seq.get(channel, 0) + 1
+        line = _line({"op": "msg", "channel": channel, "seq": seq, "data": data})
+        if retain:
+            self._keep(channel, line)
+        for writer, echo in self._subscribers.get(channel, {}).items():
+            if echo or writer is not origin:
+                writer.write(line)
+
+
+    def _retain(self, channel: str, key: Optional[str], data):
+        line = _line({"op": "msg", "channel": channel, "seq": self._seq.get(channel, 0), "data": data})
+        if key is None:
+            self._keep(channel, line)
+        else:
+            self._state.setdefault(channel, {})[key] = line
+
+    def _keep(self, channel: str, line: bytes):
+        history = self._history.get(channel)
+        if history is None:
+            history = self._history[channel] = deque(maxlen=self.history_max)
+        history.append(line)
+
+
+class BrokerClient:
+    """Asyncio client for `Broker`. One TCP connection per client; replies are matched by rid."""
+
+    def __init__(self, url: str):
+        self.host, self.port = parse_url(url)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._replies: Dict[int, asyncio.Future] = {}
+        self._rid = 0
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connect_lock = asyncio.Lock()
+
+    async def connect(self):
+        async with self._connect_lock:
+            if self._writer:
+                return
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port, limit=2 ** 24)
+            self._reader_task = asyncio.create_task(self._read())
+
+    async def close(self):
+        if self._reader_task:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None
+
+    def publish(self, channel: str, data, retain: bool = False):
+        """Buffered and never awaited, so it can be called from synchronous listeners."""
+        self._writer.write(_line({"op": "pub", "channel": channel, "data": data, "retain": retain}))
+
+    def retain(self, channel: str, data, key: Optional[str] = None):
+        """Stores `data` for replay without delivering it; see the module docstring. Buffered, like `publish`."""
+        self._writer.write(_line({"op": "retain", "channel": channel, "key": key, "data": data}))
+
+    async def subscribe(self, channel: str, replay: bool = False, echo: bool = True) -> asyncio.Queue:
+        """
+        Returns a queue of message payloads. With `replay`, the retained history is
+        already queued by the time this returns.
+        """
+        queue = self._queues.setdefault(channel, asyncio.Queue())
+        await self._request({"op": "sub", "channel": channel, "replay": replay, "echo": echo})
+        return queue
+
+    async def setnx(self, key: str, value: str) -> bool:
+        return await self._request({"op": "setnx", "key": key, "value": value})
+
+    def delete(self, key: str):
+        self._writer.write(_line({"op": "del", "key": key}))
+
+    async def _request(self, message: dict):
+        if not self._writer:
+            raise ConnectionError("Not connected to the broker")
+        self._rid += 1
+        future = asyncio.get_running_loop().create_future()
+        self._replies[self._rid] = future
+        self._writer.write(_line({**message, "rid": self._rid}))
+        return await future
+
+    async def _read(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                if message["op"] == "msg":
+                    queue = self._queues.get(message["channel"])
+                    if queue:
+                        queue.put_nowait(message["data"])
+                elif message["op"] == "reply":
+                    future = self._replies.pop(message["rid"], None)
+                    if future and not future.done():
+                        future.set_result(message["result"])
+        finally:
+            error = ConnectionError("Broker connection lost")
+            for future in self._replies.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._replies.clear()
+            self._writer = None
+
+
+def _line(message: dict) -> bytes:
+    return (_encode(message) + "\n").encode()
+
+
+async def _main(host: str, port: int, history_max: int):
+    server = await Broker(history_max).serve(host, port)
+    print(f"📡 Broker listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pub/sub + claim broker for multi-worker deployments")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--history", type=int, default=BROKER_HISTORY_MAX, help="Un-keyed retained messages kept per channel")
+    args = parser.parse_args()
+    asyncio.run(_main(args.host, args.port, args.history))
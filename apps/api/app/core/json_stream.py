@@ -0,0 +1,48 @@
+import json
+from typing import List
+
+
+class JsonArrayStream:
+    """
+    Incrementally extracts the top-level objects of a JSON array as text arrives,
+    e.g. `[{"id": 1}, {"id": 2}]` fed in arbitrary chunks yields each object as soon
+    as its closing brace is seen. Anything outside the objects (commas, whitespace,
+    the closing bracket, leading prose) is skipped.
+    """
+
+    def __init__(self):
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._current: List[str] = []
+
+    def feed(self, chunk: str) -> List[dict]:
+        completed = []
+        for ch in chunk:
+            if not self._started:
+                self._started = ch == "["
+                continue
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._current = ["{"]
+                continue
+
+            self._current.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.append(json.loads("".join(self._current)))
+        return completed
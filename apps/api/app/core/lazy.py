@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Lazy(Generic[T]):
+    """
+    A component built on first use instead of at import.
+
+    `factory` typically imports a heavy SDK (google.generativeai, mcp) and constructs
+    the client, which takes hundreds of milliseconds of mostly import-time CPU. `get`
+    builds it in the calling thread; `warm` starts the build in a worker thread so the
+    event loop keeps serving while it runs, and `aget` waits for that build. The
+    factory runs at most once at a time; after a failure the next call tries again.
+
+    `state` (idle, loading, ready, failed), `seconds` and `error` are reported by /health.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        self.name = name
+        self.factory = factory
+        self.state = "idle"
+        self.seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self._value: Optional[T] = None
+        self._lock = threading.Lock()
+        self._warming: Optional[asyncio.Future] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def get(self) -> T:
+        if self.state == "ready":
+            return self._value
+        with self._lock:
+            if self.state != "ready":
+                self.state = "loading"
+                started = time.perf_counter()
+                try:
+                    self._value = self.factory()
+                except Exception as e:
+                    self.state, self.error = "failed", f"{type(e).__name__}: {e}"
+                    raise
+                self.seconds = time.perf_counter() - started
+                self.state, self.error = "ready", None
+        return self._value
+
+    def warm(self) -> asyncio.Future:
+        """Starts building in a worker thread (once) and returns the future to await."""
+        if self._warming is None or (self._warming.done() and self.state == "failed"):
+            self._warming = asyncio.ensure_future(asyncio.to_thread(self.get))
+            # Failures are reported through `state`; don't log them as never retrieved
+            self._warming.add_done_callback(lambda f: f.cancelled() or f.exception())
+        return self._warming
+
+    async def aget(self) -> T:
+        if self.state == "ready":
+            return self._value
+        return await asyncio.shield(self.warm())
+
+    def status(self) -> dict:
+        return {"state": self.state, "seconds": None if self.seconds is None else round(self.seconds, 3), "error": self.error}
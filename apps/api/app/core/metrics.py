@@ -0,0 +1,304 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+LOOP_LAG_INTERVAL_MS = float(os.getenv("LOOP_LAG_INTERVAL_MS", "500"))
+LOOP_STALL_MS = float(os.getenv("LOOP_STALL_MS", "0"))  # Sample the stack of a loop blocked this long; 0 disables
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "0"))  # Log HTTP requests slower than this; 0 disables
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+DURATION_BUCKETS = (0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+
+Labels = Tuple[str, ...]
+
+
+class Metric:
+    """
+    Base for counters, gauges and histograms keyed by a tuple of label values.
+
+    Everything is updated from the event loop thread only, so there are no locks: an
+    update is a dict lookup plus an add. Label values are positional, in `labelnames` order.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> List[Tuple[str, Labels, float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        # Unlabelled counters exist (at 0) before their first increment
+        self._values: Dict[Labels, float] = {} if self.labelnames else {(): 0.0}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self):
+        return [("_total", labels, value) for labels, value in self._values.items()]
+
+
+class Gauge(Metric):
+    """Set explicitly, or computed at scrape time by `fn() -> {labels: value}` (free to keep current)."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), fn: Optional[Callable[[], Dict[Labels, float]]] = None):
+        super().__init__(name, help, labelnames)
+        self.fn = fn
+        self._values: Dict[Labels, float] = {}
+
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self):
+        values = self.fn() if self.fn else self._values
+        return [("", labels, value) for labels, value in values.items()]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket (+Inf last), sum]
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return sum(series[0]) if series else 0
+
+    def quantile(self, q: float, *labels: str) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th observation (None without observations)."""
+        series = self._series.get(labels)
+        total = sum(series[0]) if series else 0
+        if not total:
+            return None
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), series[0]):
+            seen += count
+            if seen >= q * total:
+                return bound
+        return float("inf")
+
+    def samples(self):
+        out = []
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                out.append(("_bucket", labels + (_format_value(bound),), cumulative))
+            out.append(("_sum", labels, total[0]))
+            out.append(("_count", labels, cumulative))
+        return out
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for suffix, labels, value in self.samples():
+            names = self.labelnames + ("le",) if suffix == "_bucket" else self.labelnames
+            lines.append(f"{self.name}{suffix}{_format_labels(names, labels)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics rendered together in the Prometheus text exposition format."""
+
+    def __init__(self, prefix: str = "antigravity_"):
+        self.prefix = prefix
+        self._metrics: Dict[str, Metric] = {}
+
+    def _register(self, cls, name: str, *args, **kwargs):
+        name = self.prefix + name
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, *args, **kwargs)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help, labelnames)
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = (), fn=None) -> Gauge:
+        return self._register(Gauge, name, help, labelnames, fn=fn)
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram, name, help, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(self.prefix + name)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                print(f"❌ Metric {metric.name} failed to render: {e}")
+        return "\n".join(lines) + "\n"
+
+
+class LoopMonitor:
+    """
+    Measures event-loop lag: a coroutine asks to wake up every `interval` and records
+    how late it actually ran.
+
+    With `stall_ms` set, a watchdog thread also samples the loop thread's stack whenever
+    the loop has not ticked for that long, i.e. some handler is blocking it. Samples are
+    counted per innermost application frame and the latest ones kept for /api/v1/metrics/stalls.
+    """
+
+    def __init__(self, registry: MetricsRegistry, interval_ms: float = 500, stall_ms: float = 0, max_locations: int = 50):
+        self.stall = stall_ms / 1000
+        # Ticks often enough to notice a stall shortly after it passes `stall`
+        self.interval = min(interval_ms / 1000, self.stall / 2) if self.stall > 0 else interval_ms / 1000
+        self.max_locations = max_locations
+        self.lag = registry.histogram("event_loop_lag_seconds", "How late the event loop ran a scheduled wake-up.")
+        self.stalls = registry.counter("event_loop_stall_samples", "Stack samples taken while the event loop was blocked.", ["location"])
+        self.recent: List[dict] = []
+
+        self._ticked = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._loop_thread: Optional[int] = None
+
+    def start(self):
+        if self._task:
+            return
+        self._loop_thread = threading.get_ident()
+        self._ticked = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+        if self.stall > 0:
+            self._stopped.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self._ticked = now = time.monotonic()
+            self.lag.observe(max(0.0, now - expected))
+
+    def _watch(self):
+        sampled_tick = None
+        while not self._stopped.wait(self.stall / 2):
+            ticked = self._ticked
+            blocked = time.monotonic() - ticked
+            # One sample per stall, taken once it has lasted `stall`
+            if blocked < self.stall + self.interval or ticked == sampled_tick:
+                continue
+            sampled_tick = ticked
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                self._record(frame, blocked - self.interval)
+
+    def _record(self, frame, blocked: float):
+        stack = traceback.extract_stack(frame)
+        # Innermost frame from our code, falling back to the innermost one
+        app_frames = [f for f in stack if "/apps/" in f.filename.replace("\\", "/")]
+        where = (app_frames or stack)[-1]
+        location = f"{os.path.basename(where.filename)}:{where.lineno} {where.name}"
+        if (location,) in self.stalls._values or len(self.stalls._values) < self.max_locations:
+            self.stalls.inc(location)
+        self.recent = (self.recent + [{"at": time.time(), "blocked_ms": round(blocked * 1000, 1), "location": location,
+                                       "stack": traceback.format_list(stack[-8:])}])[-20:]
+        print(f"⚠️ Event loop blocked for at least {blocked * 1000:.0f} ms at {location}")
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing HTTP requests per route template (not raw path, which would
+    make one series per task id). Requests slower than `slow_ms` are logged, except on
+    routes in `long_lived` (SSE, long-polls), which are slow by design.
+    """
+
+    def __init__(self, app, registry: Optional[MetricsRegistry] = None, slow_ms: float = 0, long_lived: Sequence[str] = ()):
+        self.app = app
+        self.slow = slow_ms / 1000
+        self.long_lived = set(long_lived)
+        self.seconds = (registry or metrics).histogram("http_request_seconds", "HTTP request latency, by method, route and status.", ["method", "route", "status"])
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = getattr(scope.get("route"), "path", "unmatched")
+            self.seconds.observe(elapsed, scope["method"], route, str(status[0]))
+            if self.slow and elapsed >= self.slow and route not in self.long_lived:
+                print(f"⚠️ Slow request: {scope['method']} {scope['path']} took {elapsed * 1000:.0f} ms")
+
+
+def _format_labels(names: Sequence[str], values: Labels) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+# Singleton
+metrics = MetricsRegistry()
+loop_monitor = LoopMonitor(metrics, interval_ms=LOOP_LAG_INTERVAL_MS, stall_ms=LOOP_STALL_MS)
@@ -1,4 +1,35 @@
 import socketio
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+from .broker import BROKER_URL, BrokerClient
+
+
+class BrokerManager(AsyncPubSubManager):
+    """
+    Socket.IO client manager that fans emits out to every worker through the broker,
+    so a dashboard receives events no matter which worker it is connected to.
+    """
+
+    name = "broker"
+
+    def __init__(self, url: str, channel: str = "socketio"):
+        super().__init__(channel=channel)
+        self.client = BrokerClient(url)
+
+    async def _publish(self, data):
+        await self.client.connect()
+        self.client.publish(self.channel, data)
+
+    async def _listen(self):
+        await self.client.connect()
+        queue = await self.client.subscribe(self.channel)
+        while True:
+            yield await queue.get()
+
 
 # Global Socket.IO Server Instance
-sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
+sio = socketio.AsyncServer(
+    async_mode='asgi',
+    cors_allowed_origins='*',
+    client_manager=BrokerManager(BROKER_URL) if BROKER_URL else None,
+)
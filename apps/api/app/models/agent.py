@@ -13,3 +13,4 @@ class Agent(BaseModel):
     status: AgentStatus = AgentStatus.IDLE
     window_id: Optional[str] = None
     current_task_id: Optional[str] = None
+    capabilities: List[str] = []  # Roles it can take on besides its own
@@ -0,0 +1,144 @@
+import sys
+from typing import Iterable, Optional
+
+from .agent import Agent, AgentStatus
+from .task import Task, TaskPriority, TaskStatus
+
+
+class Record:
+    """
+    Slotted in-memory form of a Blackboard entity.
+
+    The Pydantic models validate what comes in through the API; the Blackboard keeps
+    these instead, which take a fraction of the memory and whose attribute reads are
+    plain slot loads. Roles, ids and statuses are interned (statuses are the enum
+    members), so a hundred thousand tasks share a handful of role/status objects.
+
+    Every change goes through `apply` (IndexedStore.update does this), which bumps
+    `version` and drops the cached `to_dict()`, so an entity is serialized once per
+    version however many rooms, listeners and snapshots ask for it. The dict has the
+    same shape as the model's `model_dump()` and is shared: treat it as read-only.
+    """
+
+    __slots__ = ("version", "_dict")
+    _fields: tuple = ()
+    _status = TaskStatus
+
+    def apply(self, fields: dict):
+        for name, value in fields.items():
+            if name == "status":
+                value = self._status(value)
+            elif name == "priority":
+                value = TaskPriority(value)
+            elif name in ("role", "mission_id") and value is not None:
+                value = sys.intern(value)
+            setattr(self, name, value)
+        self.version += 1
+        self._dict = None
+
+    def to_dict(self) -> dict:
+        data = self._dict
+        if data is None:
+            data = self._dict = self._build_dict()
+        return data
+
+    def _build_dict(self) -> dict:
+        raise NotImplementedError
+
+    def __repr__(self) -> str:
+        fields = " ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({fields})"
+
+
+class TaskRecord(Record):
+    __slots__ = ("id", "description", "role", "status", "dependencies", "result", "result_digest", "result_size", "claimed_by",
+                 "mission_id", "priority", "deadline")
+    _fields = __slots__
+    _status = TaskStatus
+
+    def __init__(self, id: str, description: str, role: str, status: TaskStatus = TaskStatus.PENDING,
+                 dependencies: Iterable[str] = (), result: Optional[str] = None, claimed_by: Optional[str] = None,
+                 mission_id: Optional[str] = None, priority: TaskPriority = TaskPriority.NORMAL, deadline: Optional[float] = None,
+                 result_digest: Optional[str] = None, result_size: Optional[int] = None):
+        self.id = sys.intern(id)
+        self.description = description
+        self.role = sys.intern(role)
+        self.status = TaskStatus(status)
+        self.dependencies = tuple(sys.intern(d) for d in dependencies)
+        self.result = result
+        self.result_digest = result_digest
+        self.result_size = result_size
+        self.claimed_by = claimed_by
+        self.mission_id = sys.intern(mission_id) if mission_id is not None else None
+        self.priority = TaskPriority(priority)
+        self.deadline = deadline
+        self.version = 0
+        self._dict = None
+
+    @classmethod
+    def from_model(cls, task: Task) -> "TaskRecord":
+        return cls(task.id, task.description, task.role, task.status, task.dependencies, task.result, task.claimed_by,
+                   task.mission_id, task.priority, task.deadline, task.result_digest, task.result_size)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TaskRecord":
+        """Rebuilds a record from a `to_dict()` that went through JSON (journal, snapshot, replication)."""
+        return cls(**data)
+
+    def to_model(self) -> Task:
+        return Task(**self.to_dict())
+
+    def _build_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "description": self.description,
+            "role": self.role,
+            "status": self.status,
+            "dependencies": list(self.dependencies),
+            "result": self.result,
+            "result_digest": self.result_digest,
+            "result_size": self.result_size,
+            "claimed_by": self.claimed_by,
+            "mission_id": self.mission_id,
+            "priority": self.priority,
+            "deadline": self.deadline,
+        }
+
+
+class AgentRecord(Record):
+    __slots__ = ("id", "role", "status", "window_id", "current_task_id", "capabilities")
+    _fields = __slots__
+    _status = AgentStatus
+
+    def __init__(self, id: str, role: str, status: AgentStatus = AgentStatus.IDLE, window_id: Optional[str] = None,
+                 current_task_id: Optional[str] = None, capabilities: Iterable[str] = ()):
+        self.id = sys.intern(id)
+        self.role = sys.intern(role)
+        self.status = AgentStatus(status)
+        self.window_id = window_id
+        self.current_task_id = current_task_id
+        self.capabilities = tuple(sys.intern(c) for c in capabilities)
+        self.version = 0
+        self._dict = None
+
+    @classmethod
+    def from_model(cls, agent: Agent) -> "AgentRecord":
+        return cls(agent.id, agent.role, agent.status, agent.window_id, agent.current_task_id, agent.capabilities)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AgentRecord":
+        return cls(**data)
+
+    def to_model(self) -> Agent:
+        return Agent(**self.to_dict())
+
+    def _build_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "role": self.role,
+            "status": self.status,
+            "window_id": self.window_id,
+            "current_task_id": self.current_task_id,
+            "capabilities": list(self.capabilities),
+        }
+
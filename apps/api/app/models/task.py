@@ -8,10 +8,21 @@ class TaskStatus(str, Enum):
     DONE = "done"
     ERROR = "error"
 
+class TaskPriority(str, Enum):
+    LOW = "low"
+    NORMAL = "normal"
+    HIGH = "high"
+
 class Task(BaseModel):
     id: str
     description: str
     role: str
     status: TaskStatus = TaskStatus.PENDING
     dependencies: List[str] = []
-    result: Optional[str] = None
+    result: Optional[str] = None  # A preview when the full result is in the artifact store
+    result_digest: Optional[str] = None  # sha256 of the full result, see GET /api/v1/artifacts/{digest}
+    result_size: Optional[int] = None  # Bytes of the full result
+    claimed_by: Optional[str] = None
+    mission_id: Optional[str] = None  # Tasks of one plan/tenant, scheduled fairly against other missions
+    priority: TaskPriority = TaskPriority.NORMAL
+    deadline: Optional[float] = None  # Unix time; earliest deadline first within a mission
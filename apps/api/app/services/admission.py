@@ -0,0 +1,95 @@
+import asyncio
+import os
+from typing import Iterable, List, Optional, Set
+
+from ..core.metrics import metrics
+from ..models.task import TaskStatus
+from .blackboard import Blackboard, blackboard
+
+ADMISSION_MAX_PENDING = int(os.getenv("ADMISSION_MAX_PENDING", "0"))  # PENDING tasks above which new missions wait; 0 disables
+ADMISSION_POLICY = os.getenv("ADMISSION_POLICY", "defer")  # "defer" (wait for room) or "reject"
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "30"))  # Seconds a deferred mission waits before it is rejected
+
+ADMISSIONS = metrics.counter("mission_admissions", "New missions by admission outcome (admitted/deferred/rejected).", ["outcome"])
+
+
+class AdmissionError(ValueError):
+    """Raised when a new mission is turned away because too much work is already pending."""
+
+
+class AdmissionController:
+    """
+    Decides whether a new mission may enter the Blackboard. While at least
+    `max_pending` tasks are PENDING, a new mission is rejected (AdmissionError) or, with
+    policy "defer", waits in arrival order until the backlog drops below the limit, for
+    at most `max_wait` seconds. Missions already on the board are always admitted.
+    """
+
+    def __init__(self, board: Blackboard, max_pending: int = 0, policy: str = "defer", max_wait: float = 30):
+        self.board = board
+        self.max_pending = max_pending
+        self.policy = policy
+        self.max_wait = max_wait
+        self.missions: Set[str] = set()
+        self._waiters: List[asyncio.Future] = []
+        self._started = False
+
+    def start(self):
+        if self._started:
+            return
+        self._started = True
+        for task in self.board.task_store.values():
+            if task.mission_id:
+                self.missions.add(task.mission_id)
+        self.board.subscribe(self._on_mutation)
+
+    def pending(self) -> int:
+        return sum(n for (_, status), n in self.board.task_store.counts().items() if status == TaskStatus.PENDING)
+
+    def saturated(self) -> bool:
+        return self.max_pending > 0 and self.pending() >= self.max_pending
+
+    async def admit(self, mission_ids: Iterable[Optional[str]] = ()):
+        """
+        Returns once work for `mission_ids` may be added; raises AdmissionError if it may
+        not. Work without a mission counts as a new one.
+        """
+        if any(m in self.missions for m in mission_ids if m) or (not self._waiters and not self.saturated()):
+            ADMISSIONS.inc("admitted")
+            return
+        if self.policy != "defer":
+            ADMISSIONS.inc("rejected")
+            raise AdmissionError(f"Queue saturated ({self.pending()} tasks pending); try again later.")
+
+        ADMISSIONS.inc("deferred")
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._release()  # Only queued behind earlier waiters; there may be room already
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except asyncio.TimeoutError:
+            ADMISSIONS.inc("rejected")
+            raise AdmissionError(f"Queue saturated ({self.pending()} tasks pending) for {self.max_wait:g}s; try again later.")
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _on_mutation(self, kind: str, op: str, item_id: Optional[str], data: dict):
+        if kind != "task":
+            return
+        if op == "add" and data.get("mission_id"):
+            self.missions.add(data["mission_id"])
+        elif op == "update" and self._waiters and data.get("status", TaskStatus.PENDING) != TaskStatus.PENDING:
+            self._release()
+
+    def _release(self):
+        # First come, first admitted: waiters are woken in arrival order for as long as the
+        # backlog is below the limit, like missions arriving with nobody waiting would be
+        while self._waiters and not self.saturated():
+            waiter = self._waiters.pop(0)
+            if not waiter.done():
+                waiter.set_result(True)
+
+
+# Singleton
+admission = AdmissionController(blackboard, ADMISSION_MAX_PENDING, ADMISSION_POLICY, ADMISSION_MAX_WAIT)
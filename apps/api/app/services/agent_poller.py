@@ -2,50 +2,129 @@ import asyncio
 import httpx
 import sys
 import os
+from typing import Awaitable, Callable, List, Optional, Set
 
 # Fix path to allow imports from app
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
 
 from app.services.automation import automation
-from app.services.blackboard import blackboard
-from app.models.task import TaskStatus
+from app.services.blackboard import Blackboard, blackboard, POLLER_CLAIMANT
 
 # Configuration
-API_BASE_URL = "http://localhost:8000"
-POLL_INTERVAL = 5  # Seconds
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+AGENT_PROJECT = os.getenv("AGENT_PROJECT") or None  # Project whose tasks the poller claims; None: the default one
+LONG_POLL_TIMEOUT = 25  # Seconds the server may hold an idle poll open
+RECONNECT_MAX_DELAY = 10  # Seconds between reconnect attempts, at most
 
-async def poll_mcp_for_tasks(role: str):
+TaskHandler = Callable[[dict], Awaitable[None]]
+
+
+class AgentPoller:
     """
-    Background loop that polls the MCP server for tasks.
+    Subscribes to the API's task feed for one or more roles and claims tasks as soon as
+    they become ready, instead of scanning on a timer.
+
+    Each long-poll to /api/v1/tasks/events returns the moment a matching event is
+    published, so a ready task is claimed within one HTTP round-trip. The poller keeps
+    the last seq it saw and resumes from it after a dropped connection; if the server
+    can no longer replay from there (or restarted) it resyncs by claiming whatever is
+    already pending. Claimed tasks are handed to `on_task`, which triggers the IDE by default;
+    the prompted agent's `fetch_next_task` takes the task over from the poller.
+    With `project` set it follows and claims that project's tasks instead of the default one's.
     """
-    print(f"🕵️ Agent Poller started for role: {role}")
-    
-    async with httpx.AsyncClient() as client:
+
+    def __init__(self, roles: List[str], base_url: str = API_BASE_URL, client: Optional[httpx.AsyncClient] = None,
+                 on_task: Optional[TaskHandler] = None, project: Optional[str] = None):
+        self.roles = roles
+        self.project = project
+        self.claimant = f"{POLLER_CLAIMANT}{project + ':' if project else ''}{'+'.join(roles)}"
+        # Only names the project in the IDE prompt and holds the trigger logs of this process
+        self.board: Blackboard = Blackboard(project=project) if project else blackboard
+        self.client = client or httpx.AsyncClient(base_url=base_url, timeout=LONG_POLL_TIMEOUT + 10)
+        self.on_task = on_task or self._trigger
+        self.auto_trigger_enabled = False
+        self.after_seq: Optional[int] = None  # None until synced with the server
+        self._handlers: Set[asyncio.Task] = set()
+
+    async def run(self):
+        scope = f" in project {self.project}" if self.project else ""
+        print(f"🕵️ Agent Poller started for roles: {', '.join(self.roles)}{scope}")
+        delay = 0.5
         while True:
             try:
-                # We check the blackboard directly since we are in the same project context
-                if blackboard.auto_trigger_enabled:
-                    pending_tasks = [t for t in blackboard.tasks if t.role == role and t.status == TaskStatus.PENDING]
-                    
-                    if pending_tasks:
-                        task = pending_tasks[0]
-                        print(f"🎯 TASK DETECTED: {task.id} - {task.description}")
-                        
-                        # Trigger UI
-                        await automation.trigger_agent(role, task.description)
-                        
-                        # Mark as In Progress immediately to avoid double-triggering
-                        await blackboard.update_task_status(task.id, TaskStatus.IN_PROGRESS)
-                        print(f"🚀 {role} triggered autonomously.")
-                else:
-                    # Optional: print or log that we are waiting for auto-trigger to be enabled
-                    pass
-
-            except Exception as e:
-                print(f"❌ Poller Error: {e}")
-            
-            await asyncio.sleep(POLL_INTERVAL)
+                if self.after_seq is None:
+                    await self._resync()
+                await self._poll()
+                delay = 0.5
+            except httpx.HTTPError as e:
+                print(f"❌ Poller connection error: {e}. Reconnecting in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    async def _events(self, after_seq: int, timeout: float) -> dict:
+        response = await self.client.get(
+            "/api/v1/tasks/events",
+            params={"roles": self.roles, "after_seq": after_seq, "timeout": timeout, **self._scope()},
+        )
+        response.raise_for_status()
+        data = response.json()
+        self.auto_trigger_enabled = data["auto_trigger_enabled"]
+        return data
+
+    async def _resync(self):
+        # Take the current seq first, so anything published during the catch-up is seen afterwards
+        data = await self._events(0, timeout=0)
+        self.after_seq = data["next_seq"]
+        if self.auto_trigger_enabled:
+            await self._claim(self.roles, drain=True)
+
+    async def _poll(self):
+        data = await self._events(self.after_seq, timeout=LONG_POLL_TIMEOUT)
+        if data["reset"]:
+            self.after_seq = None
+            return
+        for event in data["events"]:
+            if event["event"] == "config_updated":
+                if event["config"].get("auto_trigger_enabled"):
+                    await self._claim(self.roles, drain=True)
+            elif event["event"] == "task_ready" and self.auto_trigger_enabled:
+                await self._claim([event["task"]["role"]])
+        # Advanced only once handled: after a dropped connection the events are re-read and claims are idempotent
+        self.after_seq = data["next_seq"]
+
+    async def _claim(self, roles: List[str], drain: bool = False):
+        while True:
+            response = await self.client.post("/api/v1/tasks/claim", json={"roles": roles, "claimant": self.claimant, **self._scope()})
+            response.raise_for_status()
+            task = response.json()["task"]
+            if not task:
+                return
+            print(f"🎯 TASK CLAIMED: {task['id']} - {task['description']}")
+            # Handled in the background so the next poll goes out immediately
+            handler = asyncio.create_task(self.on_task(task))
+            self._handlers.add(handler)
+            handler.add_done_callback(self._handlers.discard)
+            if not drain:
+                return
+
+    async def _trigger(self, task: dict):
+        try:
+            # Trigger UI
+            result = await automation.trigger_agent(task["role"], task["description"], board=self.board)
+            print(f"🚀 {task['role']} triggered autonomously ({result.status}).")
+        except Exception as e:
+            print(f"❌ Poller Error: {e}")
+
+    def _scope(self) -> dict:
+        return {"project": self.project} if self.project else {}
+
+
+async def poll_mcp_for_tasks(*roles: str, project: Optional[str] = None):
+    """
+    Runs a push-driven poller for the given roles (of `project`, or the default one) until cancelled.
+    """
+    await AgentPoller(list(roles), project=project).run()
 
 if __name__ == "__main__":
-    role = sys.argv[1] if len(sys.argv) > 1 else "Coder"
-    asyncio.run(poll_mcp_for_tasks(role))
+    roles = sys.argv[1:] or ["Coder"]
+    asyncio.run(poll_mcp_for_tasks(*roles, project=AGENT_PROJECT))
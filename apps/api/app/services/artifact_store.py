@@ -0,0 +1,209 @@
+import asyncio
+import hashlib
+import os
+import re
+import struct
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Iterator, List, NamedTuple, Optional
+
+from ..core.metrics import metrics
+
+# Unset: <BLACKBOARD_DATA_DIR>/artifacts, or a temporary directory for a memory-only Blackboard.
+# Workers behind a broker must share it to serve each other's results.
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR") or None
+ARTIFACT_INLINE_BYTES = int(os.getenv("ARTIFACT_INLINE_BYTES", "1024"))  # Results up to this size stay on the task
+ARTIFACT_PREVIEW_CHARS = int(os.getenv("ARTIFACT_PREVIEW_CHARS", "280"))  # Kept on the task as `result` when offloaded
+ARTIFACT_CACHE_MB = float(os.getenv("ARTIFACT_CACHE_MB", "64"))  # Hot artifacts kept decompressed in memory
+ARTIFACT_COMPRESSION_LEVEL = int(os.getenv("ARTIFACT_COMPRESSION_LEVEL", "1"))  # zlib 1-9; 1 is ~4x faster than 6 for ~7% more disk
+
+ARTIFACT_WRITES = metrics.counter("artifact_writes", "Results offloaded to the artifact store, by outcome (stored/deduplicated).", ["outcome"])
+ARTIFACT_BYTES = metrics.counter("artifact_bytes", "Bytes offloaded to the artifact store, as reported (raw) and as written to disk (stored).", ["kind"])
+ARTIFACT_READS = metrics.counter("artifact_reads", "Artifact reads, by where they were served from (cache/disk).", ["served"])
+
+DIGEST = re.compile(r"^[0-9a-f]{64}$")
+CHUNK = 64 * 1024
+SIZE = struct.Struct(">Q")  # Content size, ahead of the zlib stream in compressed files
+
+
+class Artifact(NamedTuple):
+    digest: str  # sha256 of the content
+    size: int  # Bytes of the content
+    stored: int  # Bytes on disk
+    compressed: bool
+
+
+class ArtifactStore:
+    """
+    Content-addressed store for large task results.
+
+    A result longer than `inline_bytes` is written once under its sha256, so agents
+    reporting the same diff or report twice share one file, and zlib-compressed unless
+    that saves under 10% (such files end in `.z` and start with the content size). The
+    task keeps only the digest, the size and a `preview_chars` preview, which is all
+    that broadcasts, snapshots, the WAL and replication ever carry; the content is
+    fetched from the artifact endpoints.
+
+    Files are written to a temporary name and renamed into place, so a reader never
+    sees a partial artifact and concurrent writers of the same content are harmless.
+    Recently read artifacts of up to an eighth of `cache_bytes` are kept decompressed
+    in an LRU; bigger ones are streamed from disk. Artifacts are never deleted.
+    """
+
+    def __init__(self, root: Optional[str] = None, inline_bytes: int = 1024, preview_chars: int = 280,
+                 cache_bytes: int = 64 * 1024 * 1024, level: int = 1):
+        self._root = root
+        self.inline_bytes = inline_bytes
+        self.preview_chars = preview_chars
+        self.cache_bytes = cache_bytes
+        self.level = level
+        self._tmp: Optional[tempfile.TemporaryDirectory] = None
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cached = 0
+        self._lock = threading.Lock()  # Downloads read the cache from worker threads
+
+    @property
+    def root(self) -> str:
+        if self._root is None:
+            self._tmp = tempfile.TemporaryDirectory(prefix="antigravity-artifacts-")
+            self._root = self._tmp.name
+        return self._root
+
+    async def offload(self, result: Optional[str]) -> dict:
+        """
+        Task fields for a reported result: the result itself when it is small, otherwise
+        a preview plus `result_digest`/`result_size` once the content is stored (hashing,
+        compression and the write run in a worker thread).
+        """
+        fields = self.inline(result)
+        return fields if fields is not None else await self._store(result)
+
+    async def offload_many(self, results: List[Optional[str]]) -> List[dict]:
+        """`offload` for a batch; the large results are stored concurrently."""
+        fields = [self.inline(result) for result in results]
+        large = [i for i, f in enumerate(fields) if f is None]
+        for i, stored in zip(large, await asyncio.gather(*(self._store(results[i]) for i in large))):
+            fields[i] = stored
+        return fields
+
+    def inline(self, result: Optional[str]) -> Optional[dict]:
+        """Task fields for a result that stays on the task, or None if it has to be stored."""
+        if not result:
+            return {}
+        if len(result) * 4 <= self.inline_bytes or len(result.encode()) <= self.inline_bytes:
+            return {"result": result, "result_digest": None, "result_size": None}
+        return None
+
+    async def _store(self, result: str) -> dict:
+        artifact, stored = await asyncio.to_thread(self.put, result.encode())
+        ARTIFACT_WRITES.inc("stored" if stored else "deduplicated")
+        ARTIFACT_BYTES.inc("raw", amount=artifact.size)
+        if stored:
+            ARTIFACT_BYTES.inc("stored", amount=artifact.stored)
+        return {"result": self.preview(result), "result_digest": artifact.digest, "result_size": artifact.size}
+
+    def preview(self, text: str) -> str:
+        return text if len(text) <= self.preview_chars else text[: self.preview_chars] + "…"
+
+    def put(self, data: bytes):
+        """Stores `data` unless it already is; returns (artifact, whether it was written)."""
+        digest = hashlib.sha256(data).hexdigest()
+        existing = self.stat(digest)
+        if existing:
+            return existing, False
+        packed = SIZE.pack(len(data)) + zlib.compress(data, self.level)
+        compressed = len(packed) < len(data) * 0.9
+        payload = packed if compressed else data
+        path = self._path(digest, compressed)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(payload)
+        os.replace(tmp, path)
+        return Artifact(digest, len(data), len(payload), compressed), True
+
+    def stat(self, digest: str) -> Optional[Artifact]:
+        if not DIGEST.match(digest):
+            return None
+        for compressed in (True, False):
+            path = self._path(digest, compressed)
+            try:
+                stored = os.path.getsize(path)
+            except OSError:
+                continue
+            if not compressed:
+                return Artifact(digest, stored, stored, False)
+            with open(path, "rb") as f:
+                size, = SIZE.unpack(f.read(SIZE.size))
+            return Artifact(digest, size, stored, True)
+        return None
+
+    def read(self, digest: str) -> Optional[bytes]:
+        """The whole content, through the cache."""
+        with self._lock:
+            data = self._cache.get(digest)
+            if data is not None:
+                self._cache.move_to_end(digest)
+        if data is not None:
+            ARTIFACT_READS.inc("cache")
+            return data
+        artifact = self.stat(digest)
+        if artifact is None:
+            return None
+        with open(self._path(digest, artifact.compressed), "rb") as f:
+            data = f.read()
+        if artifact.compressed:
+            data = zlib.decompress(data[SIZE.size:])
+        ARTIFACT_READS.inc("disk")
+        self._remember(digest, data)
+        return data
+
+    def iter_range(self, artifact: Artifact, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Yields bytes [start, end) of an artifact in chunks; small ones come from (and go to) the cache."""
+        end = artifact.size if end is None else min(end, artifact.size)
+        if artifact.size <= self.cache_bytes // 8:
+            data = self.read(artifact.digest)
+            for offset in range(start, end, CHUNK):
+                yield data[offset:min(offset + CHUNK, end)]
+            return
+        ARTIFACT_READS.inc("disk")
+        with open(self._path(artifact.digest, artifact.compressed), "rb") as f:
+            if not artifact.compressed:
+                f.seek(start)
+                remaining = end - start
+                while remaining > 0:
+                    block = f.read(min(CHUNK, remaining))
+                    if not block:
+                        return
+                    remaining -= len(block)
+                    yield block
+                return
+            # Compressed streams can't seek: inflate and drop everything before `start`
+            f.seek(SIZE.size)
+            inflater, position = zlib.decompressobj(), 0
+            while position < end:
+                block = f.read(CHUNK)
+                data = inflater.decompress(block) if block else inflater.flush()
+                if not block and not data:
+                    return
+                if position + len(data) > start:
+                    yield data[max(0, start - position):end - position]
+                position += len(data)
+
+    def _remember(self, digest: str, data: bytes):
+        if len(data) > self.cache_bytes // 8:
+            return
+        with self._lock:
+            if digest in self._cache:
+                self._cache.move_to_end(digest)
+                return
+            self._cache[digest] = data
+            self._cached += len(data)
+            while self._cached > self.cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cached -= len(evicted)
+
+    def _path(self, digest: str, compressed: bool) -> str:
+        return os.path.join(self.root, digest[:2], digest + (".z" if compressed else ""))
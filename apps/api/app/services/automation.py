@@ -1,72 +1,264 @@
-import subprocess
+import asyncio
 import os
-from .blackboard import blackboard
+import shlex
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional, Tuple
+from .blackboard import Blackboard, blackboard, DEFAULT_PROJECT
 
-def run_applescript(script: str):
-    """Executes an AppleScript and returns the output."""
-    try:
-        process = subprocess.Popen(['osascript', '-e', script], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        stdout, stderr = process.communicate()
-        if stderr:
-             print(f"AppleScript Error: {stderr}")
-        return stdout.strip()
-    except Exception as e:
-        print(f"Failed to run AppleScript: {e}")
-        return None
+AUTOMATION_EXECUTOR = os.getenv("AUTOMATION_EXECUTOR", "osascript")  # "osascript", "command" or "fake" (in-process, no subprocess)
+AUTOMATION_COMMAND = os.getenv("AUTOMATION_COMMAND", "cat")  # For "command": receives the prompt on stdin
+AUTOMATION_TIMEOUT = float(os.getenv("AUTOMATION_TIMEOUT", "30"))  # Seconds per trigger
 
-class AutomationService:
-    def __init__(self, app_name: str = "Antigravity"):
+
+class SubprocessExecutor:
+    """Base for executors that run `command(prompt)` as a child process."""
+
+    def command(self, prompt: str) -> Tuple[List[str], Optional[str]]:
+        raise NotImplementedError
+
+    async def run(self, prompt: str, timeout: float) -> Tuple[int, str]:
+        """Returns (returncode, stderr); raises asyncio.TimeoutError after `timeout` seconds."""
+        argv, stdin = self.command(prompt)
+        returncode, _, stderr = await run_command(argv, stdin, timeout)
+        return returncode, stderr
+
+
+class OsaScriptExecutor(SubprocessExecutor):
+    """Types the prompt into the IDE chat with AppleScript (macOS)."""
+
+    def __init__(self, app_name: str):
         self.app_name = app_name
 
-    async def trigger_agent(self, role: str, description: str):
-        """
-        Activates the IDE, opens chat, and injects the mission prompt.
-        """
-        await blackboard.add_log("System", f"Triggering {role} via UI Automation...")
-        
-        prompt = f"Agent {role}, your mission is: {description}. Please execute and report back through the MCP tool."
-        
-        # AppleScript to: 
+    def build_script(self, prompt: str) -> str:
+        prompt = prompt.replace("\\", "\\\\").replace('"', '\\"')
+        # AppleScript to:
         # 1. Activate App
         # 2. Command+L (Open Chat/Sidebar)
         # 3. Type text
         # 4. Press Enter
-        script = f'''
+        return f'''
         tell application "{self.app_name}" to activate
         delay 1.0
         tell application "System Events"
             tell process "{self.app_name}"
                 -- 1. Press Escape multiple times to exit any open menus or focus in editor
-                key code 53 
+                key code 53
                 delay 0.2
                 key code 53
                 delay 0.5
-                
+
                 -- 2. Open/Focus Chat (Cmd+L)
                 keystroke "l" using {{command down}}
                 delay 1.0
-                
+
                 -- 3. Clear existing text in chat box (Cmd+A -> Backspace)
                 keystroke "a" using {{command down}}
                 delay 0.2
                 key code 51
                 delay 0.3
-                
+
                 -- 4. Type the mission mandate
                 keystroke "{prompt}"
                 delay 0.5
-                
+
                 -- 5. Final Enter to send
                 key code 36
             end tell
         end tell
         '''
-        
-        result = run_applescript(script)
-        if result is not None:
-             await blackboard.add_log("System", f"UI Trigger sent to {self.app_name}.")
+
+    def command(self, prompt: str) -> Tuple[List[str], Optional[str]]:
+        return ["osascript", "-e", self.build_script(prompt)], None
+
+
+class CommandExecutor(SubprocessExecutor):
+    """Runs an arbitrary command with the prompt on stdin, e.g. a stub (`cat`, `sleep 0.05`) on Linux."""
+
+    def __init__(self, argv: List[str]):
+        self.argv = argv
+
+    def command(self, prompt: str) -> Tuple[List[str], Optional[str]]:
+        return self.argv, prompt
+
+
+class FakeExecutor:
+    """Accepts every prompt after `latency` seconds without leaving the process, for tests and load runs."""
+
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+        self.prompts = 0
+
+    async def run(self, prompt: str, timeout: float) -> Tuple[int, str]:
+        self.prompts += 1
+        await asyncio.wait_for(asyncio.sleep(self.latency), timeout)
+        return 0, ""
+
+
+async def run_command(argv: List[str], stdin: Optional[str], timeout: float) -> Tuple[int, str, str]:
+    """Runs a subprocess without blocking the event loop; kills it after `timeout` seconds."""
+    process = await asyncio.create_subprocess_exec(
+        *argv,
+        stdin=asyncio.subprocess.PIPE if stdin is not None else asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            process.communicate(stdin.encode() if stdin is not None else None), timeout
+        )
+    except BaseException:
+        # Timeout or cancellation: don't leave the child (or a half-typed prompt) running
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+    return process.returncode, stdout.decode(errors="replace").strip(), stderr.decode(errors="replace").strip()
+
+
+@dataclass
+class TriggerResult:
+    role: str
+    status: str  # "sent", "failed" or "timeout"
+    missions: int  # Descriptions delivered in this prompt (>1 when queued triggers were merged)
+    queued_ms: float
+    run_ms: float
+    error: Optional[str] = None
+
+
+@dataclass
+class _Trigger:
+    role: str
+    descriptions: List[str]
+    future: asyncio.Future
+    board: Blackboard  # Project the missions belong to; results are logged there
+    queued_at: float = field(default_factory=time.perf_counter)
+
+
+class AutomationService:
+    """
+    Serialized UI automation dispatcher.
+
+    The IDE window can only take one prompt at a time, so triggers are queued and a single
+    worker runs them one by one through a pluggable executor, as an asyncio subprocess
+    with a timeout. The queue holds at most one pending trigger per role and project: a
+    trigger for one that is already waiting is merged into it, and both callers get the
+    same result.
+    """
+
+    def __init__(self, app_name: str = "Antigravity", executor=None, timeout: float = 30):
+        self.app_name = app_name
+        self.executor = executor or OsaScriptExecutor(app_name)
+        self.timeout = timeout
+        self.sent = 0
+        self.failed = 0
+        self.merged = 0
+        # Recent trigger results, newest last
+        self.results: Deque[TriggerResult] = deque(maxlen=50)
+
+        self._pending: "OrderedDict[Tuple[str, str], _Trigger]" = OrderedDict()  # (project, role) -> trigger
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def build_prompt(role: str, descriptions: List[str], project: str = DEFAULT_PROJECT) -> str:
+        # The IDE agent has to name the project in its MCP calls to find these tasks
+        scope = "" if project == DEFAULT_PROJECT else f' Pass project "{project}" to every MCP tool.'
+        if len(descriptions) == 1:
+            return f"Agent {role}, your mission is: {descriptions[0]}. Please execute and report back through the MCP tool.{scope}"
+        missions = " ".join(f"({i}) {d}." for i, d in enumerate(descriptions, 1))
+        return f"Agent {role}, your missions are: {missions} Please execute them in order and report back through the MCP tool.{scope}"
+
+    def submit(self, role: str, description: str, board: Blackboard = blackboard) -> asyncio.Future:
+        """Queues a trigger and returns a future resolving to its TriggerResult."""
+        trigger = self._pending.get((board.project, role))
+        if trigger:
+            trigger.descriptions.append(description)
+            self.merged += 1
+            return trigger.future
+
+        trigger = _Trigger(role, [description], asyncio.get_running_loop().create_future(), board)
+        self._pending[(board.project, role)] = trigger
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.create_task(self._run())
+        self._wakeup.set()
+        return trigger.future
+
+    def pending_roles(self) -> List[str]:
+        return [trigger.role for trigger in self._pending.values()]
+
+    async def trigger_agent(self, role: str, description: str, board: Blackboard = blackboard) -> TriggerResult:
+        """
+        Activates the IDE, opens chat, and injects the mission prompt.
+        """
+        await board.add_log("System", f"Triggering {role} via UI Automation...")
+        # Shielded so a cancelled caller doesn't cancel a trigger merged with others
+        return await asyncio.shield(self.submit(role, description, board))
+
+    async def stop(self):
+        if self._worker:
+            self._worker.cancel()
+            self._worker = None
+        for trigger in self._pending.values():
+            trigger.future.cancel()
+        self._pending.clear()
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                _, trigger = self._pending.popitem(last=False)
+                try:
+                    result = await self._execute(trigger)
+                except asyncio.CancelledError:
+                    trigger.future.cancel()
+                    raise
+                self.results.append(result)
+                if not trigger.future.done():
+                    trigger.future.set_result(result)
+                await self._log(trigger.board, result)
+
+    async def _execute(self, trigger: _Trigger) -> TriggerResult:
+        started = time.perf_counter()
+        queued_ms = (started - trigger.queued_at) * 1000
+        status, error = "sent", None
+        try:
+            returncode, stderr = await self.executor.run(self.build_prompt(trigger.role, trigger.descriptions, trigger.board.project), self.timeout)
+            if returncode != 0:
+                status, error = "failed", stderr or f"exit code {returncode}"
+        except asyncio.TimeoutError:
+            status, error = "timeout", f"no response after {self.timeout:g}s"
+        except Exception as e:
+            status, error = "failed", str(e)
+
+        if status == "sent":
+            self.sent += 1
+        else:
+            self.failed += 1
+        return TriggerResult(trigger.role, status, len(trigger.descriptions), queued_ms, (time.perf_counter() - started) * 1000, error)
+
+    async def _log(self, board: Blackboard, result: TriggerResult):
+        if result.status == "sent":
+            merged = f" ({result.missions} missions merged)" if result.missions > 1 else ""
+            await board.add_log("System", f"UI Trigger sent to {self.app_name}{merged}.")
+        elif result.status == "timeout":
+            await board.add_log("System", f"UI trigger for {result.role} timed out: {result.error}.")
         else:
-             await blackboard.add_log("System", "Failed to send UI trigger. Check Accessibility permissions.")
+            print(f"❌ UI trigger error ({result.role}): {result.error}")
+            await board.add_log("System", "Failed to send UI trigger. Check Accessibility permissions.")
+
+
+def _build_executor(app_name: str):
+    if AUTOMATION_EXECUTOR == "fake":
+        return FakeExecutor()
+    if AUTOMATION_EXECUTOR == "command":
+        return CommandExecutor(shlex.split(AUTOMATION_COMMAND))
+    return OsaScriptExecutor(app_name)
+
 
 # Singleton
-automation = AutomationService(app_name=os.getenv("IDE_APP_NAME", "Antigravity"))
+_app_name = os.getenv("IDE_APP_NAME", "Antigravity")
+automation = AutomationService(app_name=_app_name, executor=_build_executor(_app_name), timeout=AUTOMATION_TIMEOUT)
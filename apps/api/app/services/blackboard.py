@@ -1,61 +1,359 @@
-from typing import List, Dict, Optional
+from contextlib import contextmanager
+from typing import Callable, List, Dict, Optional, Tuple
 from ..models.task import Task, TaskStatus
-from ..models.agent import Agent, AgentStatus
-from ..core.socket import sio
+from ..models.agent import AgentStatus
+from ..models.records import AgentRecord, TaskRecord
+from ..core.broadcaster import broadcaster
+from .scheduler import Scheduler, DependencyError
+from .store import IndexedStore
+from .leases import Lease, LeaseTable
+from .log_store import LogStore
+from .fair_queue import FairQueue, READY_QUEUE_POLICY
+from .artifact_store import ArtifactStore, ARTIFACT_DIR, ARTIFACT_INLINE_BYTES, ARTIFACT_PREVIEW_CHARS, ARTIFACT_CACHE_MB, ARTIFACT_COMPRESSION_LEVEL
+import gc
 import uuid
+import os
+
+LEASE_TTL = float(os.getenv("TASK_LEASE_TTL", "600"))  # Seconds without a heartbeat before a claim is revoked
+LOG_CAPACITY = int(os.getenv("LOG_CAPACITY", "1000"))  # Entries kept in memory per agent
+LOG_SEGMENT_DIR = os.getenv("LOG_SEGMENT_DIR") or None  # Optional on-disk history
+_DATA_DIR = os.getenv("BLACKBOARD_DATA_DIR") or None
+
+DEFAULT_PROJECT = "default"
+POLLER_CLAIMANT = "poller:"  # Prefix of AgentPoller claimants; the IDE agent it prompts takes their tasks over
+
+# listener(kind, op, item_id, data) with kind in task/agent/log/config, op in add/update;
+# kind "txn" (op begin/commit) brackets mutations that must be journaled and replicated as one
+MutationListener = Callable[[str, str, Optional[str], dict], None]
+# listener(task) whenever a PENDING task becomes claimable (added ready, unblocked or re-queued)
+ReadyListener = Callable[[TaskRecord], None]
+
+class LocalState:
+    """
+    Claim arbitration for a single process, where the event loop already serializes
+    claims. Multi-worker deployments swap in BlackboardReplication (see replication.py).
+    """
+
+    async def acquire(self, key: str, owner: str) -> bool:
+        return True
+
+    def release(self, key: str):
+        pass
+
 
 class Blackboard:
-    def __init__(self):
-        self.tasks: List[Task] = []
-        self.agents: List[Agent] = []
-        self.logs: Dict[str, List[str]] = {}
+    """
+    Task, agent and log state of one project. Every broadcast goes to the project's
+    Socket.IO room (`room`), so dashboards of other projects never receive it.
+    """
+
+    def __init__(self, project: str = DEFAULT_PROJECT):
+        self.project = project
+        self.room = f"project:{project}"
+        self.task_store: IndexedStore[TaskRecord] = IndexedStore()
+        self.agent_store: IndexedStore[AgentRecord] = IndexedStore()
+        self._agent_by_task: Dict[str, str] = {}
+        segment_dir = LOG_SEGMENT_DIR
+        if segment_dir and project != DEFAULT_PROJECT:
+            segment_dir = os.path.join(segment_dir, "projects", project)
+        self.log_store = LogStore(capacity=LOG_CAPACITY, segment_dir=segment_dir)
+        self.artifacts = ArtifactStore(
+            root=ARTIFACT_DIR or (os.path.join(_DATA_DIR, "artifacts") if _DATA_DIR else None),
+            inline_bytes=ARTIFACT_INLINE_BYTES,
+            preview_chars=ARTIFACT_PREVIEW_CHARS,
+            cache_bytes=int(ARTIFACT_CACHE_MB * 1024 * 1024),
+            level=ARTIFACT_COMPRESSION_LEVEL,
+        )
         self.auto_trigger_enabled = False
+        self.scheduler = Scheduler()
+        self.leases = LeaseTable(ttl=LEASE_TTL)
+        self.ready_queue = FairQueue(policy=READY_QUEUE_POLICY)
+        self._listeners: List[MutationListener] = []
+        self._ready_listeners: List[ReadyListener] = []
+        self._txn_depth = 0
+        self.state = LocalState()
+
+    def subscribe(self, listener: MutationListener):
+        """Registers a callback that sees every state mutation, in order."""
+        self._listeners.append(listener)
+        self.task_store.subscribe(lambda op, item_id, data: listener("task", op, item_id, data))
+        self.agent_store.subscribe(lambda op, item_id, data: listener("agent", op, item_id, data))
+
+    def _notify(self, kind: str, op: str, data: dict):
+        for listener in self._listeners:
+            listener(kind, op, None, data)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Groups the mutations made inside (synchronously: never await in the block) into one
+        unit that the WAL and replication record as a single entry, so a crash or a peer
+        sees all of them or none.
+        """
+        self._txn_depth += 1
+        if self._txn_depth == 1:
+            self._notify("txn", "begin", {})
+        try:
+            yield
+        finally:
+            self._txn_depth -= 1
+            if self._txn_depth == 0:
+                self._notify("txn", "commit", {})
+
+    def on_ready(self, listener: ReadyListener):
+        self._ready_listeners.append(listener)
+
+    def _announce_ready(self, task_ids: List[str]):
+        for task_id in task_ids:
+            task = self.task_store.get(task_id)
+            if task and task.status == TaskStatus.PENDING:
+                self.ready_queue.push(task)
+                for listener in self._ready_listeners:
+                    listener(task)
+
+    # Read-only snapshots; mutate through the methods below so the indexes stay consistent
+    @property
+    def tasks(self) -> List[TaskRecord]:
+        return list(self.task_store.values())
+
+    @property
+    def agents(self) -> List[AgentRecord]:
+        return list(self.agent_store.values())
+
+    @property
+    def logs(self) -> Dict[str, List[str]]:
+        return {agent: self.log_store.messages(agent) for agent in self.log_store.agents()}
+
+    def get_task(self, task_id: str) -> Optional[TaskRecord]:
+        return self.task_store.get(task_id)
+
+    def get_agent(self, agent_id: str) -> Optional[AgentRecord]:
+        return self.agent_store.get(agent_id)
+
+    def next_task(self, role: str, status: TaskStatus = TaskStatus.PENDING) -> Optional[TaskRecord]:
+        """Oldest task for a role in the given status."""
+        return self.task_store.first(role, status)
+
+    def count_tasks(self, role: str, status: TaskStatus = TaskStatus.PENDING) -> int:
+        return self.task_store.count(role, status)
+
+    def idle_agent(self, role: str) -> Optional[AgentRecord]:
+        return self.agent_store.first(role, AgentStatus.IDLE)
+
+    def agent_for_task(self, task_id: str) -> Optional[AgentRecord]:
+        agent_id = self._agent_by_task.get(task_id)
+        return self.agent_store.get(agent_id) if agent_id else None
 
     async def set_auto_trigger(self, enabled: bool):
         self.auto_trigger_enabled = enabled
-        await sio.emit("config_updated", {"auto_trigger_enabled": enabled})
+        self._notify("config", "update", {"auto_trigger_enabled": enabled})
+        await broadcaster.emit("config_updated", {"auto_trigger_enabled": enabled}, key="config", room=self.room)
         await self.add_log("System", f"Auto-Trigger Mode: {'ENABLED' if enabled else 'DISABLED'}")
 
-    async def add_task(self, task: Task):
-        self.tasks.append(task)
-        await sio.emit("task_added", task.model_dump())
-
-    async def update_task_status(self, task_id: str, status: TaskStatus, result: Optional[str] = None):
-        updated_task = None
-        for task in self.tasks:
-            if task.id == task_id:
-                task.status = status
-                if result:
-                    task.result = result
-                updated_task = task
-                break
-        
+    async def add_task(self, task: Task) -> TaskRecord:
+        # Raises DependencyError before the task becomes visible anywhere
+        self.scheduler.add(task.id, task.dependencies)
+        task = TaskRecord.from_model(task)
+        self.task_store.add(task)
+        if self.scheduler.is_ready(task.id):
+            self._announce_ready([task.id])
+        await broadcaster.emit("task_added", task, key=("task", task.id), room=self.room)
+        return task
+
+    async def add_tasks(self, tasks: List[Task]) -> List[TaskRecord]:
+        """
+        Adds a batch of tasks atomically. The whole batch is validated first (dependencies
+        may point at known tasks or at each other, in any order); if any task is invalid a
+        DependencyError is raised and nothing is added. Otherwise the tasks are inserted in
+        dependency order as one transaction and broadcast as a single `tasks_added` event
+        carrying the list of tasks.
+        """
+        by_id: Dict[str, Task] = {}
+        for task in tasks:
+            if task.id in by_id:
+                raise DependencyError(f"Task {task.id} appears twice in the batch.")
+            by_id[task.id] = task
+        # Bulk insert of acyclic records, as in recovery: cyclic GC passes over the growing heap only cost time
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            # Validates the whole batch before registering any of it
+            order = self.scheduler.add_batch({task.id: task.dependencies for task in tasks})
+
+            added = [TaskRecord.from_model(by_id[task_id]) for task_id in order]
+            ready = []
+            with self.transaction():
+                for task in added:
+                    self.task_store.add(task)
+                    if self.scheduler.is_ready(task.id):
+                        ready.append(task.id)
+            self._announce_ready(ready)
+        finally:
+            if gc_enabled:
+                gc.enable()
+        await broadcaster.emit("tasks_added", added, room=self.room, entity="task")
+        return added
+
+    async def update_task_status(self, task_id: str, status: TaskStatus, result: Optional[str] = None,
+                                 result_fields: Optional[dict] = None):
+        """`result_fields` sets an already stored result (e.g. a reused one) instead of `result`."""
+        # Large results go to the artifact store; the task keeps a preview and the digest
+        if result_fields is None:
+            result_fields = await self.artifacts.offload(result)
+        updated_task = self._set_task_status(task_id, status, result_fields)
         if updated_task:
-            await sio.emit("task_updated", updated_task.model_dump())
+            await broadcaster.emit("task_updated", updated_task, key=("task", task_id), room=self.room)
+
+    async def update_tasks(self, updates: List[Tuple[str, TaskStatus, Optional[str]]]) -> List[TaskRecord]:
+        """
+        Applies many (task_id, status, result) updates atomically, each like
+        update_task_status. An unknown or repeated task id rejects the whole batch with a
+        ValueError. Broadcast as a single `tasks_updated` event.
+        """
+        seen = set()
+        for task_id, _, _ in updates:
+            if task_id not in self.task_store:
+                raise ValueError(f"Unknown task {task_id}.")
+            if task_id in seen:
+                raise ValueError(f"Task {task_id} appears twice in the batch.")
+            seen.add(task_id)
+
+        results = await self.artifacts.offload_many([result for _, _, result in updates])
+        updated = []
+        with self.transaction():
+            for (task_id, status, _), result in zip(updates, results):
+                updated.append(self._set_task_status(task_id, status, result))
+        await broadcaster.emit("tasks_updated", updated, room=self.room, entity="task")
+        return updated
+
+    def _set_task_status(self, task_id: str, status: TaskStatus, result: Optional[dict] = None) -> Optional[TaskRecord]:
+        """`result` holds the result fields from ArtifactStore.offload, if any."""
+        fields = {"status": status, **(result or {})}
+        updated_task = self.task_store.update(task_id, **fields)
+
+        if updated_task:
+            if status != TaskStatus.PENDING:
+                self.ready_queue.discard(task_id)
+            if status != TaskStatus.IN_PROGRESS and self.leases.release(task_id):
+                self.task_store.update(task_id, claimed_by=None)
+            if status == TaskStatus.DONE:
+                self._announce_ready(self.scheduler.mark_done(task_id))
+            elif status == TaskStatus.PENDING:
+                # Claimable again. Claim keys of finished tasks are kept, so lagging replicas can't re-claim them
+                self.state.release(f"claim:{task_id}")
+                self.scheduler.requeue(task_id)
+                if self.scheduler.is_ready(task_id):
+                    self._announce_ready([task_id])
+        return updated_task
+
+    async def claim_task(self, task_id: str, claimant: str, ttl: Optional[float] = None) -> Optional[TaskRecord]:
+        """
+        Compare-and-set: moves a ready PENDING task to IN_PROGRESS under a lease owned by
+        `claimant`. The check and the transition run without yielding to the event loop,
+        so exactly one concurrent caller wins; the others get None.
+        """
+        task = self.task_store.get(task_id)
+        if not task or task.status != TaskStatus.PENDING or not self.scheduler.is_ready(task_id):
+            return None
+        # Other workers may race for the same task; only the holder of the claim key proceeds
+        if not await self.state.acquire(f"claim:{task_id}", claimant):
+            return None
+        if task.status != TaskStatus.PENDING:
+            return None  # Finished elsewhere while we waited; its key stays taken
+
+        self.task_store.update(task_id, status=TaskStatus.IN_PROGRESS, claimed_by=claimant)
+        self.ready_queue.discard(task_id)
+        self.leases.grant(task_id, claimant, ttl, role=task.role)
+        await broadcaster.emit("task_updated", task, key=("task", task_id), room=self.room)
+        return task
+
+    async def claim_next_task(self, role: str, claimant: str, ttl: Optional[float] = None) -> Optional[TaskRecord]:
+        """
+        Claims the next ready PENDING task for a role in ready-queue order: fair across
+        missions, earliest deadline first within one (see FairQueue).
+        """
+        while True:
+            task_id = self.ready_queue.pop(role, self._claimable)
+            if task_id is None:
+                return None
+            task = await self.claim_task(task_id, claimant, ttl)
+            if task:
+                return task
+
+    def _claimable(self, task_id: str) -> bool:
+        task = self.task_store.get(task_id)
+        return bool(task) and task.status == TaskStatus.PENDING and self.scheduler.is_ready(task_id)
+
+    async def hand_over(self, task_id: str, owner: str, claimant: str) -> Optional[TaskRecord]:
+        """
+        Compare-and-set: passes an IN_PROGRESS task claimed by `owner` (e.g. the dispatcher,
+        for a task it handed to the IDE) to `claimant`, with a fresh lease. Without yielding,
+        so exactly one concurrent caller gets it; the others get None.
+        """
+        task = self.task_store.get(task_id)
+        if not task or task.status != TaskStatus.IN_PROGRESS or task.claimed_by != owner:
+            return None
+        if not self.leases.transfer(task_id, owner, claimant):
+            return None
+        self.task_store.update(task_id, claimed_by=claimant)
+        await broadcaster.emit("task_updated", task, key=("task", task_id), room=self.room)
+        return task
+
+    def held_tasks(self, claimant: str, role: str) -> List[TaskRecord]:
+        """IN_PROGRESS tasks of `role` leased to `claimant`, oldest claim first."""
+        return [self.task_store.get(task_id) for task_id in self.leases.held(claimant, role)]
+
+    def heartbeat(self, task_id: str, claimant: Optional[str] = None, ttl: Optional[float] = None) -> Optional[Lease]:
+        """Extends a lease. Returns None if the lease is gone or owned by someone else."""
+        return self.leases.renew(task_id, claimant, ttl)
+
+    async def expire_leases(self) -> List[str]:
+        """Re-queues every IN_PROGRESS task whose lease ran out without a heartbeat."""
+        requeued = []
+        for lease in self.leases.pop_expired():
+            task = self.task_store.get(lease.task_id)
+            if not task or task.status != TaskStatus.IN_PROGRESS:
+                continue
+
+            agent = self.agent_for_task(task.id)
+            if agent:
+                await self.update_agent_status(agent.id, AgentStatus.IDLE)
+            self.task_store.update(task.id, claimed_by=None)
+            await self.update_task_status(task.id, TaskStatus.PENDING)
+            await self.add_log("System", f"Lease on task {task.id} held by {lease.owner} expired. Re-queued.")
+            requeued.append(task.id)
+        return requeued
 
     async def add_log(self, agent_name: str, message: str):
-        if agent_name not in self.logs:
-            self.logs[agent_name] = []
-        
-        log_entry = {"agent": agent_name, "message": message}
-        self.logs[agent_name].append(message)
-        await sio.emit("agent_log", log_entry)
-
-    async def register_agent(self, role: str) -> Agent:
+        entry = self.log_store.append(agent_name, message)
+        if self._listeners:
+            self._notify("log", "add", entry.to_dict())
+        await broadcaster.emit("agent_log", entry.to_dict(), room=self.room)
+
+    async def register_agent(self, role: str, capabilities: Optional[List[str]] = None) -> AgentRecord:
         agent_id = f"{role.lower()}_{str(uuid.uuid4())[:8]}"
-        agent = Agent(id=agent_id, role=role, window_id=f"win_{agent_id}")
-        self.agents.append(agent)
-        await sio.emit("agent_added", agent.model_dump())
+        agent = AgentRecord(agent_id, role, window_id=f"win_{agent_id}", capabilities=capabilities or ())
+        self.agent_store.add(agent)
+        await broadcaster.emit("agent_added", agent, key=("agent", agent.id), room=self.room)
         await self.add_log("System", f"Agent Registry: {role} ({agent_id}) online.")
         return agent
 
     async def update_agent_status(self, agent_id: str, status: AgentStatus, task_id: Optional[str] = None):
-        for agent in self.agents:
-            if agent.id == agent_id:
-                agent.status = status
-                agent.current_task_id = task_id
-                await sio.emit("agent_updated", agent.model_dump())
-                break
+        agent = self._set_agent_status(agent_id, status, task_id)
+        if agent:
+            await broadcaster.emit("agent_updated", agent, key=("agent", agent_id), room=self.room)
+
+    def _set_agent_status(self, agent_id: str, status: AgentStatus, task_id: Optional[str] = None) -> Optional[AgentRecord]:
+        agent = self.agent_store.get(agent_id)
+        if not agent:
+            return None
+
+        if agent.current_task_id and self._agent_by_task.get(agent.current_task_id) == agent_id:
+            del self._agent_by_task[agent.current_task_id]
+        self.agent_store.update(agent_id, status=status, current_task_id=task_id)
+        if task_id:
+            self._agent_by_task[task_id] = agent_id
+        return agent
 
 # Singleton Instance
 blackboard = Blackboard()
@@ -1,14 +1,94 @@
-from .blackboard import blackboard
+from .blackboard import Blackboard
+from .projects import Project, projects
 from .llm import llm_service
-from ..models.task import Task
+from ..core.json_stream import JsonArrayStream
+from ..models.task import Task, TaskPriority
+from collections import deque
+from typing import Deque, Dict, List, Optional
 import uuid
 import asyncio
 import json
+import os
+import time
+
+PLAN_STREAMING = os.getenv("PLAN_STREAMING", "true").lower() in ("1", "true", "yes")
+
+
+class PlanAssembler:
+    """
+    Turns plan-local task dicts into Blackboard-ready ones.
+
+    LLM ids are only unique within one plan (and cached replies repeat them), so every
+    plan gets its own id suffix and dependencies are rewritten to match. A task whose
+    dependencies have not been placed yet is held back and released as soon as they are,
+    which lets a streamed plan list its tasks in any order.
+    """
+
+    def __init__(self):
+        self.suffix = uuid.uuid4().hex[:6]
+        self._placed: Dict[str, str] = {}  # plan-local id -> global id
+        self._missing: Dict[int, int] = {}  # held task -> count of unplaced dependencies
+        self._waiters: Dict[str, List[int]] = {}  # unplaced local id -> held tasks
+        self._held: Dict[int, dict] = {}
+        self._received = 0
+
+    def push(self, task: dict) -> List[dict]:
+        """Returns the tasks (this one and any it unblocked) that can be added now."""
+        self._received += 1
+        key = self._received
+        deps = [d for d in dict.fromkeys(task.get("dependencies", [])) if d not in self._placed]
+        if deps:
+            self._held[key] = task
+            self._missing[key] = len(deps)
+            for dep in deps:
+                self._waiters.setdefault(dep, []).append(key)
+            return []
+
+        released = []
+        stack = [task]
+        while stack:
+            current = stack.pop()
+            local_id = current.get("id") or uuid.uuid4().hex[:8]
+            self._placed[local_id] = f"{local_id}-{self.suffix}"
+            released.append({
+                **current,
+                "id": self._placed[local_id],
+                "dependencies": [self._placed[d] for d in current.get("dependencies", [])],
+            })
+            for waiter in self._waiters.pop(local_id, ()):
+                self._missing[waiter] -= 1
+                if self._missing[waiter] == 0:
+                    del self._missing[waiter]
+                    stack.append(self._held.pop(waiter))
+        return released
+
+    def leftovers(self) -> List[dict]:
+        """Tasks still waiting on dependencies that never arrived."""
+        return list(self._held.values())
+
 
 class Commander:
-    async def plan(self, user_request: str):
-        await blackboard.add_log("Commander", f"Neural engine analyzing: {user_request}")
-        
+    def __init__(self, streaming: bool = True):
+        self.streaming = streaming
+        # Recent planning round-trips, newest last
+        self.metrics: Deque[dict] = deque(maxlen=50)
+
+    async def plan(self, user_request: str, stream: Optional[bool] = None, priority: TaskPriority = TaskPriority.NORMAL,
+                   deadline: Optional[float] = None, mission_id: Optional[str] = None, project: Optional[Project] = None) -> str:
+        """
+        Plans `user_request` into tasks of one mission (`mission_id`, or a new one) of
+        `project` (the default one if None) and returns its id. The mission's tasks carry
+        `priority` and `deadline`. Raises AdmissionError if the project's Blackboard is too
+        backed up to take a new mission.
+        """
+        project = project or projects.default
+        board = project.board
+        assembler = PlanAssembler()
+        mission_id = mission_id or f"mission-{assembler.suffix}"
+        await project.admission.admit([mission_id])
+        mission = {"mission_id": mission_id, "priority": priority, "deadline": deadline}
+        await board.add_log("Commander", f"Neural engine analyzing: {user_request}")
+
         prompt = f"""
         You are the Commander of an AI Agent Swarm. 
         Analyze the user request and decompose it into a JSON list of tasks.
@@ -26,23 +106,103 @@ class Commander:
             ...
         ]
         """
-        
+
+        stream = self.streaming if stream is None else stream
+        metrics = {
+            "request": user_request[:120],
+            "mission_id": mission_id,
+            "project": project.id,
+            "mode": "streaming" if stream else "batch",
+            "started_at": time.time(),
+            "first_chunk_ms": None,
+            "first_task_ms": None,
+            "total_ms": None,
+            "tasks": 0,
+            "rejected": 0,
+            "fallback": False,
+        }
+        started = time.perf_counter()
+
+        def placed(count: int):
+            metrics["tasks"] += count
+            if count and metrics["first_task_ms"] is None:
+                metrics["first_task_ms"] = (time.perf_counter() - started) * 1000
+
+        async def add(task: dict):
+            try:
+                await board.add_task(Task(**task))
+            except ValueError as e:
+                # DependencyError or a malformed task from the LLM
+                metrics["rejected"] += 1
+                await board.add_log("Commander", f"Rejected task {task.get('id')}: {str(e)}")
+                return
+            placed(1)
+
+        async def place(task_data: dict):
+            for task in assembler.push(task_data):
+                await add({**task, **mission})
+
+        async def place_all(tasks_data: List[dict]):
+            # A whole plan goes in as one atomic batch; task by task only if some task is bad
+            released = [{**task, **mission} for data in tasks_data for task in assembler.push(data)]
+            try:
+                added = await board.add_tasks([Task(**task) for task in released])
+            except ValueError:
+                for task in released:
+                    await add(task)
+                return
+            placed(len(added))
+
         try:
-            raw_json = await llm_service.generate_json(prompt)
-            if not raw_json:
-                await blackboard.add_log("Commander", "Error: LLM service unavailable. Falling back to mock planner.")
-                tasks_data = self._mock_planner(user_request)
+            if stream:
+                planned = await self._plan_streaming(board, prompt, place, metrics, started)
             else:
-                tasks_data = json.loads(raw_json)
-                await blackboard.add_log("Commander", f"Successfully generated {len(tasks_data)} tasks via Gemini.")
+                planned = await self._plan_batch(board, prompt, place_all, metrics, started)
+            if not planned:
+                await board.add_log("Commander", "Error: LLM service unavailable. Falling back to mock planner.")
         except Exception as e:
-            await blackboard.add_log("Commander", f"Planning failed: {str(e)}. Falling back.")
-            tasks_data = self._mock_planner(user_request)
-        
-        for task in tasks_data:
-            await blackboard.add_task(Task(**task))
-            
-        await blackboard.add_log("Commander", "Mission deployment sequence complete.")
+            await board.add_log("Commander", f"Planning failed: {str(e)}. Falling back.")
+            # A stream that failed midway already deployed part of the mission; don't duplicate it
+            planned = metrics["tasks"] > 0
+
+        if not planned:
+            metrics["fallback"] = True
+            await place_all(self._mock_planner(user_request))
+
+        for task in assembler.leftovers():
+            metrics["rejected"] += 1
+            await board.add_log("Commander", f"Rejected task {task.get('id')}: dependencies never planned.")
+
+        metrics["total_ms"] = (time.perf_counter() - started) * 1000
+        self.metrics.append(metrics)
+        await board.add_log("Commander", "Mission deployment sequence complete.")
+        return mission_id
+
+    async def _plan_batch(self, board: Blackboard, prompt: str, place_all, metrics: dict, started: float) -> bool:
+        raw_json = await llm_service.generate_json(prompt)
+        if not raw_json:
+            return False
+        metrics["first_chunk_ms"] = (time.perf_counter() - started) * 1000
+        tasks_data = json.loads(raw_json)
+        await board.add_log("Commander", f"Successfully generated {len(tasks_data)} tasks via {llm_service.backend.name}.")
+        await place_all(tasks_data)
+        return True
+
+    async def _plan_streaming(self, board: Blackboard, prompt: str, place, metrics: dict, started: float) -> bool:
+        """Adds each task to the Blackboard as soon as its JSON object is complete."""
+        parser = JsonArrayStream()
+        received = 0
+        async for chunk in llm_service.stream_json(prompt):
+            if metrics["first_chunk_ms"] is None:
+                metrics["first_chunk_ms"] = (time.perf_counter() - started) * 1000
+            for task in parser.feed(chunk):
+                received += 1
+                await place(task)
+
+        if metrics["first_chunk_ms"] is None:
+            return False
+        await board.add_log("Commander", f"Streamed {received} tasks via {llm_service.backend.name}.")
+        return True
 
     def _mock_planner(self, user_request: str):
         return [
@@ -52,4 +212,4 @@ class Commander:
         ]
 
 # Singleton
-commander = Commander()
+commander = Commander(streaming=PLAN_STREAMING)
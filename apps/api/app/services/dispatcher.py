@@ -0,0 +1,390 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+from ..models.task import TaskStatus
+from ..models.agent import AgentStatus
+from ..models.records import AgentRecord, TaskRecord
+from ..core.broadcaster import broadcaster
+from ..core.metrics import metrics
+from .blackboard import Blackboard, LEASE_TTL
+
+CLAIMANT = "orchestrator"
+DISPATCH_POLICY = os.getenv("DISPATCH_POLICY", "ect")  # "ect" (earliest expected completion) or "least_loaded"
+AGENT_QUEUE_SIZE = int(os.getenv("AGENT_QUEUE_SIZE", "2"))  # Tasks waiting per agent, besides the running one
+DISPATCH_DEFAULT_DURATION = float(os.getenv("DISPATCH_DEFAULT_DURATION", "300"))  # Seconds, until durations are observed
+
+DISPATCH_SECONDS = metrics.histogram("dispatch_seconds", "Time the dispatcher spent handling one event, by event.", ["event"])
+DISPATCH_LAG = metrics.histogram("dispatch_lag_seconds", "Time events waited in the dispatcher's queue.")
+
+# trigger(agent, task): hands a started task to the agent, e.g. the IDE UI trigger
+Trigger = Callable[[Optional[AgentRecord], TaskRecord], Awaitable[object]]
+
+
+class DurationStats:
+    """Exponentially weighted mean of observed task durations."""
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self.mean: Optional[float] = None
+        self.samples = 0
+
+    def add(self, seconds: float):
+        self.mean = seconds if self.mean is None else self.alpha * seconds + (1 - self.alpha) * self.mean
+        self.samples += 1
+
+
+class Dispatcher:
+    """
+    Places ready tasks on registered agents.
+
+    Every agent has one running slot plus a bounded queue of tasks placed on it but not
+    started. A ready task goes to the capable agent (matching role or capability) with
+    the earliest expected completion time: the rest of its running task plus its queue
+    plus the new task, each estimated from that agent's observed durations (falling back
+    to the role's, then to DISPATCH_DEFAULT_DURATION). When every capable queue is full the
+    task simply stays PENDING in the Blackboard and is pulled as soon as room frees up.
+
+    A newly registered (or returning) agent, or one that ran out of work, takes over
+    queued work where that finishes it sooner, and an agent going OFFLINE has its
+    running and queued tasks re-placed.
+    Roles without any registered agent keep the IDE flow: the task is claimed, the UI is
+    triggered, and the IDE agent picks it up through MCP's fetch_next_task.
+
+    All decisions run on one coroutine fed by an event queue, so they never interleave.
+    That coroutine also moves agents between BUSY and IDLE as their tasks finish, so a
+    completion can't overwrite the start of an agent's next task.
+
+    Placement state lives in this process only. With several workers behind a broker each
+    worker runs its own dispatcher, and claims keep them from starting a task twice, but
+    per-agent queues and completion estimates are single-worker only.
+    """
+
+    def __init__(self, board: Blackboard, trigger: Trigger, policy: str = "ect", queue_size: int = 2, default_duration: float = 300):
+        self.board = board
+        self.trigger = trigger
+        self.policy = policy
+        self.queue_size = queue_size
+        self.default_duration = default_duration
+
+        self._capable: Dict[str, Set[str]] = {}  # role -> agents able to run it
+        self._queues: Dict[str, Deque[str]] = {}  # agent -> placed, not yet started
+        self._running: Dict[str, Tuple[str, float]] = {}  # agent -> (task, started)
+        self._placed: Dict[str, str] = {}  # task -> agent (queued or running)
+        self._offline: Set[str] = set()
+        self._agent_stats: Dict[str, DurationStats] = {}
+        self._role_stats: Dict[str, DurationStats] = {}
+
+        self._events: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._handoffs: Set[asyncio.Task] = set()
+
+    async def start(self):
+        self._events = asyncio.Queue()
+        for agent in self.board.agent_store.values():
+            self._index_agent(agent)
+        self.board.subscribe(self._on_mutation)
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker:
+            self._worker.cancel()
+            self._worker = None
+
+    def offer(self, task_id: str):
+        """Called with every task that became ready."""
+        self._events.put_nowait(("ready", task_id, time.monotonic()))
+
+    def load(self) -> Dict[str, int]:
+        """Tasks running and queued on agents, and events waiting to be handled."""
+        return {
+            "running": len(self._running),
+            "queued": sum(len(q) for q in self._queues.values()),
+            "backlog": self._events.qsize() if self._events else 0,
+        }
+
+    def stats(self) -> dict:
+        return {
+            "policy": self.policy,
+            **self.load(),
+            "agents": {
+                agent_id: {
+                    "running": self._running.get(agent_id, (None,))[0],
+                    "queued": list(queue),
+                    "mean_duration": self._agent_stats[agent_id].mean if agent_id in self._agent_stats else None,
+                    "offline": agent_id in self._offline,
+                }
+                for agent_id, queue in self._queues.items()
+            },
+        }
+
+    # --- Events -----------------------------------------------------------
+
+    def _on_mutation(self, kind: str, op: str, item_id: Optional[str], data: dict):
+        if self._events is None:
+            return
+        if kind == "task" and op == "update" and data.get("status", TaskStatus.IN_PROGRESS) != TaskStatus.IN_PROGRESS:
+            if item_id in self._placed or self.board.agent_for_task(item_id):
+                self._events.put_nowait(("task", item_id, time.monotonic()))
+        elif kind == "agent":
+            if op == "add":
+                self._events.put_nowait(("agent", item_id, time.monotonic()))
+            elif "status" in data and (data["status"] == AgentStatus.OFFLINE) != (item_id in self._offline):
+                self._events.put_nowait(("agent", item_id, time.monotonic()))
+
+    async def _run(self):
+        while True:
+            event, item_id, queued = await self._events.get()
+            started = time.monotonic()
+            DISPATCH_LAG.observe(started - queued)
+            try:
+                if event == "ready":
+                    await self._place_ready(item_id)
+                elif event == "task":
+                    await self._task_changed(item_id)
+                elif event == "agent":
+                    await self._agent_changed(item_id)
+            except Exception as e:
+                print(f"❌ Dispatcher error ({event} {item_id}): {e}")
+            DISPATCH_SECONDS.observe(time.monotonic() - started, event)
+
+    async def _task_changed(self, task_id: str):
+        task = self.board.get_task(task_id)
+        agent_id = self._placed.get(task_id)
+        if not task or task.status == TaskStatus.IN_PROGRESS:
+            return
+        if not agent_id:
+            # Run outside the dispatcher (the agent reported itself BUSY on it): only free the agent
+            agent = self.board.agent_for_task(task_id)
+            if agent and agent.status == AgentStatus.BUSY and agent.id not in self._running:
+                await self.board.update_agent_status(agent.id, AgentStatus.IDLE)
+            return
+
+        # Finished, failed or re-queued (lease expired): it no longer occupies the agent
+        del self._placed[task_id]
+        running = self._running.get(agent_id)
+        if running and running[0] == task_id:
+            del self._running[agent_id]
+            if task.status == TaskStatus.DONE:
+                self._record_duration(agent_id, task.role, time.monotonic() - running[1])
+            await self._start_next(agent_id)
+        else:
+            self._queues[agent_id].remove(task_id)
+        await self._fill(agent_id)
+        if agent_id not in self._running and agent_id not in self._offline:
+            # Ran dry: steal queued work from whoever would finish it later
+            self._rebalance(agent_id)
+            await self._start_next(agent_id)
+
+    async def _agent_changed(self, agent_id: str):
+        agent = self.board.get_agent(agent_id)
+        if not agent:
+            return
+        if agent_id not in self._queues:
+            self._index_agent(agent)
+            await self.board.add_log("Orchestrator", f"Node {agent_id} joined the pool; rebalancing {agent.role} work.")
+        elif agent.status == AgentStatus.OFFLINE:
+            await self._rescue(agent_id)
+            return
+        else:
+            self._offline.discard(agent_id)
+        self._rebalance(agent_id)
+        await self._start_next(agent_id)
+        await self._fill(agent_id)
+
+    # --- Placement --------------------------------------------------------
+
+    def _index_agent(self, agent: AgentRecord):
+        self._queues.setdefault(agent.id, deque())
+        for role in (agent.role, *agent.capabilities):
+            self._capable.setdefault(role, set()).add(agent.id)
+        if agent.status == AgentStatus.OFFLINE:
+            self._offline.add(agent.id)
+
+    def expected(self, agent_id: str, role: str) -> float:
+        stats = self._agent_stats.get(agent_id)
+        if stats and stats.mean is not None:
+            return stats.mean
+        stats = self._role_stats.get(role)
+        return stats.mean if stats and stats.mean is not None else self.default_duration
+
+    def completion_time(self, agent_id: str, role: str, extra: int = 1, now: Optional[float] = None) -> float:
+        """Expected seconds until `extra` more tasks of `role` placed on this agent would be done."""
+        per_task = self.expected(agent_id, role)
+        remaining = 0.0
+        running = self._running.get(agent_id)
+        if running:
+            elapsed = (now or time.monotonic()) - running[1]
+            # A task running past the estimate says this agent is slower than we thought
+            per_task = max(per_task, elapsed)
+            remaining = per_task - elapsed
+        return remaining + (len(self._queues[agent_id]) + extra) * per_task
+
+    def _choose(self, role: str, exclude: Optional[str] = None) -> Optional[str]:
+        now = time.monotonic()
+        best, best_key = None, None
+        for agent_id in self._capable.get(role, ()):
+            queued = len(self._queues[agent_id])
+            if agent_id == exclude or agent_id in self._offline or queued >= self.queue_size:
+                continue
+            busy = agent_id in self._running
+            if self.policy == "least_loaded":
+                if not busy and not queued:
+                    return agent_id  # Can't do better than an idle agent
+                key = (queued + busy, self.completion_time(agent_id, role, now=now))
+            else:
+                key = (self.completion_time(agent_id, role, now=now),)
+            if best_key is None or key < best_key:
+                best, best_key = agent_id, key
+        return best
+
+    def _has_agents(self, role: str) -> bool:
+        return any(a not in self._offline for a in self._capable.get(role, ()))
+
+    async def _place_ready(self, task_id: str):
+        """
+        A task of some role became ready: places the role's most urgent ready task, in
+        ready-queue order (fair across missions, critical path first), which need not be
+        this one. Every ready task gets its own event, so none is left behind while there
+        is room.
+        """
+        task = self.board.get_task(task_id)
+        if not task:
+            return
+        # Even if this one was already claimed by an earlier event, that event left one behind
+        role = task.role
+        if not self._has_agents(role):
+            # IDE flow: nobody to place it on, so hand it straight to the IDE window
+            task = await self.board.claim_next_task(role, CLAIMANT)
+            if task:
+                self._handoff(None, task)
+            return
+
+        agent_id = self._choose(role)
+        if agent_id is None:
+            return  # Every capable agent is saturated; stays PENDING until _fill pulls it
+        # Leased for as long as it is expected to wait in the queue
+        ttl = LEASE_TTL + self.completion_time(agent_id, role)
+        task = await self.board.claim_next_task(role, CLAIMANT, ttl=ttl)
+        if task:
+            await self._enqueue(agent_id, task)
+
+    async def _enqueue(self, agent_id: str, task: TaskRecord):
+        self._placed[task.id] = agent_id
+        self._queues[agent_id].append(task.id)
+        if agent_id not in self._running:
+            await self._start_next(agent_id)
+
+    async def _fill(self, agent_id: str):
+        """
+        Pulls PENDING work that was left waiting for room, while this agent has any. Each
+        pulled task still goes where it completes earliest, which need not be this agent.
+        """
+        if agent_id in self._offline:
+            return
+        agent = self.board.get_agent(agent_id)
+        for role in (agent.role, *agent.capabilities):
+            while len(self._queues[agent_id]) < self.queue_size:
+                target = self._choose(role)
+                if target is None:
+                    break
+                ttl = LEASE_TTL + self.completion_time(target, role)
+                task = await self.board.claim_next_task(role, CLAIMANT, ttl=ttl)
+                if not task:
+                    break
+                await self._enqueue(target, task)
+
+    def _rebalance(self, agent_id: str):
+        """Moves queued (not started) work onto `agent_id` while that finishes it sooner."""
+        agent = self.board.get_agent(agent_id)
+        roles = (agent.role, *agent.capabilities)
+        moved = True
+        while moved and len(self._queues[agent_id]) < self.queue_size:
+            moved = False
+            donor, donor_ect = None, 0.0
+            for role in roles:
+                for other in self._capable.get(role, ()):
+                    if other == agent_id or not self._queues[other]:
+                        continue
+                    last = self.board.get_task(self._queues[other][-1])
+                    if last.role not in roles:
+                        continue
+                    ect = self.completion_time(other, last.role, extra=0)
+                    if ect > donor_ect:
+                        donor, donor_ect = other, ect
+            if donor is None:
+                break
+            task_id = self._queues[donor][-1]
+            role = self.board.get_task(task_id).role
+            if self.completion_time(agent_id, role) < donor_ect:
+                self._queues[donor].pop()
+                self._queues[agent_id].append(task_id)
+                self._placed[task_id] = agent_id
+                moved = True
+
+    async def _rescue(self, agent_id: str):
+        """Re-places everything an agent that went OFFLINE was holding."""
+        self._offline.add(agent_id)
+        orphans = list(self._queues[agent_id])
+        self._queues[agent_id].clear()
+        running = self._running.pop(agent_id, None)
+        if running:
+            orphans.insert(0, running[0])
+        if not orphans:
+            return
+        await self.board.add_log("Orchestrator", f"Node {agent_id} went offline; rescuing {len(orphans)} tasks.")
+
+        for task_id in orphans:
+            del self._placed[task_id]
+            task = self.board.get_task(task_id)
+            target = self._choose(task.role)
+            if target:
+                self.board.heartbeat(task_id, ttl=LEASE_TTL + self.completion_time(target, task.role))
+                await self._enqueue(target, task)
+            else:
+                # Nowhere to put it right now: back to PENDING, where the next free agent pulls it
+                await self.board.update_task_status(task_id, TaskStatus.PENDING)
+
+    # --- Execution --------------------------------------------------------
+
+    async def _start_next(self, agent_id: str):
+        if agent_id in self._running or agent_id in self._offline:
+            return
+        queue = self._queues[agent_id]
+        if not queue:
+            agent = self.board.get_agent(agent_id)
+            if agent and agent.status == AgentStatus.BUSY:
+                await self.board.update_agent_status(agent_id, AgentStatus.IDLE)
+            return
+
+        task = self.board.get_task(queue.popleft())
+        self._running[agent_id] = (task.id, time.monotonic())
+        # Its queue wait is over: back to the normal lease, renewed by the agent's heartbeats
+        self.board.heartbeat(task.id, ttl=LEASE_TTL)
+        await self.board.add_log("Orchestrator", f"Dispatching mission to targeted Node: {agent_id}")
+        await self.board.update_agent_status(agent_id, AgentStatus.BUSY, task_id=task.id)
+        # Emit specifically to the agent's room
+        await broadcaster.emit("task_assigned", {"task": task.to_dict()}, room=agent_id)
+        self._handoff(self.board.get_agent(agent_id), task)
+
+    def _handoff(self, agent: Optional[AgentRecord], task: TaskRecord):
+        # The trigger may queue behind the IDE window; dispatching never waits for it
+        handoff = asyncio.create_task(self._trigger(agent, task))
+        self._handoffs.add(handoff)
+        handoff.add_done_callback(self._handoffs.discard)
+
+    async def _trigger(self, agent: Optional[AgentRecord], task: TaskRecord):
+        try:
+            await self.trigger(agent, task)
+        except Exception as e:
+            # Fail the task (as long as nobody took it over) so the agent moves on to its next one
+            current = self.board.get_task(task.id)
+            if current and current.status == TaskStatus.IN_PROGRESS and current.claimed_by == CLAIMANT:
+                await self.board.update_task_status(task.id, TaskStatus.ERROR, result=str(e))
+            await self.board.add_log(task.role, f"ERROR: System breach or failure: {str(e)}")
+
+    def _record_duration(self, agent_id: str, role: str, seconds: float):
+        self._agent_stats.setdefault(agent_id, DurationStats()).add(seconds)
+        self._role_stats.setdefault(role, DurationStats()).add(seconds)
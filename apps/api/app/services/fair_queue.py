@@ -0,0 +1,186 @@
+import heapq
+import itertools
+import math
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..models.task import TaskPriority
+
+READY_QUEUE_POLICY = os.getenv("READY_QUEUE_POLICY", "fair")  # "fair" (per-mission WFQ + EDF) or "fifo"
+
+# Share of the agents a mission gets while others compete, by its priority class
+PRIORITY_WEIGHTS = {TaskPriority.LOW: 1.0, TaskPriority.NORMAL: 2.0, TaskPriority.HIGH: 4.0}
+_RANK = {TaskPriority.HIGH: 0, TaskPriority.NORMAL: 1, TaskPriority.LOW: 2}
+
+Entry = Tuple[float, int, float, int, str]  # (deadline, priority rank, -criticality, seq, task id)
+
+
+class _Flow:
+    """One mission's ready tasks for one role, earliest deadline first."""
+
+    __slots__ = ("heap", "finish", "weights")
+
+    def __init__(self):
+        self.heap: List[Entry] = []
+        self.finish = 0.0  # Virtual time at which its last dequeued task "finished"
+        self.weights: Dict[TaskPriority, int] = {}  # Queued tasks per priority class
+
+    def weight(self) -> float:
+        return max(PRIORITY_WEIGHTS[p] for p, n in self.weights.items() if n)
+
+
+class _RoleQueue:
+    def __init__(self):
+        self.flows: Dict[Optional[str], _Flow] = {}
+        self.vtime = 0.0
+
+
+class FairQueue:
+    """
+    Ready PENDING tasks per role, in the order they should be claimed.
+
+    Within a role, each mission is a flow and flows share the role by weighted fair
+    queueing: every dequeue charges the chosen flow 1/weight of virtual time and the
+    flow that has used the least goes next, so a mission with ten thousand queued tasks
+    gets its share of the agents instead of all of them. A flow's weight is that of the
+    highest priority class it has queued (PRIORITY_WEIGHTS). A flow that goes idle and
+    comes back starts at the role's current virtual time, so it can't bank credit.
+    Within a flow, tasks go earliest deadline first; tasks without one follow, by
+    priority, then by `critical` (the longest remaining chain of work a task starts,
+    when set; see MissionAnalytics), then in arrival order. Tasks without a mission
+    share one flow.
+
+    With policy "fifo" all tasks of a role form one flow in arrival order.
+
+    Entries are only hints: `pop` checks each against `accept` (still PENDING and ready)
+    and skips stale ones, so claims made by id elsewhere need no bookkeeping here beyond
+    `discard`.
+    """
+
+    def __init__(self, policy: str = "fair"):
+        self.policy = policy
+        self._roles: Dict[str, _RoleQueue] = {}
+        self._queued: Dict[str, Tuple[str, Optional[str], TaskPriority, int]] = {}  # task -> (role, mission, priority, seq)
+        self._seq = itertools.count()
+        self._stale = 0  # Heap entries whose task was discarded
+        self.critical: Optional[Callable[[str], float]] = None
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._queued
+
+    def push(self, task):
+        """Queues a ready task (a TaskRecord); pushing one that is already queued does nothing."""
+        if task.id in self._queued:
+            return
+        fair = self.policy == "fair"
+        mission = task.mission_id if fair else None
+        deadline = task.deadline if fair and task.deadline is not None else math.inf
+        rank = _RANK[task.priority] if fair else 0
+        critical = -self.critical(task.id) if fair and self.critical else 0.0
+
+        role = self._roles.get(task.role)
+        if role is None:
+            role = self._roles[task.role] = _RoleQueue()
+        flow = role.flows.get(mission)
+        if flow is None:
+            flow = role.flows[mission] = _Flow()
+            flow.finish = role.vtime
+        elif not flow.heap:
+            flow.finish = max(flow.finish, role.vtime)
+        seq = next(self._seq)
+        heapq.heappush(flow.heap, (deadline, rank, critical, seq, task.id))
+        flow.weights[task.priority] = flow.weights.get(task.priority, 0) + 1
+        self._queued[task.id] = (task.role, mission, task.priority, seq)
+
+    def reprioritize(self, task):
+        """Re-queues a queued task whose ordering inputs (e.g. its criticality) changed."""
+        if task.id in self._queued:
+            self._forget(task.id)
+            self._stale += 1
+            self.push(task)
+
+    def discard(self, task_id: str):
+        """Forgets a task that was claimed or finished some other way; its heap entry is skipped later."""
+        if self._forget(task_id):
+            self._stale += 1
+            if self._stale > max(1024, len(self._queued)):
+                self._compact()
+
+    def pop(self, role: str, accept: Callable[[str], bool]) -> Optional[str]:
+        """Removes and returns the next task id of `role` that `accept`s, skipping stale entries."""
+        queue = self._roles.get(role)
+        if queue is None:
+            return None
+        while True:
+            flow_key, flow = self._next_flow(queue)
+            if flow is None:
+                return None
+            *_, seq, task_id = heapq.heappop(flow.heap)
+            queued = self._queued.get(task_id)
+            if queued is None or queued[3] != seq:
+                self._stale -= 1
+                continue  # Discarded, or since re-queued under a newer entry
+            weight = flow.weight()
+            self._forget(task_id)
+            if not accept(task_id):
+                continue
+            queue.vtime = flow.finish
+            flow.finish += 1 / weight
+            if not flow.heap:
+                del queue.flows[flow_key]
+            return task_id
+
+    def peek(self, role: str, limit: int) -> List[str]:
+        """Up to `limit` queued task ids of `role` in claim order, without dequeuing them (for inspection)."""
+        queue = self._roles.get(role)
+        if queue is None:
+            return []
+        ordered = sorted(
+            (flow.finish, entry[:4], entry[4])
+            for flow in queue.flows.values()
+            for entry in flow.heap
+            if self._live(entry)
+        )
+        return [task_id for _, _, task_id in ordered[:limit]]
+
+    def pending(self) -> Dict[str, Dict[Optional[str], int]]:
+        """Queued tasks per role and mission."""
+        counts: Dict[str, Dict[Optional[str], int]] = {}
+        for role, mission, _, _ in self._queued.values():
+            per_role = counts.setdefault(role, {})
+            per_role[mission] = per_role.get(mission, 0) + 1
+        return counts
+
+    def _forget(self, task_id: str) -> bool:
+        queued = self._queued.pop(task_id, None)
+        if queued is None:
+            return False
+        role, mission, priority, _ = queued
+        self._roles[role].flows[mission].weights[priority] -= 1
+        return True
+
+    def _live(self, entry: Entry) -> bool:
+        queued = self._queued.get(entry[4])
+        return queued is not None and queued[3] == entry[3]
+
+    def _compact(self):
+        for queue in self._roles.values():
+            for key, flow in list(queue.flows.items()):
+                flow.heap = [entry for entry in flow.heap if self._live(entry)]
+                heapq.heapify(flow.heap)
+                if not flow.heap:
+                    del queue.flows[key]
+        self._stale = 0
+
+    def _next_flow(self, queue: _RoleQueue) -> Tuple[Optional[str], Optional[_Flow]]:
+        best_key, best = None, None
+        for key, flow in list(queue.flows.items()):
+            if not flow.heap:
+                del queue.flows[key]
+                continue
+            if best is None or flow.finish < best.finish:
+                best_key, best = key, flow
+        return best_key, best
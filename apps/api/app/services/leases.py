@@ -0,0 +1,97 @@
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass
+class Lease:
+    task_id: str
+    owner: str
+    expires_at: float
+    role: Optional[str] = None
+
+
+class LeaseTable:
+    """
+    Task leases with a TTL. Expiry is tracked with a min-heap of (expires_at, task_id);
+    renewed or released leases leave stale heap entries that are skipped lazily.
+    Leases are also indexed by (owner, role), oldest first, so the tasks a claimant
+    holds are found without scanning every task in progress.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._leases: Dict[str, Lease] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._held: Dict[Tuple[str, Optional[str]], Dict[str, None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._leases)
+
+    def get(self, task_id: str) -> Optional[Lease]:
+        return self._leases.get(task_id)
+
+    def grant(self, task_id: str, owner: str, ttl: Optional[float] = None, role: Optional[str] = None) -> Lease:
+        self.release(task_id)
+        lease = Lease(task_id, owner, time.monotonic() + (ttl or self.ttl), role)
+        self._leases[task_id] = lease
+        self._hold(lease)
+        heapq.heappush(self._heap, (lease.expires_at, task_id))
+        return lease
+
+    def transfer(self, task_id: str, owner: str, claimant: str, ttl: Optional[float] = None) -> Optional[Lease]:
+        """Passes a lease held by `owner` to `claimant` and renews it; None if `owner` doesn't hold it."""
+        lease = self._leases.get(task_id)
+        if not lease or lease.owner != owner:
+            return None
+        self._unhold(lease)
+        lease.owner = claimant
+        self._hold(lease)
+        return self.renew(task_id, claimant, ttl)
+
+    def held(self, owner: str, role: Optional[str] = None) -> List[str]:
+        """Tasks leased to `owner` for `role`, oldest grant first."""
+        return list(self._held.get((owner, role), ()))
+
+    def holders(self, role: Optional[str] = None) -> List[str]:
+        """Owners holding at least one lease for `role`."""
+        return [owner for owner, held_role in self._held if held_role == role]
+
+    def renew(self, task_id: str, owner: Optional[str] = None, ttl: Optional[float] = None) -> Optional[Lease]:
+        lease = self._leases.get(task_id)
+        if not lease or (owner and lease.owner != owner):
+            return None
+        lease.expires_at = time.monotonic() + (ttl or self.ttl)
+        heapq.heappush(self._heap, (lease.expires_at, task_id))
+        return lease
+
+    def release(self, task_id: str) -> Optional[Lease]:
+        lease = self._leases.pop(task_id, None)
+        if lease:
+            self._unhold(lease)
+        return lease
+
+    def pop_expired(self, now: Optional[float] = None) -> List[Lease]:
+        now = time.monotonic() if now is None else now
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, task_id = heapq.heappop(self._heap)
+            lease = self._leases.get(task_id)
+            # Skip entries superseded by a renewal or a release
+            if lease and lease.expires_at == expires_at:
+                del self._leases[task_id]
+                self._unhold(lease)
+                expired.append(lease)
+        return expired
+
+    def _hold(self, lease: Lease):
+        self._held.setdefault((lease.owner, lease.role), {})[lease.task_id] = None
+
+    def _unhold(self, lease: Lease):
+        key = (lease.owner, lease.role)
+        held = self._held.get(key)
+        if held is not None:
+            held.pop(lease.task_id, None)
+            if not held:
+                del self._held[key]
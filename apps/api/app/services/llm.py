@@ -1,30 +1,272 @@
-import google.generativeai as genai
+import asyncio
+import hashlib
+import json
 import os
-from dotenv import load_dotenv
+import random
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
 
-load_dotenv()
+from ..core.lazy import Lazy
+from ..core.metrics import metrics
 
-class LLMService:
-    def __init__(self):
-        self.api_key = os.getenv("GEMINI_API_KEY")
-        if self.api_key:
-            genai.configure(api_key=self.api_key)
-            self.model = genai.GenerativeModel('gemini-1.5-flash') # Using flash for speed
-        else:
-            self.model = None
-            print("⚠️ WARNING: GEMINI_API_KEY not found in environment.")
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")  # "gemini" or "fake" (offline, no API key needed)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))  # Seconds per attempt
+LLM_RETRIES = int(os.getenv("LLM_RETRIES", "2"))  # Extra attempts after the first
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "256"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))  # Seconds; 0 disables the cache
 
-    async def generate_json(self, prompt: str):
-        if not self.model:
-            return None
-        
+LLM_SECONDS = metrics.histogram("llm_request_seconds", "LLM attempts including the wait for a concurrency slot, by mode (call/stream) and outcome.", ["mode", "outcome"])
+LLM_LOOKUPS = metrics.counter("llm_requests", "LLM requests, by how they were served (backend/cache/shared).", ["served"])
+
+
+class GeminiBackend:
+    """Gemini via the SDK's native async call, so the event loop is never blocked."""
+
+    def __init__(self, api_key: str, model_name: str = "gemini-1.5-flash"):
+        # The SDK takes most of a second to import; only pay for it when Gemini is used
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self.name = model_name
+        self.model = genai.GenerativeModel(model_name)  # Using flash for speed
+
+    async def generate_json(self, prompt: str) -> str:
         # Enforce JSON output
-        response = self.model.generate_content(
+        response = await self.model.generate_content_async(
             prompt,
-            generation_config=genai.types.GenerationConfig(
+            generation_config=self._genai.types.GenerationConfig(
                 response_mime_type="application/json",
             )
         )
         return response.text
 
-llm_service = LLMService()
+    async def generate_json_stream(self, prompt: str) -> AsyncIterator[str]:
+        response = await self.model.generate_content_async(
+            prompt,
+            generation_config=self._genai.types.GenerationConfig(
+                response_mime_type="application/json",
+            ),
+            stream=True,
+        )
+        async for chunk in response:
+            yield chunk.text
+
+
+class FakeLLMBackend:
+    """
+    Offline backend with configurable latency. `responder(prompt)` builds the reply;
+    the default returns a small Architect -> Coder -> Reviewer plan. When streaming,
+    the first chunk arrives after `latency` and each further `chunk_size` characters
+    after another `chunk_latency`.
+    """
+
+    def __init__(self, latency: float = 0.2, responder: Optional[Callable[[str], str]] = None, chunk_size: int = 64, chunk_latency: float = 0.0):
+        self.name = "fake"
+        self.latency = latency
+        self.responder = responder or self._default_plan
+        self.chunk_size = chunk_size
+        self.chunk_latency = chunk_latency
+        self.calls = 0
+
+    async def generate_json(self, prompt: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        text = self.responder(prompt)
+        # A non-streaming call still waits for the whole reply to be generated
+        await asyncio.sleep(self.chunk_latency * (len(text) // self.chunk_size))
+        return text
+
+    async def generate_json_stream(self, prompt: str) -> AsyncIterator[str]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        text = self.responder(prompt)
+        for i in range(0, len(text), self.chunk_size):
+            if i:
+                await asyncio.sleep(self.chunk_latency)
+            yield text[i:i + self.chunk_size]
+
+    @staticmethod
+    def _default_plan(prompt: str) -> str:
+        return json.dumps([
+            {"id": "design", "description": "Design the solution", "role": "Architect", "dependencies": []},
+            {"id": "build", "description": "Implement the design", "role": "Coder", "dependencies": ["design"]},
+            {"id": "review", "description": "Review the implementation", "role": "Reviewer", "dependencies": ["build"]},
+        ])
+
+
+class ResponseCache:
+    """Content-addressed LRU cache with a TTL, keyed by sha256(model + prompt)."""
+
+    def __init__(self, max_entries: int = 256, ttl: float = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    @staticmethod
+    def key(model: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model}\0{prompt}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: str, value: str):
+        if self.ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class LLMService:
+    """
+    Concurrency-limited, retried and cached access to the backend. With a `loader` the
+    backend is built on first use (or when the API warms it up), not at import.
+    """
+
+    def __init__(self, backend=None, max_concurrency: int = 4, timeout: float = 60, retries: int = 2, cache: Optional[ResponseCache] = None,
+                 loader: Optional[Lazy] = None):
+        self.backend = backend
+        self.loader = loader
+        self.timeout = timeout
+        self.retries = retries
+        self.cache = cache or ResponseCache()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # Identical prompts already in flight share one backend call
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def model(self):
+        # Kept for callers that only check whether an LLM is configured
+        return self.backend
+
+    async def load(self):
+        """Builds the backend through `loader` unless one is already set (e.g. a fake assigned by a benchmark)."""
+        if self.backend is None and self.loader is not None:
+            self.backend = await self.loader.aget()
+        return self.backend
+
+    async def generate_json(self, prompt: str):
+        if not await self.load():
+            return None
+
+        key = ResponseCache.key(self.backend.name, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            LLM_LOOKUPS.inc("cache")
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight:
+            LLM_LOOKUPS.inc("shared")
+            return await asyncio.shield(inflight)
+        LLM_LOOKUPS.inc("backend")
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            text = await self._call_with_retries(prompt)
+            self.cache.put(key, text)
+            future.set_result(text)
+            return text
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def stream_json(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Yields the reply as it is generated. Failures are retried only until the first
+        chunk has been yielded; cache hits arrive as a single chunk.
+        """
+        if not await self.load():
+            return
+
+        key = ResponseCache.key(self.backend.name, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            LLM_LOOKUPS.inc("cache")
+            yield cached
+            return
+        if not hasattr(self.backend, "generate_json_stream"):
+            yield await self.generate_json(prompt)
+            return
+        LLM_LOOKUPS.inc("backend")
+
+        for attempt in range(self.retries + 1):
+            parts: List[str] = []
+            started = time.perf_counter()
+            try:
+                async with self._semaphore:
+                    stream = self.backend.generate_json_stream(prompt).__aiter__()
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(stream.__anext__(), self.timeout)
+                        except StopAsyncIteration:
+                            break
+                        parts.append(chunk)
+                        yield chunk
+                    LLM_SECONDS.observe(time.perf_counter() - started, "stream", "ok")
+                self.cache.put(key, "".join(parts))
+                return
+            except Exception as e:
+                LLM_SECONDS.observe(time.perf_counter() - started, "stream", type(e).__name__)
+                if parts or attempt == self.retries:
+                    raise
+                delay = random.uniform(0, min(8.0, 0.5 * 2 ** attempt))
+                print(f"⚠️ LLM stream failed ({type(e).__name__}: {e}). Retrying in {delay:.2f}s...")
+                await asyncio.sleep(delay)
+
+    async def _call_with_retries(self, prompt: str) -> str:
+        for attempt in range(self.retries + 1):
+            started = time.perf_counter()
+            try:
+                async with self._semaphore:
+                    text = await asyncio.wait_for(self.backend.generate_json(prompt), self.timeout)
+                    LLM_SECONDS.observe(time.perf_counter() - started, "call", "ok")
+                    return text
+            except Exception as e:
+                LLM_SECONDS.observe(time.perf_counter() - started, "call", type(e).__name__)
+                if attempt == self.retries:
+                    raise
+                # Exponential backoff with full jitter
+                delay = random.uniform(0, min(8.0, 0.5 * 2 ** attempt))
+                print(f"⚠️ LLM call failed ({type(e).__name__}: {e}). Retrying in {delay:.2f}s...")
+                await asyncio.sleep(delay)
+
+
+def _build_backend():
+    if LLM_BACKEND == "fake":
+        return FakeLLMBackend()
+    api_key = os.getenv("GEMINI_API_KEY")
+    if api_key:
+        return GeminiBackend(api_key)
+    print("⚠️ WARNING: GEMINI_API_KEY not found in environment.")
+    return None
+
+
+llm_service = LLMService(
+    loader=Lazy("llm", _build_backend),
+    max_concurrency=LLM_MAX_CONCURRENCY,
+    timeout=LLM_TIMEOUT,
+    retries=LLM_RETRIES,
+    cache=ResponseCache(max_entries=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL),
+)
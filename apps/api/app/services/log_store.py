@@ -0,0 +1,169 @@
+import heapq
+import json
+import os
+import time
+from collections import deque
+from typing import Deque, Dict, Iterator, List, NamedTuple, Optional
+
+
+class LogEntry(NamedTuple):
+    seq: int
+    ts: float
+    agent: str
+    message: str
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+
+class SegmentWriter:
+    """
+    Append-only JSON-lines segments named `logs-<first_seq>.jsonl`, rotated every
+    `max_entries` lines. Holds history beyond the in-memory ring buffers.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 50000):
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+        self._file = None
+        self._count = 0
+
+    def segments(self) -> List[str]:
+        names = [n for n in os.listdir(self.directory) if n.startswith("logs-") and n.endswith(".jsonl")]
+        return [os.path.join(self.directory, n) for n in sorted(names, key=_segment_start)]
+
+    def last_seq(self) -> int:
+        for path in reversed(self.segments()):
+            with open(path, "rb") as f:
+                lines = f.read().splitlines()
+            for line in reversed(lines):
+                try:
+                    return json.loads(line)[0]
+                except ValueError:
+                    continue  # Torn write at the tail
+        return 0
+
+    def append(self, entry: LogEntry):
+        if self._file is None or self._count >= self.max_entries:
+            self._rotate(entry.seq)
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._count += 1
+
+    def read(self, agent: Optional[str], after_seq: int, until_seq: Optional[int]) -> Iterator[LogEntry]:
+        if self._file:
+            self._file.flush()
+        paths = self.segments()
+        for i, path in enumerate(paths):
+            # Skip segments that end before the requested range starts
+            if i + 1 < len(paths) and _segment_start(paths[i + 1]) <= after_seq + 1:
+                continue
+            if until_seq is not None and _segment_start(path) > until_seq:
+                break
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = LogEntry(*json.loads(line))
+                    except (ValueError, TypeError):
+                        continue
+                    if entry.seq <= after_seq or (agent and entry.agent != agent):
+                        continue
+                    if until_seq is not None and entry.seq > until_seq:
+                        return
+                    yield entry
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _rotate(self, first_seq: int):
+        self.close()
+        path = os.path.join(self.directory, f"logs-{first_seq}.jsonl")
+        self._file = open(path, "a", encoding="utf-8")
+        self._count = 0
+
+
+def _segment_start(path: str) -> int:
+    return int(os.path.basename(path)[len("logs-"):-len(".jsonl")])
+
+
+class LogStore:
+    """
+    Per-agent ring buffers of `capacity` entries, each stamped with a wall-clock
+    timestamp and a global monotonic sequence number so clients can page by range.
+    """
+
+    def __init__(self, capacity: int = 1000, segment_dir: Optional[str] = None, segment_max_entries: int = 50000):
+        self.capacity = capacity
+        self._buffers: Dict[str, Deque[LogEntry]] = {}
+        self._segments = SegmentWriter(segment_dir, segment_max_entries) if segment_dir else None
+        self.seq = self._segments.last_seq() if self._segments else 0
+
+    def agents(self) -> List[str]:
+        return list(self._buffers)
+
+    def append(self, agent: str, message: str, ts: Optional[float] = None) -> LogEntry:
+        """`ts` keeps the time of an entry written elsewhere (e.g. by another worker)."""
+        self.seq += 1
+        entry = LogEntry(self.seq, time.time() if ts is None else ts, agent, message)
+        buffer = self._buffers.get(agent)
+        if buffer is None:
+            buffer = self._buffers[agent] = deque(maxlen=self.capacity)
+        buffer.append(entry)
+        if self._segments:
+            self._segments.append(entry)
+        return entry
+
+    def restore(self, entry: LogEntry):
+        """Puts a recovered entry back into memory without writing it to the segments again."""
+        buffer = self._buffers.get(entry.agent)
+        if buffer is None:
+            buffer = self._buffers[entry.agent] = deque(maxlen=self.capacity)
+        buffer.append(entry)
+        self.seq = max(self.seq, entry.seq)
+
+    def entries(self) -> List[LogEntry]:
+        return list(heapq.merge(*self._buffers.values()))
+
+    def messages(self, agent: str) -> List[str]:
+        return [e.message for e in self._buffers.get(agent, ())]
+
+    def page(self, agent: Optional[str] = None, after_seq: int = 0, until_seq: Optional[int] = None, limit: int = 100) -> List[LogEntry]:
+        """Entries with after_seq < seq <= until_seq, oldest first, at most `limit`."""
+        buffers = [self._buffers.get(agent, ())] if agent else list(self._buffers.values())
+        in_memory = heapq.merge(*(self._tail(b, after_seq) for b in buffers))
+
+        # Only full buffers have dropped entries; everything after their first entry is in memory
+        evicted_until = max((b[0].seq - 1 for b in buffers if b and len(b) == b.maxlen), default=0)
+        result: List[LogEntry] = []
+        if self._segments and after_seq < evicted_until:
+            stop = evicted_until if until_seq is None else min(evicted_until, until_seq)
+            for entry in self._segments.read(agent, after_seq, stop):
+                result.append(entry)
+                if len(result) >= limit:
+                    return result
+            after_seq = evicted_until
+
+        for entry in in_memory:
+            if entry.seq <= after_seq:
+                continue
+            if until_seq is not None and entry.seq > until_seq or len(result) >= limit:
+                break
+            result.append(entry)
+        return result
+
+    def close(self):
+        if self._segments:
+            self._segments.close()
+
+    @staticmethod
+    def _tail(buffer: Deque[LogEntry], after_seq: int) -> List[LogEntry]:
+        # Reconnecting clients usually want the last few entries: walk back from the end
+        tail = []
+        for entry in reversed(buffer):
+            if entry.seq <= after_seq:
+                break
+            tail.append(entry)
+        tail.reverse()
+        return tail
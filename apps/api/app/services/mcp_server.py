@@ -1,13 +1,20 @@
 from mcp.server import Server
 import mcp.types as types
+import time
 from typing import Optional
-from .blackboard import blackboard
+from .projects import projects, ProjectError
+from .blackboard import POLLER_CLAIMANT
+from .dispatcher import CLAIMANT as DISPATCHER
+from ..core.metrics import metrics
 from ..models.task import TaskStatus
-from ..models.agent import AgentStatus
 
 # Create an MCP Server
 mcp_server = Server("antigravity-orchestrator")
 
+TOOLS = {"fetch_next_task", "heartbeat_task", "submit_task_completion", "submit_task_completions", "send_command", "send_commands", "poll_tasks"}
+PROJECT = {"type": "string", "description": "Project of the tasks; the default project when omitted"}
+TOOL_SECONDS = metrics.histogram("mcp_tool_seconds", "MCP tool call latency, by tool and outcome.", ["tool", "outcome"])
+
 @mcp_server.list_tools()
 async def list_tools() -> list[types.Tool]:
     """List available tools for IDE agents."""
@@ -18,17 +25,33 @@ async def list_tools() -> list[types.Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "role": {"type": "string", "description": "The role of the agent (e.g., Coder, Reviewer)"}
+                    "project": PROJECT,
+                    "role": {"type": "string", "description": "The role of the agent (e.g., Coder, Reviewer)"},
+                    "agent_id": {"type": "string", "description": "Optional identity used as the lease owner"}
                 },
                 "required": ["role"]
             }
         ),
+        types.Tool(
+            name="heartbeat_task",
+            description="Extends the lease on a task you are working on so it is not re-queued.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "project": PROJECT,
+                    "task_id": {"type": "string", "description": "The ID of the task"},
+                    "agent_id": {"type": "string", "description": "The identity given to fetch_next_task, if any"}
+                },
+                "required": ["task_id"]
+            }
+        ),
         types.Tool(
             name="submit_task_completion",
             description="Reports completion of a task.",
             inputSchema={
                 "type": "object",
                 "properties": {
+                    "project": PROJECT,
                     "task_id": {"type": "string", "description": "The ID of the task"},
                     "result": {"type": "string", "description": "The outcome or summary of the work"}
                 },
@@ -41,18 +64,66 @@ async def list_tools() -> list[types.Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
+                    "project": PROJECT,
                     "target_role": {"type": "string", "description": "The role to receive the task"},
                     "description": {"type": "string", "description": "Details of the command"}
                 },
                 "required": ["target_role", "description"]
             }
         ),
+        types.Tool(
+            name="submit_task_completions",
+            description="Reports completion of several tasks at once (all or nothing).",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "project": PROJECT,
+                    "completions": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "task_id": {"type": "string"},
+                                "result": {"type": "string"}
+                            },
+                            "required": ["task_id", "result"]
+                        }
+                    }
+                },
+                "required": ["completions"]
+            }
+        ),
+        types.Tool(
+            name="send_commands",
+            description="Assigns a graph of tasks at once. Dependencies may name other ids of the same batch.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "project": PROJECT,
+                    "commands": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "id": {"type": "string", "description": "Optional; generated when omitted"},
+                                "target_role": {"type": "string"},
+                                "description": {"type": "string"},
+                                "dependencies": {"type": "array", "items": {"type": "string"}}
+                            },
+                            "required": ["target_role", "description"]
+                        }
+                    }
+                },
+                "required": ["commands"]
+            }
+        ),
         types.Tool(
             name="poll_tasks",
             description="Checks for available tasks for a specific role.",
             inputSchema={
                 "type": "object",
                 "properties": {
+                    "project": PROJECT,
                     "role": {"type": "string", "description": "The role to poll for"}
                 },
                 "required": ["role"]
@@ -63,28 +134,86 @@ async def list_tools() -> list[types.Tool]:
 @mcp_server.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
     """Handles tool calls from the IDE agent."""
+    started = time.perf_counter()
+    outcome = "ok"
+    try:
+        return await _handle_tool(name, arguments)
+    except Exception as e:
+        outcome = type(e).__name__
+        raise
+    finally:
+        TOOL_SECONDS.observe(time.perf_counter() - started, name if name in TOOLS else "unknown", outcome)
+
+async def _take_over(board, role: str, claimant: str, current):
+    # The agent's own task from the dispatcher first, then IDE-bound dispatcher tasks, then poller claims
+    if current and current.claimed_by == DISPATCHER:
+        taken = await board.hand_over(current.id, DISPATCHER, claimant)
+        if taken:
+            return taken
+    pollers = [owner for owner in board.leases.holders(role) if owner.startswith(POLLER_CLAIMANT)]
+    for owner in [DISPATCHER] + pollers:
+        for task in board.held_tasks(owner, role):
+            if owner == DISPATCHER and board.agent_for_task(task.id):
+                continue  # Running on a registered agent; only that agent takes it over
+            taken = await board.hand_over(task.id, owner, claimant)
+            if taken:
+                return taken
+    return None
+
+async def _handle_tool(name: str, arguments: dict) -> list[types.TextContent]:
+    # Commands create their project on first use; everything else needs one that exists
+    try:
+        if name in ("send_command", "send_commands"):
+            project = await projects.open(arguments.get("project"))
+        else:
+            project = projects.get(arguments.get("project"))
+    except ProjectError as e:
+        return [types.TextContent(type="text", text=f"Project rejected: {e}")]
+    if project is None:
+        return [types.TextContent(type="text", text=f"Unknown project: {arguments.get('project')}")]
+    board = project.board
+
     if name == "fetch_next_task":
         role = arguments.get("role")
-        # Find the first in_progress or pending task for this role
-        target_task = next((t for t in blackboard.tasks if t.role == role and t.status in [TaskStatus.IN_PROGRESS, TaskStatus.PENDING]), None)
+        claimant = arguments.get("agent_id") or f"mcp:{role}"
+        # Resume a task this caller already holds; else take over the one the dispatcher started
+        # on its registered agent, the oldest one the dispatcher handed to the IDE (on no agent),
+        # or one an agent poller claimed and prompted the IDE for; otherwise atomically claim the
+        # oldest ready pending one. Held tasks come from the lease index, so nothing is scanned
+        # beyond the tasks already running on the role's agents. Take-overs are compare-and-set,
+        # so two IDE agents never get the same task.
+        agent = board.get_agent(arguments.get("agent_id") or "")
+        current = board.get_task(agent.current_task_id) if agent and agent.current_task_id else None
+        if current and current.status == TaskStatus.IN_PROGRESS and current.claimed_by == claimant:
+            target_task = current
+        else:
+            target_task = next(iter(board.held_tasks(claimant, role)), None)
+        if target_task:
+            board.heartbeat(target_task.id, claimant)
+        else:
+            target_task = await _take_over(board, role, claimant, current)
+        if not target_task:
+            target_task = await board.claim_next_task(role, claimant)
         
         if target_task:
             return [types.TextContent(type="text", text=f"TASK_ID: {target_task.id}\nDESCRIPTION: {target_task.description}")]
         return [types.TextContent(type="text", text="No active tasks found for your role.")]
 
+    elif name == "heartbeat_task":
+        task_id = arguments.get("task_id")
+        lease = board.heartbeat(task_id, arguments.get("agent_id"))
+        if lease:
+            return [types.TextContent(type="text", text=f"Lease extended for {task_id}.")]
+        return [types.TextContent(type="text", text=f"No active lease for {task_id}.")]
+
     elif name == "submit_task_completion":
         task_id = arguments.get("task_id")
         result = arguments.get("result")
         
-        await blackboard.update_task_status(task_id, TaskStatus.DONE, result=result)
-        
-        # Free up the agent if we can find it
-        for agent in blackboard.agents:
-            if agent.current_task_id == task_id:
-                await blackboard.update_agent_status(agent.id, AgentStatus.IDLE)
-                break
+        # The dispatcher frees the agent (or starts its next task) once it sees the task done
+        await board.update_task_status(task_id, TaskStatus.DONE, result=result)
 
-        await blackboard.add_log("System", f"Task {task_id} completed via MCP.")
+        await board.add_log("System", f"Task {task_id} completed via MCP.")
         return [types.TextContent(type="text", text="Completion reported successfully.")]
 
     elif name == "send_command":
@@ -94,16 +223,46 @@ async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
         import uuid
         
         new_task = Task(id=str(uuid.uuid4())[:8], description=desc, role=target)
-        await blackboard.add_task(new_task)
-        await blackboard.add_log("System", f"Command issued to {target}: {desc}")
+        await board.add_task(new_task)
+        await board.add_log("System", f"Command issued to {target}: {desc}")
         return [types.TextContent(type="text", text=f"Command registered with ID: {new_task.id}")]
 
+    elif name == "submit_task_completions":
+        updates = [(c.get("task_id"), TaskStatus.DONE, c.get("result")) for c in arguments.get("completions", [])]
+        try:
+            await board.update_tasks(updates)
+        except ValueError as e:
+            return [types.TextContent(type="text", text=f"Batch rejected: {e}")]
+        await board.add_log("System", f"{len(updates)} tasks completed via MCP.")
+        return [types.TextContent(type="text", text=f"{len(updates)} completions reported successfully.")]
+
+    elif name == "send_commands":
+        from ..models.task import Task
+        import uuid
+
+        try:
+            tasks = [
+                Task(
+                    id=c.get("id") or str(uuid.uuid4())[:8],
+                    description=c.get("description"),
+                    role=c.get("target_role"),
+                    dependencies=c.get("dependencies", []),
+                )
+                for c in arguments.get("commands", [])
+            ]
+            added = await board.add_tasks(tasks)
+        except ValueError as e:
+            return [types.TextContent(type="text", text=f"Batch rejected: {e}")]
+        await board.add_log("System", f"Batch of {len(added)} commands issued.")
+        return [types.TextContent(type="text", text=f"Commands registered with IDs: {', '.join(t.id for t in added)}")]
+
     elif name == "poll_tasks":
         role = arguments.get("role")
-        pending = [t for t in blackboard.tasks if t.role == role and t.status == TaskStatus.PENDING]
+        pending_count = board.count_tasks(role, TaskStatus.PENDING)
         
-        if pending:
-            return [types.TextContent(type="text", text=f"FOUND: {len(pending)} tasks.", data=pending[0].model_dump())]
+        if pending_count:
+            next_task = board.next_task(role, TaskStatus.PENDING)
+            return [types.TextContent(type="text", text=f"FOUND: {pending_count} tasks.", data=next_task.to_dict())]
         return [types.TextContent(type="text", text="NO_TASKS")]
 
     return [types.TextContent(type="text", text=f"Unknown tool: {name}")]
@@ -0,0 +1,373 @@
+import asyncio
+import os
+import time
+from typing import Dict, List, Optional, Set
+
+from ..core.broadcaster import broadcaster
+from ..core.metrics import metrics
+from ..models.agent import AgentStatus
+from ..models.records import TaskRecord
+from ..models.task import TaskStatus
+from .blackboard import Blackboard, blackboard
+from .dispatcher import DurationStats, DISPATCH_DEFAULT_DURATION
+
+CRITICAL_PATH_DISPATCH = os.getenv("CRITICAL_PATH_DISPATCH", "true").lower() in ("1", "true", "yes")
+ESTIMATE_DRIFT = float(os.getenv("ESTIMATE_DRIFT", "0.2"))  # Relative change in a role's mean duration that re-estimates its missions
+MISSION_UPDATE_INTERVAL = float(os.getenv("MISSION_UPDATE_INTERVAL", "1"))  # Seconds between mission_updated broadcasts
+
+REESTIMATES = metrics.counter("mission_reestimates", "Missions whose critical path was recomputed after duration estimates drifted.")
+
+
+class MissionState:
+    __slots__ = ("id", "tasks", "frontier", "unfinished", "done", "failed", "started_at", "finished_at", "stale")
+
+    def __init__(self, mission_id: Optional[str]):
+        self.id = mission_id
+        self.tasks: List[str] = []  # Insertion order, which is a topological order
+        self.frontier: Dict[str, None] = {}  # Ready or running: every dependency is done
+        self.unfinished: Dict[str, int] = {}  # role -> tasks not yet done
+        self.done = 0
+        self.failed = 0
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.stale = False  # Tails computed with outdated duration estimates
+
+
+class MissionAnalytics:
+    """
+    Critical path, slack and expected completion of every mission's task DAG, from
+    observed per-role task durations.
+
+    The core quantity is a task's tail: its expected duration plus the longest chain
+    of unfinished work depending on it, i.e. how long the mission needs at least once
+    the task starts. Dependencies always point at earlier tasks, so a new task has no
+    dependents yet: adding one sets its tail and raises its ancestors' tails only as far
+    as they actually grow. A batch is computed in one reverse pass, then propagated.
+    Finishing a task changes no tail (its ancestors are done already); it only moves the
+    mission's frontier (ready and running tasks) forward, so nothing is recomputed.
+    When a role's observed mean drifts more than ESTIMATE_DRIFT from the value the
+    tails were built with, affected missions are recomputed in one reverse pass on
+    their next query or broadcast, so at most once per MISSION_UPDATE_INTERVAL however
+    noisy the durations.
+
+    A mission's remaining critical path is the longest tail on its frontier (running
+    tasks count only their expected remaining time); its ETA is that or its remaining
+    work per role spread over the role's agents, whichever is longer. Slack (how much a
+    task can slip without delaying the mission) needs a forward pass and is computed on
+    request.
+
+    With CRITICAL_PATH_DISPATCH, the ready queue claims the task with the longest tail
+    first within a mission, so work on the critical path starts before work that can wait.
+    """
+
+    def __init__(self, board: Blackboard, default_duration: float = 300, drift: float = 0.2, update_interval: float = 1,
+                 dispatch: bool = True):
+        self.board = board
+        self.dispatch = dispatch
+        self.default_duration = default_duration
+        self.drift = drift
+        self.update_interval = update_interval
+        self.missions: Dict[Optional[str], MissionState] = {}
+        self._tail: Dict[str, float] = {}  # Unfinished tasks only
+        self._children: Dict[str, List[str]] = {}  # Unfinished task -> unfinished dependents
+        self._running_since: Dict[str, float] = {}
+        self._stats: Dict[str, DurationStats] = {}
+        self._estimate: Dict[str, float] = {}  # role -> mean the tails were built with
+        self._batch: Optional[List[str]] = None  # Tasks added inside the open transaction
+        self._dirty: Set[Optional[str]] = set()  # Missions changed since the last broadcast
+        self._worker: Optional[asyncio.Task] = None
+        self._started = False
+
+    def start(self):
+        """Indexes the recovered Blackboard and follows it; call after recovery."""
+        if self._started:
+            return
+        self._started = True
+        self._add_batch([task.id for task in self.board.task_store.values()])
+        for task in self.board.task_store.values():
+            if task.status == TaskStatus.IN_PROGRESS:
+                self._running_since[task.id] = time.time()
+        self.board.subscribe(self._on_mutation)
+        self.board.on_ready(self._on_ready)
+        if self.dispatch:
+            queue = self.board.ready_queue
+            queue.critical = self.criticality
+            for task in list(self.board.task_store.values()):
+                if task.id in queue:
+                    queue.reprioritize(task)  # Queued during recovery, before tails were known
+        self._worker = asyncio.create_task(self._broadcast_loop())
+
+    async def stop(self):
+        if self._worker:
+            self._worker.cancel()
+            self._worker = None
+
+    def duration(self, role: str) -> float:
+        return self._estimate.get(role, self.default_duration)
+
+    def criticality(self, task_id: str) -> float:
+        """Length of the longest chain of remaining work starting with this task, in seconds."""
+        # Hot path (every ready task): may lag a re-estimate until the next refresh
+        return self._tail.get(task_id, 0.0)
+
+    # --- Queries ------------------------------------------------------------
+
+    def summary(self, mission_id: Optional[str], now: Optional[float] = None) -> Optional[dict]:
+        mission = self.missions.get(mission_id)
+        if mission is None:
+            return None
+        self._refresh(mission)
+        now = now or time.time()
+        critical, head = self._remaining(mission, now)
+        work = self._work_bound(mission)
+        finished = mission.finished_at is not None
+        return {
+            "id": mission.id,
+            "tasks": len(mission.tasks),
+            "done": mission.done,
+            "failed": mission.failed,
+            "running": sum(1 for t in mission.frontier if t in self._running_since),
+            "critical_remaining": critical,
+            "work_remaining": work,
+            "eta": mission.finished_at if finished else now + max(critical, work),
+            "critical_task": head,
+            "started_at": mission.started_at,
+            "finished_at": mission.finished_at,
+        }
+
+    def critical_path(self, mission_id: Optional[str], now: Optional[float] = None) -> List[dict]:
+        """Unfinished tasks on the mission's critical path, first to last, with their expected durations."""
+        mission = self.missions.get(mission_id)
+        if mission is None:
+            return []
+        self._refresh(mission)
+        _, task_id = self._remaining(mission, now or time.time())
+        path = []
+        while task_id is not None:
+            task = self.board.get_task(task_id)
+            path.append({"id": task_id, "role": task.role, "status": task.status, "expected": self.duration(task.role)})
+            task_id = max((c for c in self._children.get(task_id, ()) if c in self._tail), key=self._tail.__getitem__, default=None)
+        return path
+
+    def slack(self, mission_id: Optional[str], now: Optional[float] = None) -> Dict[str, float]:
+        """
+        Seconds each unfinished, unblocked-by-failure task can be delayed without moving
+        the mission's expected completion; 0 on the critical path. One forward pass.
+        """
+        mission = self.missions.get(mission_id)
+        if mission is None:
+            return {}
+        self._refresh(mission)
+        now = now or time.time()
+        critical, _ = self._remaining(mission, now)
+        tail, running, frontier, estimate = self._tail, self._running_since, mission.frontier, self._estimate
+        finish: Dict[str, float] = {}
+        slack: Dict[str, float] = {}
+        for task_id in mission.tasks:
+            if task_id not in tail:
+                continue
+            task = self.board.get_task(task_id)
+            if task_id in frontier:
+                start = 0.0
+            else:
+                start = max((finish[d] for d in task.dependencies if d in finish), default=None)
+                if start is None:
+                    continue  # Blocked behind a failed task
+            expected = estimate.get(task.role, self.default_duration)
+            started = running.get(task_id)
+            left = expected if started is None else max(0.0, expected - (now - started))
+            finish[task_id] = start + left
+            slack[task_id] = max(0.0, critical - (start + left + tail[task_id] - expected))
+        return slack
+
+    # --- Tracking -----------------------------------------------------------
+
+    def _on_mutation(self, kind: str, op: str, item_id: Optional[str], data: dict):
+        if kind == "txn":
+            if op == "begin":
+                self._batch = []
+            elif self._batch is not None:
+                batch, self._batch = self._batch, None
+                self._add_batch(batch)
+            return
+        if kind != "task":
+            return
+        if op == "add":
+            if self._batch is not None:
+                self._batch.append(data["id"])
+            else:
+                self._add(data["id"])
+            return
+        status = data.get("status")
+        if status is None:
+            return
+        task = self.board.get_task(item_id)
+        mission = self.missions.get(task.mission_id) if task else None
+        if mission is None or item_id not in self._tail:
+            return  # Unknown, or already finished (a late duplicate)
+        self._dirty.add(mission.id)
+        if status == TaskStatus.IN_PROGRESS:
+            self._running_since[item_id] = time.time()
+        elif status == TaskStatus.PENDING:
+            self._running_since.pop(item_id, None)
+        else:
+            self._finish(mission, task, status == TaskStatus.DONE)
+
+    def _on_ready(self, task: TaskRecord):
+        mission = self.missions.get(task.mission_id)
+        if mission is not None and task.id in self._tail:
+            mission.frontier[task.id] = None
+
+    def _mission(self, task: TaskRecord) -> MissionState:
+        mission = self.missions.get(task.mission_id)
+        if mission is None:
+            mission = self.missions[task.mission_id] = MissionState(task.mission_id)
+        elif mission.finished_at is not None:
+            mission.finished_at = None  # Reopened by a follow-up task
+        return mission
+
+    def _register(self, task: TaskRecord) -> Optional[MissionState]:
+        mission = self._mission(task)
+        mission.tasks.append(task.id)
+        self._dirty.add(mission.id)
+        if task.status == TaskStatus.DONE:
+            mission.done += 1
+            return None
+        if task.status == TaskStatus.ERROR:
+            mission.failed += 1
+            return None
+        mission.unfinished[task.role] = mission.unfinished.get(task.role, 0) + 1
+        self._children[task.id] = []
+        for dep in task.dependencies:
+            if dep in self._children:
+                self._children[dep].append(task.id)
+        if self.board.scheduler.is_ready(task.id):
+            mission.frontier[task.id] = None
+        return mission
+
+    def _add(self, task_id: str):
+        task = self.board.get_task(task_id)
+        if task is None or task_id in self._children or self._register(task) is None:
+            return
+        self._tail[task_id] = self.duration(task.role)
+        self._raise(task)
+
+    def _add_batch(self, task_ids: List[str]):
+        """Registers tasks given in dependency order: one reverse pass, then one propagation upwards."""
+        added = [task for task in map(self.board.get_task, task_ids) if task and task.id not in self._children and self._register(task)]
+        for task in reversed(added):
+            self._tail[task.id] = self.duration(task.role) + self._longest_after(task.id)
+        queue = self.board.ready_queue
+        batch = set(task_ids)
+        for task in added:
+            if task.id in queue:
+                queue.reprioritize(task)
+            if any(dep in self._tail and dep not in batch for dep in task.dependencies):
+                self._raise(task)
+
+    def _raise(self, task: TaskRecord):
+        """Propagates a new or longer tail of `task` to its unfinished ancestors, as far as they grow."""
+        queue = self.board.ready_queue
+        stack = [task]
+        while stack:
+            child = stack.pop()
+            through = self._tail[child.id]
+            for dep in child.dependencies:
+                current = self._tail.get(dep)
+                if current is None:
+                    continue
+                parent = self.board.get_task(dep)
+                longer = self.duration(parent.role) + through
+                if longer > current:
+                    self._tail[dep] = longer
+                    if dep in queue:
+                        queue.reprioritize(parent)
+                    stack.append(parent)
+
+    def _finish(self, mission: MissionState, task: TaskRecord, succeeded: bool):
+        started = self._running_since.pop(task.id, None)
+        if succeeded and started is not None:
+            self._observe(task.role, time.time() - started)
+        del self._tail[task.id]
+        del self._children[task.id]
+        mission.frontier.pop(task.id, None)
+        mission.unfinished[task.role] -= 1
+        if succeeded:
+            mission.done += 1
+        else:
+            mission.failed += 1
+        if mission.done + mission.failed == len(mission.tasks):
+            mission.finished_at = time.time()
+
+    def _observe(self, role: str, seconds: float):
+        stats = self._stats.setdefault(role, DurationStats())
+        stats.add(seconds)
+        used = self._estimate.get(role, self.default_duration)
+        if abs(stats.mean - used) > self.drift * used:
+            self._estimate[role] = stats.mean
+            for mission in self.missions.values():
+                if mission.unfinished.get(role):
+                    mission.stale = True
+                    self._dirty.add(mission.id)  # Refreshed by the next broadcast
+
+    def _refresh(self, mission: Optional[MissionState]):
+        if mission is None or not mission.stale:
+            return
+        mission.stale = False
+        REESTIMATES.inc()
+        for task_id in reversed(mission.tasks):
+            if task_id in self._tail:
+                self._tail[task_id] = self.duration(self.board.get_task(task_id).role) + self._longest_after(task_id)
+        queue = self.board.ready_queue
+        if queue.critical is not None:
+            for task_id in mission.frontier:
+                if task_id in queue:
+                    queue.reprioritize(self.board.get_task(task_id))
+
+    def _longest_after(self, task_id: str) -> float:
+        # Dependents only finish before their dependency if set DONE/ERROR by hand
+        return max((self._tail[c] for c in self._children[task_id] if c in self._tail), default=0.0)
+
+    # --- Estimates ----------------------------------------------------------
+
+    def _left(self, task: TaskRecord, now: float) -> float:
+        expected = self.duration(task.role)
+        started = self._running_since.get(task.id)
+        return expected if started is None else max(0.0, expected - (now - started))
+
+    def _remaining(self, mission: MissionState, now: float):
+        """(seconds, first task) of the longest remaining chain, starting from the frontier."""
+        best, head = 0.0, None
+        tail, running = self._tail, self._running_since
+        for task_id in mission.frontier:
+            length = tail[task_id]
+            if task_id in running:
+                task = self.board.get_task(task_id)
+                length += self._left(task, now) - self.duration(task.role)
+            if head is None or length > best:
+                best, head = length, task_id
+        return best, head
+
+    def _work_bound(self, mission: MissionState) -> float:
+        agents: Dict[str, int] = {}
+        for (role, status), count in self.board.agent_store.counts().items():
+            if status != AgentStatus.OFFLINE:
+                agents[role] = agents.get(role, 0) + count
+        # Roles without registered agents are served by the one IDE window
+        return max((n * self.duration(role) / max(1, agents.get(role, 0)) for role, n in mission.unfinished.items()), default=0.0)
+
+    async def _broadcast_loop(self):
+        while True:
+            await asyncio.sleep(self.update_interval)
+            dirty, self._dirty = self._dirty, set()
+            try:
+                for mission_id in dirty:
+                    summary = self.summary(mission_id)
+                    if summary is not None:
+                        await broadcaster.emit("mission_updated", summary, key=("mission", mission_id), room=self.board.room)
+            except Exception as e:
+                print(f"❌ Mission analytics broadcast error: {e}")
+
+
+# Singleton
+mission_analytics = MissionAnalytics(blackboard, DISPATCH_DEFAULT_DURATION, ESTIMATE_DRIFT, MISSION_UPDATE_INTERVAL, CRITICAL_PATH_DISPATCH)
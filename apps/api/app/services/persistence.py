@@ -0,0 +1,270 @@
+import asyncio
+import gc
+import json
+import os
+import time
+from typing import List, Optional
+
+from ..models.task import TaskStatus
+from ..models.agent import AgentStatus
+from ..models.records import AgentRecord, TaskRecord
+from .blackboard import Blackboard, blackboard
+from .log_store import LogEntry
+
+DATA_DIR = os.getenv("BLACKBOARD_DATA_DIR") or None  # Unset keeps the Blackboard memory-only
+WAL_COMMIT_INTERVAL_MS = float(os.getenv("WAL_COMMIT_INTERVAL_MS", "10"))  # Group commit period: acknowledged writes a crash may lose
+SNAPSHOT_EVERY = int(os.getenv("SNAPSHOT_EVERY", "100000"))  # WAL records between compactions
+
+SNAPSHOT_FILE = "snapshot.json"
+# Shared encoder: json.dumps(...) with non-default options builds a new encoder per call
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+_STATUS = {"task": TaskStatus, "agent": AgentStatus}
+
+
+class BlackboardPersistence:
+    """
+    Durable backend for the Blackboard: an append-only write-ahead log plus compacted snapshots.
+
+    WAL records are JSON lines `[lsn, kind, op, item_id, data]`; a Blackboard transaction
+    is one `[lsn, "batch", "apply", null, [[kind, op, item_id, data], ...]]` line, so a
+    torn write drops it whole. Mutations only buffer
+    their record; a background committer writes everything buffered and fsyncs once
+    every WAL_COMMIT_INTERVAL_MS (group commit), off the event loop. Callers don't wait for
+    that fsync, so a mutation is acknowledged (HTTP reply, MCP result, broadcast) before it
+    is durable: a crash loses whatever was buffered, up to WAL_COMMIT_INTERVAL_MS (plus the
+    write itself) of acknowledged changes. Every SNAPSHOT_EVERY
+    records the full state is written to `snapshot.json` (atomically, via rename) and the
+    WAL segments it covers are deleted. Recovery loads the snapshot and replays newer records,
+    truncating a torn record left by a crash.
+    """
+
+    def __init__(self, board: Blackboard, directory: Optional[str], commit_interval_ms: float = 10, snapshot_every: int = 100000):
+        self.board = board
+        self.directory = directory
+        self.commit_interval = commit_interval_ms / 1000
+        self.snapshot_every = snapshot_every
+        self.lsn = 0
+        self.snapshot_lsn = 0
+        self.commits = 0
+
+        self._buffer: List[str] = []
+        self._txn: Optional[list] = None  # Records of the open transaction
+        self._file = None
+        self._io_lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._committer: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    async def start(self):
+        """Recovers the Blackboard from disk, then starts journaling every mutation."""
+        if not self.enabled:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        started = time.perf_counter()
+        replayed = self.recover()
+        self._open_segment(self.lsn + 1)
+        self.board.subscribe(self._record)
+        self._wakeup = asyncio.Event()
+        self._committer = asyncio.create_task(self._commit_loop())
+        print(f"💾 Blackboard recovered {len(self.board.task_store)} tasks ({replayed} WAL records) in {time.perf_counter() - started:.2f}s")
+
+    async def stop(self):
+        if not self._committer:
+            return
+        self._committer.cancel()
+        self._committer = None
+        await self.commit()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    # --- Write path -------------------------------------------------------
+
+    def _record(self, kind: str, op: str, item_id: Optional[str], data):
+        if kind == "txn":
+            if op == "begin":
+                self._txn = []
+                return
+            kind, op, item_id, data = "batch", "apply", None, self._txn
+            self._txn = None
+            if not data:
+                return
+        elif self._txn is not None:
+            self._txn.append([kind, op, item_id, data])
+            return
+        self.lsn += 1
+        self._buffer.append(_encode([self.lsn, kind, op, item_id, data]))
+        self._wakeup.set()
+
+    async def commit(self):
+        """Writes and fsyncs every buffered record (one fsync for the whole group)."""
+        async with self._io_lock:
+            if not self._buffer:
+                return
+            data = "\n".join(self._buffer) + "\n"
+            self._buffer = []
+            await asyncio.get_running_loop().run_in_executor(None, self._write_sync, self._file, data)
+            self.commits += 1
+
+    async def _commit_loop(self):
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.commit_interval)
+            self._wakeup.clear()
+            try:
+                await self.commit()
+                if self.lsn - self.snapshot_lsn >= self.snapshot_every:
+                    await self.snapshot()
+            except Exception as e:
+                print(f"❌ WAL commit error: {e}")
+
+    async def snapshot(self):
+        """Writes a compacted snapshot of the current state and drops the WAL it covers."""
+        await self.commit()
+        async with self._io_lock:
+            # Captured on the loop, so no mutation interleaves with the copy
+            lsn = self.lsn
+            state = {
+                "lsn": lsn,
+                "tasks": [t.to_dict() for t in self.board.task_store.values()],
+                "agents": [a.to_dict() for a in self.board.agent_store.values()],
+                "logs": [list(e) for e in self.board.log_store.entries()],
+                "log_seq": self.board.log_store.seq,
+                "auto_trigger_enabled": self.board.auto_trigger_enabled,
+            }
+            old_segments = self._segments()
+            self._file.close()
+            self._open_segment(lsn + 1)
+            await asyncio.get_running_loop().run_in_executor(None, self._write_snapshot_sync, state, old_segments)
+            self.snapshot_lsn = lsn
+
+    @staticmethod
+    def _write_sync(f, data: str):
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    def _write_snapshot_sync(self, state: dict, old_segments: List[str]):
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        for segment in old_segments:
+            os.remove(segment)
+
+    def _open_segment(self, first_lsn: int):
+        self._file = open(os.path.join(self.directory, f"wal-{first_lsn:012d}.log"), "a", encoding="utf-8")
+
+    def _segments(self) -> List[str]:
+        names = sorted(n for n in os.listdir(self.directory) if n.startswith("wal-") and n.endswith(".log"))
+        return [os.path.join(self.directory, n) for n in names]
+
+    # --- Recovery ---------------------------------------------------------
+
+    def recover(self) -> int:
+        """Loads the snapshot and replays newer WAL records. Returns the number replayed."""
+        # Bulk load of acyclic data: cyclic GC passes over the growing heap only cost time
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._recover()
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _recover(self) -> int:
+        board = self.board
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            for data in state["tasks"]:
+                board.task_store.add(_restore("task", data))
+            for data in state["agents"]:
+                board.agent_store.add(_restore("agent", data))
+            for entry in state["logs"]:
+                board.log_store.restore(LogEntry(*entry))
+            board.log_store.seq = max(board.log_store.seq, state["log_seq"])
+            board.auto_trigger_enabled = state["auto_trigger_enabled"]
+            self.lsn = self.snapshot_lsn = state["lsn"]
+
+        replayed = 0
+        for segment in self._segments():
+            torn = None
+            with open(segment, "rb") as f:
+                offset = 0
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated record")
+                        lsn, kind, op, item_id, data = json.loads(line)
+                    except ValueError:
+                        torn = offset  # Torn write from a crash: it was the last group, and nothing after it was written
+                        break
+                    offset += len(line)
+                    if lsn <= self.lsn:
+                        continue
+                    self._apply(kind, op, item_id, data)
+                    self.lsn = lsn
+                    replayed += 1
+            if torn is not None:
+                # Cut it off: the segment reopened after recovery may be this one, and records
+                # appended to it would otherwise follow the partial line and be lost with it
+                os.truncate(segment, torn)
+
+        self._rebuild_derived_state()
+        return replayed
+
+    def _apply(self, kind: str, op: str, item_id: Optional[str], data):
+        board = self.board
+        if kind == "batch":
+            for record in data:
+                self._apply(*record)
+        elif kind in _STATUS:
+            store = board.task_store if kind == "task" else board.agent_store
+            if op == "add":
+                store.add(_restore(kind, data))
+            else:
+                if "status" in data:
+                    data["status"] = _STATUS[kind](data["status"])
+                store.update(item_id, **data)
+        elif kind == "log":
+            board.log_store.restore(LogEntry(**data))
+        elif kind == "config":
+            board.auto_trigger_enabled = data["auto_trigger_enabled"]
+
+    def _rebuild_derived_state(self):
+        """Indexes are rebuilt by the stores; the scheduler, ready queue, agent map and leases are derived here."""
+        board = self.board
+        for task in board.task_store.values():
+            board.scheduler.add(task.id, task.dependencies, done=task.status == TaskStatus.DONE,
+                                queued=task.status == TaskStatus.PENDING)
+            if task.status == TaskStatus.IN_PROGRESS:
+                # Fresh lease: the owner has one TTL to heartbeat again before the task is re-queued
+                board.leases.grant(task.id, task.claimed_by or "recovered", role=task.role)
+        for task in board.task_store.values():
+            if task.status == TaskStatus.PENDING and board.scheduler.is_ready(task.id):
+                board.ready_queue.push(task)
+        for agent in board.agent_store.values():
+            if agent.current_task_id:
+                board._agent_by_task[agent.current_task_id] = agent.id
+
+
+def _restore(kind: str, data: dict):
+    """Rebuilds a record from journaled data. It was validated when first written, so skip validation."""
+    return (TaskRecord if kind == "task" else AgentRecord).from_dict(data)
+
+
+# Singleton
+persistence = BlackboardPersistence(
+    blackboard,
+    DATA_DIR,
+    commit_interval_ms=WAL_COMMIT_INTERVAL_MS,
+    snapshot_every=SNAPSHOT_EVERY,
+)
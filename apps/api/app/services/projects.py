@@ -0,0 +1,192 @@
+import asyncio
+import os
+import re
+import time
+from typing import Dict, List, Optional
+
+from ..core.metrics import metrics
+from .blackboard import Blackboard, blackboard, DEFAULT_PROJECT
+from .orchestrator import Orchestrator, orchestrator
+from .admission import AdmissionController, admission, ADMISSION_MAX_PENDING, ADMISSION_POLICY, ADMISSION_MAX_WAIT
+from .state_sync import StateSync, state_sync, SYNC_MAX_DELTAS, SYNC_LOG_LIMIT
+from .persistence import BlackboardPersistence, persistence, DATA_DIR, WAL_COMMIT_INTERVAL_MS, SNAPSHOT_EVERY
+from .task_feed import TaskFeed, task_feed, TASK_FEED_CAPACITY
+from .mission_analytics import MissionAnalytics, mission_analytics, CRITICAL_PATH_DISPATCH, ESTIMATE_DRIFT, MISSION_UPDATE_INTERVAL
+from .task_memo import TaskMemo, task_memo, parse_policies, TASK_MEMO_ROLES, TASK_MEMO_MAX_ENTRIES
+from .dispatcher import DISPATCH_DEFAULT_DURATION
+
+PROJECT_MAX = int(os.getenv("PROJECT_MAX", "1000"))  # Projects a worker may open, besides the default one
+
+PROJECT_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")  # Also a directory name and part of a room name
+
+PROJECTS_OPENED = metrics.counter("projects_opened", "Projects created or recovered by this worker.")
+
+
+class ProjectError(ValueError):
+    """Raised for a malformed project id."""
+
+
+class ProjectLimitError(ProjectError):
+    """Raised when a new project would exceed PROJECT_MAX."""
+
+
+class Project:
+    """
+    One partition of the swarm: its own Blackboard (tasks, agents, logs, ready queue),
+    scheduler loop and dispatcher (Orchestrator), admission control, dashboard sync, the
+    task feed agent pollers long-poll, mission analytics and the task memo.
+    Nothing is shared with other projects except the artifact store, which is
+    content-addressed, and the IDE window the UI triggers go to.
+    """
+
+    def __init__(self, project_id: str, board: Blackboard, orchestrator: Orchestrator, admission: AdmissionController,
+                 state_sync: StateSync, persistence: BlackboardPersistence, task_feed: TaskFeed,
+                 mission_analytics: MissionAnalytics, task_memo: TaskMemo):
+        self.id = project_id
+        self.board = board
+        self.orchestrator = orchestrator
+        self.admission = admission
+        self.state_sync = state_sync
+        self.persistence = persistence
+        self.task_feed = task_feed
+        self.mission_analytics = mission_analytics
+        self.task_memo = task_memo
+        self.opened_at = time.time()
+
+    async def start(self):
+        # Recovery first, as for the default project (see the API lifespan)
+        await self.persistence.start()
+        self.task_feed.start()
+        self.state_sync.start()
+        self.admission.start()
+        self.mission_analytics.start()
+        self.task_memo.start()
+        await self.orchestrator.start()
+
+    async def stop(self):
+        await self.orchestrator.stop()
+        await self.mission_analytics.stop()
+        await self.task_memo.stop()
+        await self.persistence.stop()
+        self.board.log_store.close()
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "room": self.board.room,
+            "tasks": len(self.board.task_store),
+            "pending": self.admission.pending(),
+            "agents": len(self.board.agent_store),
+            "opened_at": self.opened_at,
+        }
+
+
+class ProjectRegistry:
+    """
+    The projects of this worker, by id. The default project is the one the API served
+    before projects existed (requests without a project id go there) and is started by
+    the API lifespan along with the worker-wide services bound to it: replication and
+    lifecycle metrics.
+
+    Other projects are created on first use and started right away; with a data
+    directory each journals to `<data dir>/projects/<id>` and is recovered from there
+    at startup. They live in this worker only: with several workers behind a broker,
+    requests for one project must reach the worker that holds it.
+    """
+
+    def __init__(self, default: Project, data_dir: Optional[str] = None, max_projects: int = 1000):
+        self.default = default
+        self.data_dir = data_dir
+        self.max_projects = max_projects
+        self._projects: Dict[str, Project] = {default.id: default}
+        self._opening: Dict[str, asyncio.Task] = {}  # Projects being started; concurrent openers share it
+        self._started = False
+
+    def __len__(self) -> int:
+        return len(self._projects)
+
+    def __iter__(self):
+        return iter(list(self._projects.values()))
+
+    async def start(self):
+        """Recovers the projects journaled under the data directory."""
+        if self._started:
+            return
+        self._started = True
+        metrics.gauge("projects", "Projects open in this worker, the default one included.", fn=lambda: {(): len(self._projects)})
+        metrics.gauge("dispatcher_load", "Tasks running/queued on agents and events backlogged in the dispatcher, by project.", ["project", "kind"],
+                      fn=lambda: {(project.id, kind): value for project in self for kind, value in project.orchestrator.dispatcher.load().items()})
+        metrics.gauge("task_memo_entries", "Memoized results, by project and role.", ["project", "role"],
+                      fn=lambda: {(project.id, role): count for project in self for role, count in project.task_memo.sizes().items()})
+        root = self._root()
+        if root and os.path.isdir(root):
+            for name in sorted(os.listdir(root)):
+                if PROJECT_ID.match(name) and name != self.default.id:
+                    await self.open(name)
+
+    async def stop(self):
+        for project in self:
+            if project is not self.default:
+                await project.stop()
+        self._projects = {self.default.id: self.default}
+
+    def get(self, project_id: Optional[str] = None) -> Optional[Project]:
+        """An open project (the default one for no id), or None."""
+        return self._projects.get(project_id or self.default.id)
+
+    async def open(self, project_id: Optional[str] = None) -> Project:
+        """The project, created and started on first use. Raises ProjectError for a bad id or too many projects."""
+        project = self.get(project_id)
+        if project is not None:
+            return project
+        if not PROJECT_ID.match(project_id):
+            raise ProjectError(f"Invalid project id {project_id!r}: up to 64 letters, digits, '.', '_' or '-'.")
+        opening = self._opening.get(project_id)
+        if opening is None:
+            if len(self._projects) + len(self._opening) > self.max_projects:
+                raise ProjectLimitError(f"Project limit reached ({self.max_projects}); {project_id!r} was not created.")
+            opening = self._opening[project_id] = asyncio.ensure_future(self._start(project_id))
+        # Shielded so one cancelled request doesn't leave the project half started for the others
+        return await asyncio.shield(opening)
+
+    def summaries(self) -> List[dict]:
+        return [project.summary() for project in self]
+
+    async def _start(self, project_id: str) -> Project:
+        try:
+            project = self._build(project_id)
+            await project.start()
+            self._projects[project_id] = project
+            PROJECTS_OPENED.inc()
+            return project
+        finally:
+            del self._opening[project_id]
+
+    def _build(self, project_id: str) -> Project:
+        board = Blackboard(project=project_id)
+        board.artifacts = self.default.board.artifacts
+        root = self._root()
+        return Project(
+            project_id,
+            board,
+            Orchestrator(board),
+            AdmissionController(board, ADMISSION_MAX_PENDING, ADMISSION_POLICY, ADMISSION_MAX_WAIT),
+            StateSync(board, max_deltas=SYNC_MAX_DELTAS, log_limit=SYNC_LOG_LIMIT),
+            BlackboardPersistence(board, os.path.join(root, project_id) if root else None,
+                                  commit_interval_ms=WAL_COMMIT_INTERVAL_MS, snapshot_every=SNAPSHOT_EVERY),
+            TaskFeed(board, capacity=TASK_FEED_CAPACITY),
+            MissionAnalytics(board, DISPATCH_DEFAULT_DURATION, ESTIMATE_DRIFT, MISSION_UPDATE_INTERVAL, CRITICAL_PATH_DISPATCH),
+            TaskMemo(board, parse_policies(TASK_MEMO_ROLES, TASK_MEMO_MAX_ENTRIES)),
+        )
+
+    def _root(self) -> Optional[str]:
+        return os.path.join(self.data_dir, "projects") if self.data_dir else None
+
+
+# Singleton
+projects = ProjectRegistry(
+    Project(DEFAULT_PROJECT, blackboard, orchestrator, admission, state_sync, persistence, task_feed,
+            mission_analytics, task_memo),
+    DATA_DIR,
+    max_projects=PROJECT_MAX,
+)
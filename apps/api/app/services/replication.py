@@ -0,0 +1,236 @@
+import asyncio
+import time
+from typing import Optional
+
+from ..core.broker import BROKER_URL, BrokerClient
+from ..models.task import TaskStatus
+from ..models.agent import AgentStatus
+from ..models.records import AgentRecord, TaskRecord
+from .blackboard import Blackboard, blackboard
+
+CHANNEL = "blackboard"
+
+
+class BlackboardReplication:
+    """
+    Shared-state backend that keeps the Blackboards of several workers in sync.
+
+    Every local mutation (the same records the WAL journals) is published on a broker
+    channel; the broker puts them in one global order and every other worker applies
+    them to its own copy, rebuilding derived state (scheduler, agent map) as it goes and
+    announcing newly ready tasks. For workers that start later the broker retains the
+    latest full state of every task and agent (compacted per entity, in creation order),
+    the config and the last BROKER_HISTORY_MAX logs, which they replay before serving
+    requests. Replay goes on top of what the worker recovered from its own WAL: entities
+    it has are brought up to date, logs it has (same origin timestamp and agent) are
+    skipped. Claims are arbitrated with set-if-absent keys on the broker, so exactly one
+    worker wins a task. Leases stay with the worker that granted them; agents heartbeat
+    through the same MCP session that claimed.
+    """
+
+    def __init__(self, board: Blackboard, url: Optional[str]):
+        self.board = board
+        self.url = url
+        self.applied = 0
+        self.dropped = 0
+        self.client: Optional[BrokerClient] = None
+        self._applying = False
+        self._replaying = False
+        self._restored_logs: set = set()  # (ts, agent) of the logs the WAL restored, while replaying
+        self._txn: Optional[list] = None  # Records of the open local transaction
+        self._applier: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.url is not None
+
+    async def start(self):
+        """Replays the shared history, then publishes local mutations and applies remote ones."""
+        if not self.enabled:
+            return
+        started = time.perf_counter()
+        self.client = BrokerClient(self.url)
+        await self.client.connect()
+        queue = await self.client.subscribe(CHANNEL, replay=True, echo=False)
+        self._replaying = True
+        self._restored_logs = {(entry.ts, entry.agent) for entry in self.board.log_store.entries()}
+        try:
+            while not queue.empty():
+                self._apply(*queue.get_nowait())
+        finally:
+            self._replaying = False
+            self._restored_logs = set()
+        replayed = self.applied
+
+        self.board.subscribe(self._record)
+        self.board.state = self
+        self._applier = asyncio.create_task(self._apply_loop(queue))
+        print(f"🔗 Blackboard replicated via {self.url}: {replayed} records replayed in {time.perf_counter() - started:.2f}s")
+
+    async def stop(self):
+        if self._applier:
+            self._applier.cancel()
+            self._applier = None
+        if self.client:
+            await self.client.close()
+
+    # --- Claim arbitration (the Blackboard's state backend) ----------------
+
+    async def acquire(self, key: str, owner: str) -> bool:
+        try:
+            return await self.client.setnx(key, owner)
+        except ConnectionError:
+            return False  # Without the broker nobody can safely win a claim
+
+    def release(self, key: str):
+        if self.client.connected:
+            self.client.delete(key)
+
+    # --- Replication ------------------------------------------------------
+
+    def _record(self, kind: str, op: str, item_id: Optional[str], data):
+        if self._applying:
+            return
+        # A transaction is published as one "batch" record, so peers apply it all at once
+        if kind == "txn":
+            if op == "begin":
+                self._txn = []
+                return
+            kind, op, item_id, data = "batch", "apply", None, self._txn
+            self._txn = None
+            if not data:
+                return
+        elif self._txn is not None:
+            self._txn.append([kind, op, item_id, data])
+            return
+        if not self.client.connected:
+            # Never fail a local mutation over the broker; other workers just won't see it
+            if self.dropped == 0:
+                print("❌ Broker connection lost: local changes are no longer replicated.")
+            self.dropped += 1
+            return
+        self.client.publish(CHANNEL, [kind, op, item_id, data])
+        self._retain(kind, op, item_id, data)
+
+    def _retain(self, kind: str, op: str, item_id: Optional[str], data):
+        # What a worker starting later replays: each entity's latest full state under its key
+        if kind == "batch":
+            for record in data:
+                self._retain(*record)
+        elif kind in ("task", "agent"):
+            entity = self.board.get_task(item_id) if kind == "task" else self.board.get_agent(item_id)
+            if entity is not None:
+                self.client.retain(CHANNEL, [kind, "add", item_id, entity.to_dict()], key=f"{kind}:{item_id}")
+        elif kind == "config":
+            self.client.retain(CHANNEL, [kind, op, item_id, data], key=kind)
+        else:
+            self.client.retain(CHANNEL, [kind, op, item_id, data])
+
+    async def _apply_loop(self, queue: asyncio.Queue):
+        while True:
+            record = await queue.get()
+            try:
+                self._apply(*record)
+            except Exception as e:
+                print(f"❌ Replication apply error ({record[0]} {record[1]} {record[2]}): {e}")
+
+    def _apply(self, kind: str, op: str, item_id: Optional[str], data):
+        # Remote changes still reach local listeners (WAL, task feed) but aren't published again
+        self._applying = True
+        try:
+            if kind == "batch":
+                # Still one transaction here, so this worker's WAL journals it atomically too
+                with self.board.transaction():
+                    for record in data:
+                        self._apply_record(*record)
+            else:
+                self._apply_record(kind, op, item_id, data)
+            self.applied += 1
+        finally:
+            self._applying = False
+
+    def _apply_record(self, kind: str, op: str, item_id: Optional[str], data: dict):
+        if kind == "task":
+            self._apply_task(op, item_id, data)
+        elif kind == "agent":
+            self._apply_agent(op, item_id, data)
+        elif kind == "log":
+            if self._replaying and (data["ts"], data["agent"]) in self._restored_logs:
+                return  # Restored from this worker's WAL already
+            # Re-sequenced locally (log seqs are per worker), but stamped with the origin's time
+            entry = self.board.log_store.append(data["agent"], data["message"], ts=data["ts"])
+            self.board._notify("log", "add", entry.to_dict())
+        elif kind == "config":
+            self.board.auto_trigger_enabled = data["auto_trigger_enabled"]
+            self.board._notify("config", "update", data)
+
+    def _apply_task(self, op: str, task_id: str, data: dict):
+        board = self.board
+        if op == "add":
+            if task_id in board.task_store:
+                if self._replaying:
+                    self._catch_up(board.get_task(task_id), data, self._apply_task)
+                return
+            task = TaskRecord.from_dict(data)
+            board.scheduler.add(task.id, task.dependencies, done=task.status == TaskStatus.DONE,
+                                queued=task.status == TaskStatus.PENDING)
+            board.task_store.add(task)
+            if board.scheduler.is_ready(task.id):
+                board._announce_ready([task.id])
+            return
+
+        task = board.get_task(task_id)
+        if task is None:
+            return
+        previous = task.status
+        if "status" in data:
+            data["status"] = TaskStatus(data["status"])
+        board.task_store.update(task_id, **data)
+
+        status = data.get("status")
+        if status is None or status == previous:
+            return
+        if status != TaskStatus.PENDING:
+            board.ready_queue.discard(task_id)
+        if status != TaskStatus.IN_PROGRESS:
+            board.leases.release(task_id)
+        if status == TaskStatus.DONE:
+            board._announce_ready(board.scheduler.mark_done(task_id))
+        elif status == TaskStatus.PENDING:
+            board.scheduler.requeue(task_id)
+            if board.scheduler.is_ready(task_id):
+                board._announce_ready([task_id])
+
+    def _apply_agent(self, op: str, agent_id: str, data: dict):
+        board = self.board
+        if op == "add":
+            if agent_id not in board.agent_store:
+                board.agent_store.add(AgentRecord.from_dict(data))
+            elif self._replaying:
+                self._catch_up(board.get_agent(agent_id), data, self._apply_agent)
+            return
+
+        agent = board.get_agent(agent_id)
+        if agent is None:
+            return
+        if "status" in data:
+            data["status"] = AgentStatus(data["status"])
+        if "current_task_id" in data:
+            if agent.current_task_id and board._agent_by_task.get(agent.current_task_id) == agent_id:
+                del board._agent_by_task[agent.current_task_id]
+            if data["current_task_id"]:
+                board._agent_by_task[data["current_task_id"]] = agent_id
+        board.agent_store.update(agent_id, **data)
+
+
+    @staticmethod
+    def _catch_up(record, data: dict, apply):
+        # Replayed state of an entity the WAL restored: apply what changed since, as an update
+        current = record.to_dict()
+        changed = {k: v for k, v in data.items() if k not in ("id", "dependencies") and current.get(k) != v}
+        if changed:
+            apply("update", record.id, changed)
+
+
+# Singleton
+replication = BlackboardReplication(blackboard, BROKER_URL)
@@ -0,0 +1,145 @@
+import asyncio
+from typing import Dict, Iterable, List, Set
+
+
+class DependencyError(ValueError):
+    """Raised when a task cannot be inserted into the dependency graph."""
+
+
+class MissingDependencyError(DependencyError):
+    pass
+
+
+class DependencyCycleError(DependencyError):
+    pass
+
+
+class Scheduler:
+    """
+    Event-driven dependency tracker for the task DAG.
+
+    Keeps an in-degree counter per task and reverse edges (dependency -> dependents).
+    When a task is marked done only its direct dependents are touched, and the ones
+    that reach in-degree zero are pushed onto the `ready` queue. A finished task is then
+    dropped from both; only its id is kept, so later tasks may still depend on it.
+    """
+
+    def __init__(self):
+        self._indegree: Dict[str, int] = {}
+        self._dependents: Dict[str, List[str]] = {}
+        self._done: Set[str] = set()
+        self.ready: asyncio.Queue = asyncio.Queue()
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._indegree or task_id in self._done
+
+    def is_ready(self, task_id: str) -> bool:
+        return self._indegree.get(task_id) == 0
+
+    def validate(self, task_id: str, dependencies: Iterable[str]):
+        if task_id in self:
+            # Re-registering an id could close a loop through its existing dependents
+            raise DependencyCycleError(f"Task {task_id} is already registered.")
+        for dep in dependencies:
+            if dep == task_id:
+                raise DependencyCycleError(f"Task {task_id} depends on itself.")
+            if dep not in self:
+                raise MissingDependencyError(f"Task {task_id} depends on unknown task {dep}.")
+
+    def order(self, tasks: Dict[str, List[str]]) -> List[str]:
+        """
+        Validates a batch of new tasks (id -> dependencies) whose dependencies may be known
+        tasks or other tasks of the batch, listed in any order. Returns an insertion order
+        in which every dependency comes first; raises DependencyError without changing anything.
+        A batch already listed in such an order is validated in one pass and kept as is.
+        """
+        seen: Set[str] = set()
+        ordered = True
+        for task_id, dependencies in tasks.items():
+            if task_id in self:
+                raise DependencyCycleError(f"Task {task_id} is already registered.")
+            for dep in dependencies:
+                if dep in seen or dep in self:
+                    continue
+                if dep == task_id:
+                    raise DependencyCycleError(f"Task {task_id} depends on itself.")
+                if dep not in tasks:
+                    raise MissingDependencyError(f"Task {task_id} depends on unknown task {dep}.")
+                ordered = False  # Listed after its dependent: needs sorting
+            seen.add(task_id)
+        if ordered:
+            return list(tasks)  # Every edge points backwards, so there is no cycle either
+
+        indegree: Dict[str, int] = {}
+        dependents: Dict[str, List[str]] = {}
+        for task_id, dependencies in tasks.items():
+            pending = 0
+            for dep in dict.fromkeys(dependencies):
+                if dep in tasks:
+                    dependents.setdefault(dep, []).append(task_id)
+                    pending += 1
+            indegree[task_id] = pending
+
+        order = [task_id for task_id, pending in indegree.items() if pending == 0]
+        for task_id in order:  # Grows while we walk it
+            for child in dependents.get(task_id, ()):
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    order.append(child)
+        if len(order) < len(tasks):
+            stuck = next(task_id for task_id, pending in indegree.items() if pending)
+            raise DependencyCycleError(f"Task {stuck} is part of a dependency cycle.")
+        return order
+
+    def add(self, task_id: str, dependencies: Iterable[str], done: bool = False, queued: bool = True):
+        """
+        Registers a task. Dependencies must already be known, so every edge points
+        backwards in insertion order and the graph stays acyclic by construction.
+        `done` registers a task that already finished (e.g. during recovery); `queued=False`
+        one that is past PENDING (claimed or failed), which stays off the `ready` queue.
+        """
+        dependencies = list(dict.fromkeys(dependencies))
+        self.validate(task_id, dependencies)
+        self._insert(task_id, dependencies, done, queued)
+
+    def add_batch(self, tasks: Dict[str, List[str]]) -> List[str]:
+        """Validates a whole batch once (see `order`), registers it and returns the insertion order."""
+        order = self.order(tasks)
+        for task_id in order:
+            self._insert(task_id, dict.fromkeys(tasks[task_id]))
+        return order
+
+    def _insert(self, task_id: str, dependencies: Iterable[str], done: bool = False, queued: bool = True):
+        if done:
+            self._done.add(task_id)
+            return
+
+        pending = 0
+        for dep in dependencies:
+            if dep not in self._done:
+                self._dependents.setdefault(dep, []).append(task_id)
+                pending += 1
+        self._indegree[task_id] = pending
+
+        if pending == 0 and queued:
+            self.ready.put_nowait(task_id)
+
+    def mark_done(self, task_id: str) -> List[str]:
+        """Marks a task done and returns the dependents it unblocked."""
+        if task_id not in self._indegree:
+            return []  # Unknown or already done
+        del self._indegree[task_id]
+        self._done.add(task_id)
+
+        unblocked = []
+        for child in self._dependents.pop(task_id, ()):
+            self._indegree[child] -= 1
+            if self._indegree[child] == 0:
+                unblocked.append(child)
+                self.ready.put_nowait(child)
+        return unblocked
+
+    def requeue(self, task_id: str):
+        """Puts an unblocked task back on the ready queue, e.g. after its lease expired."""
+        if self.is_ready(task_id):
+            self.ready.put_nowait(task_id)
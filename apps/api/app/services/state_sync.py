@@ -0,0 +1,140 @@
+import json
+import os
+import uuid
+from typing import Dict, Optional, Tuple
+
+from ..core.metrics import metrics
+from .blackboard import Blackboard, blackboard
+
+SYNC_MAX_DELTAS = int(os.getenv("SYNC_MAX_DELTAS", "5000"))  # Changed entities above which a full snapshot is cheaper
+SYNC_LOG_LIMIT = int(os.getenv("SYNC_LOG_LIMIT", "200"))  # Log entries per snapshot or delta
+
+SYNC_REQUESTS = metrics.counter("state_sync_requests", "Dashboard syncs, by reply (delta/snapshot).", ["reply"])
+
+
+class StateSync:
+    """
+    Versioned view of the Blackboard for reconnecting dashboards.
+
+    Every mutation bumps `seq`, and each entity (task, agent, the config) remembers the
+    seq of its last change in an index kept in change order. `sync(since_seq)` walks
+    that index backwards from the newest change and returns the current state of every
+    entity changed after `since_seq`, so repeated changes coalesce. Logs travel by their
+    own log seq.
+
+    A client whose seq belongs to another server run (different `epoch`), or is so far
+    behind that the delta would not be smaller than the state, gets a full snapshot
+    instead. Snapshots are built once per seq and shared, as is the latest delta, so a
+    reconnect storm costs about one of each.
+    """
+
+    def __init__(self, board: Blackboard, max_deltas: int = 5000, log_limit: int = 200):
+        self.board = board
+        self.max_deltas = max_deltas
+        self.log_limit = log_limit
+        self.epoch = uuid.uuid4().hex[:8]
+        self.seq = 0
+        self._changed: Dict[Tuple[str, Optional[str]], int] = {}  # (kind, id) -> seq of last change, oldest first
+        self._snapshot: Optional[Tuple[int, dict, bytes]] = None
+        self._delta: Optional[Tuple[tuple, dict]] = None  # Clients of a reconnect storm mostly share a cursor
+        self._started = False
+
+    def start(self):
+        """Subscribes to the Blackboard; call after recovery, which starts a new epoch anyway."""
+        if self._started:
+            return
+        self._started = True
+        self.board.subscribe(self._on_mutation)
+
+    def _on_mutation(self, kind: str, op: str, item_id: Optional[str], data: dict):
+        if kind == "txn":
+            return
+        self.seq += 1
+        if kind == "log":
+            return  # Logs are paged by their own seq
+        key = (kind, item_id)
+        self._changed.pop(key, None)
+        self._changed[key] = self.seq
+
+    # --- Reads ------------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        return self._cached_snapshot()[0]
+
+    def snapshot_json(self) -> bytes:
+        SYNC_REQUESTS.inc("snapshot")
+        return self._cached_snapshot()[1]
+
+    def sync(self, since_seq: Optional[int] = None, epoch: Optional[str] = None, log_seq: Optional[int] = None) -> dict:
+        """Deltas since `since_seq` of this `epoch`, or a full snapshot (`reset`) when that isn't possible."""
+        if since_seq is None or epoch != self.epoch or since_seq > self.seq:
+            return self._reset()
+        key = (since_seq, log_seq, self.seq, self.board.log_store.seq)
+        if self._delta and self._delta[0] == key:
+            SYNC_REQUESTS.inc("delta")
+            return self._delta[1]
+
+        changed = []
+        for entity, seq in reversed(self._changed.items()):
+            if seq <= since_seq:
+                break
+            changed.append(entity)
+            if len(changed) > self.max_deltas:
+                return self._reset()
+
+        tasks, agents, config = [], [], None
+        for kind, item_id in changed:
+            if kind == "task":
+                tasks.append(_dump(self.board.get_task(item_id)))
+            elif kind == "agent":
+                agents.append(_dump(self.board.get_agent(item_id)))
+            elif kind == "config":
+                config = {"auto_trigger_enabled": self.board.auto_trigger_enabled}
+        SYNC_REQUESTS.inc("delta")
+        reply = {
+            "reset": False,
+            "epoch": self.epoch,
+            "seq": self.seq,
+            "tasks": tasks,
+            "agents": agents,
+            "log_seq": self.board.log_store.seq,
+            "logs": self._logs(log_seq),
+        }
+        if config:
+            reply.update(config)
+        self._delta = (key, reply)
+        return reply
+
+    def _reset(self) -> dict:
+        SYNC_REQUESTS.inc("snapshot")
+        return {"reset": True, **self.snapshot()}
+
+    def _cached_snapshot(self) -> Tuple[dict, bytes]:
+        if self._snapshot is None or self._snapshot[0] != self.seq:
+            state = {
+                "epoch": self.epoch,
+                "seq": self.seq,
+                "tasks": [_dump(t) for t in self.board.task_store.values()],
+                "agents": [_dump(a) for a in self.board.agent_store.values()],
+                "auto_trigger_enabled": self.board.auto_trigger_enabled,
+                "log_seq": self.board.log_store.seq,
+                "logs": self._logs(None),
+            }
+            self._snapshot = (self.seq, state, json.dumps(state, separators=(",", ":")).encode())
+        return self._snapshot[1], self._snapshot[2]
+
+    def _logs(self, after_seq: Optional[int]) -> list:
+        """Log entries after `after_seq` (the latest ones when None), at most `log_limit`."""
+        latest = self.board.log_store.seq
+        if after_seq is None or after_seq > latest or latest - after_seq > self.log_limit:
+            after_seq = max(0, latest - self.log_limit)
+        return [e.to_dict() for e in self.board.log_store.page(None, after_seq, None, self.log_limit)]
+
+
+def _dump(record) -> dict:
+    # Compact: unset optional fields (result, claimed_by, current_task_id, ...) are left out
+    return {k: v for k, v in record.to_dict().items() if v is not None}
+
+
+# Singleton
+state_sync = StateSync(blackboard, max_deltas=SYNC_MAX_DELTAS, log_limit=SYNC_LOG_LIMIT)
@@ -0,0 +1,86 @@
+from typing import Callable, Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+IndexKey = Tuple[str, str]
+# listener(op, item_id, fields): op is "add" (fields = full item) or "update" (fields = changes)
+Listener = Callable[[str, str, dict], None]
+
+
+class IndexedStore(Generic[T]):
+    """
+    Primary dict keyed by id plus a secondary index keyed by (role, status).
+
+    Each index bucket is an insertion-ordered dict used as an ordered set, so
+    `first(role, status)` behaves like a per-role FIFO queue (e.g. pending tasks,
+    idle agents) and every lookup or move is O(1).
+    All changes must go through `update` to keep the index consistent and the items'
+    cached dicts current; subscribed listeners see every `add` and `update` (e.g. for
+    journaling). Items are Records (see models/records.py).
+    """
+
+    def __init__(self):
+        self._by_id: Dict[str, T] = {}
+        self._index: Dict[IndexKey, Dict[str, None]] = {}
+        self._listeners: List[Listener] = []
+
+    def subscribe(self, listener: Listener):
+        self._listeners.append(listener)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._by_id
+
+    @staticmethod
+    def _key(item) -> IndexKey:
+        return (item.role, item.status)
+
+    def add(self, item: T):
+        if item.id in self._by_id:
+            raise KeyError(f"Duplicate id: {item.id}")
+        self._by_id[item.id] = item
+        self._index.setdefault(self._key(item), {})[item.id] = None
+        if self._listeners:
+            data = item.to_dict()
+            for listener in self._listeners:
+                listener("add", item.id, data)
+
+    def get(self, item_id: str) -> Optional[T]:
+        return self._by_id.get(item_id)
+
+    def update(self, item_id: str, **fields) -> Optional[T]:
+        item = self._by_id.get(item_id)
+        if item is None:
+            return None
+
+        old_key = self._key(item)
+        item.apply(fields)
+        new_key = self._key(item)
+
+        if new_key != old_key:
+            bucket = self._index[old_key]
+            del bucket[item_id]
+            if not bucket:
+                del self._index[old_key]
+            self._index.setdefault(new_key, {})[item_id] = None
+        for listener in self._listeners:
+            listener("update", item_id, fields)
+        return item
+
+    def values(self) -> Iterator[T]:
+        return iter(self._by_id.values())
+
+    def select(self, role: str, status: str) -> Iterator[T]:
+        by_id = self._by_id
+        return (by_id[i] for i in self._index.get((role, status), ()))
+
+    def first(self, role: str, status: str) -> Optional[T]:
+        return next(self.select(role, status), None)
+
+    def count(self, role: str, status: str) -> int:
+        return len(self._index.get((role, status), ()))
+
+    def counts(self) -> Dict[IndexKey, int]:
+        """Number of items per (role, status)."""
+        return {key: len(bucket) for key, bucket in self._index.items()}
@@ -0,0 +1,105 @@
+import asyncio
+import os
+from collections import deque
+from itertools import islice
+from typing import Deque, Iterable, List, Optional, Set, Tuple
+
+from ..models.task import TaskStatus
+from ..models.records import TaskRecord
+from .blackboard import Blackboard, blackboard
+
+TASK_FEED_CAPACITY = int(os.getenv("TASK_FEED_CAPACITY", "10000"))  # Events kept for resuming subscribers
+
+
+class TaskFeed:
+    """
+    Sequenced stream of task events for out-of-process subscribers (agent pollers).
+
+    Events are `{"seq", "event", "task": {id, role, status}}` with event one of
+    task_added, task_updated (status changes) and task_ready (a PENDING task became
+    claimable), plus config_updated, which every subscriber receives. A subscriber
+    long-polls `wait(roles, after_seq)` and resumes from the last seq it saw; if that
+    seq has already been evicted from the ring buffer (or belongs to a previous server
+    run) the reply says `reset` and the subscriber has to resync from current state.
+    """
+
+    def __init__(self, board: Blackboard, capacity: int = 10000):
+        self.board = board
+        self.seq = 0
+        self._events: Deque[Tuple[int, Optional[str], dict]] = deque(maxlen=capacity)
+        self._waiters: Set[asyncio.Future] = set()
+        self._started = False
+
+    def start(self):
+        """Subscribes to the Blackboard; call after recovery so replayed state isn't re-announced."""
+        if self._started:
+            return
+        self._started = True
+        self.board.subscribe(self._on_mutation)
+        self.board.on_ready(self._on_ready)
+
+    def _on_mutation(self, kind: str, op: str, item_id: Optional[str], data: dict):
+        if kind == "task":
+            if op == "add":
+                self._publish(data["role"], "task_added", _summary(data["id"], data["role"], data["status"]))
+            elif "status" in data:
+                task = self.board.get_task(item_id)
+                self._publish(task.role, "task_updated", _summary(task.id, task.role, task.status))
+        elif kind == "config":
+            self._publish(None, "config_updated", data)
+
+    def _on_ready(self, task: TaskRecord):
+        self._publish(task.role, "task_ready", _summary(task.id, task.role, task.status))
+
+    def _publish(self, role: Optional[str], event: str, payload: dict):
+        self.seq += 1
+        key = "task" if event.startswith("task_") else "config"
+        self._events.append((self.seq, role, {"seq": self.seq, "event": event, key: payload}))
+        if self._waiters:
+            for waiter in self._waiters:
+                if not waiter.done():
+                    waiter.set_result(None)
+            self._waiters.clear()
+
+    def read(self, roles: Iterable[str], after_seq: int) -> Tuple[List[dict], bool]:
+        """Events after `after_seq` for the given roles, and whether the subscriber must resync."""
+        roles = set(roles)
+        if after_seq > self.seq:
+            return [], True  # The server restarted since the subscriber last read
+        if not self._events or after_seq >= self.seq:
+            return [], False
+        first_seq = self._events[0][0]
+        reset = after_seq < first_seq - 1
+        start = max(0, after_seq - first_seq + 1)
+        events = [event for _, role, event in islice(self._events, start, None) if role is None or role in roles]
+        return events, reset
+
+    async def wait(self, roles: Iterable[str], after_seq: int, timeout: float) -> Tuple[List[dict], bool]:
+        """Long-poll: returns as soon as there is something for these roles, or after `timeout`."""
+        roles = set(roles)
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            events, reset = self.read(roles, after_seq)
+            if events or reset:
+                return events, reset
+            # Nothing relevant up to seq: later reads only need what comes after it
+            after_seq = self.seq
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                return [], False
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.add(waiter)
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                return [], False
+            finally:
+                self._waiters.discard(waiter)
+
+
+def _summary(task_id: str, role: str, status) -> dict:
+    return {"id": task_id, "role": role, "status": TaskStatus(status).value}
+
+
+# Singleton
+task_feed = TaskFeed(blackboard, capacity=TASK_FEED_CAPACITY)
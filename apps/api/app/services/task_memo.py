@@ -0,0 +1,285 @@
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from ..core.metrics import metrics
+from ..models.records import TaskRecord
+from ..models.task import TaskStatus
+from .blackboard import Blackboard, blackboard
+
+# Roles whose tasks are memoized, as role:ttl[:max_entries[:eviction]] separated by commas, e.g.
+# "Reviewer:3600,Architect:600:200:lfu"; "*" covers every other role. Unset: nothing is memoized.
+TASK_MEMO_ROLES = os.getenv("TASK_MEMO_ROLES", "")
+TASK_MEMO_MAX_ENTRIES = int(os.getenv("TASK_MEMO_MAX_ENTRIES", "1000"))  # Per role, unless its policy says otherwise
+
+CLAIMANT = "memo"
+
+MEMO_LOOKUPS = metrics.counter("task_memo_lookups", "Ready tasks of memoized roles, by outcome (hit/miss/collapsed).", ["role", "outcome"])
+MEMO_EVICTIONS = metrics.counter("task_memo_evictions", "Memoized results dropped, by reason (expired/evicted/invalidated).", ["reason"])
+
+
+class MemoPolicy(NamedTuple):
+    ttl: float  # Seconds a result is reused for
+    max_entries: int
+    eviction: str  # "lru" or "lfu" once max_entries is reached
+
+
+class _Entry:
+    __slots__ = ("fields", "expires", "hits", "source")
+
+    def __init__(self, fields: dict, expires: float, source: str):
+        self.fields = fields  # result, result_digest, result_size
+        self.expires = expires
+        self.hits = 0
+        self.source = source  # Task that produced it
+
+
+def parse_policies(spec: str, max_entries: int = 1000) -> Dict[str, MemoPolicy]:
+    policies = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        role, *rest = item.split(":")
+        ttl = float(rest[0]) if rest else 3600
+        limit = int(rest[1]) if len(rest) > 1 else max_entries
+        eviction = rest[2] if len(rest) > 2 else "lru"
+        if eviction not in ("lru", "lfu"):
+            raise ValueError(f"Unknown memo eviction policy {eviction!r} for {role}.")
+        policies[role] = MemoPolicy(ttl, limit, eviction)
+    return policies
+
+
+class TaskMemo:
+    """
+    Reuses the results of identical tasks instead of running them again.
+
+    A task's fingerprint is its role and description, normalised for case and
+    whitespace, plus the digests of its dependencies' results, so "Verify Results" after
+    different work is a different task. When a task of a memoized role becomes ready:
+
+      - a fresh result under its fingerprint (hit) completes it at once, PENDING to DONE,
+        without an agent or a UI trigger;
+      - if an identical task is already running, it waits for that one (collapsed) and
+        completes with its result, or takes over if it fails;
+      - otherwise (miss) it is dispatched as usual, and its result is kept when it is done.
+
+    Waiting and reused tasks are taken out of the ready queue in the Blackboard's
+    ready hook, before the dispatcher or an MCP agent can claim them, and completed
+    under the usual claim key. Results are kept per role for the role's TTL, up to
+    `max_entries`, evicting the least recently (lru) or least often (lfu) reused one.
+    Entries live in this worker's memory; they reference results by digest, so large
+    results stay in the artifact store.
+    """
+
+    def __init__(self, board: Blackboard, policies: Dict[str, MemoPolicy]):
+        self.board = board
+        self.policies = policies
+        self._entries: Dict[str, "OrderedDict[str, _Entry]"] = {}  # role -> fingerprint -> entry
+        self._leaders: Dict[str, str] = {}  # fingerprint -> task being run for it
+        self._leading: Dict[str, Tuple[str, str]] = {}  # task -> (role, fingerprint)
+        self._followers: Dict[str, List[str]] = {}  # fingerprint -> tasks waiting for its leader
+        self._waiting: Dict[str, str] = {}  # follower task -> fingerprint
+        self.counts: Dict[str, Dict[str, int]] = {}  # role -> outcome -> count
+        self._completions: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.policies)
+
+    def start(self):
+        if not self.enabled or self._worker:
+            return
+        self._completions = asyncio.Queue()
+        self.board.subscribe(self._on_mutation)
+        self.board.on_ready(self._on_ready)
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker:
+            self._worker.cancel()
+            self._worker = None
+
+    def policy(self, role: str) -> Optional[MemoPolicy]:
+        return self.policies.get(role) or self.policies.get("*")
+
+    def fingerprint(self, task: TaskRecord) -> str:
+        digest = hashlib.sha256()
+        for part in (task.role, task.description):
+            digest.update(" ".join(part.split()).casefold().encode())
+            digest.update(b"\0")
+        for dep_id in sorted(task.dependencies):
+            dep = self.board.get_task(dep_id)
+            if dep is None:
+                digest.update(b"?\0")
+                continue
+            digest.update((dep.result_digest or hashlib.sha256((dep.result or "").encode()).hexdigest()).encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def lookup(self, role: str, fingerprint: str) -> Optional[_Entry]:
+        entries = self._entries.get(role)
+        entry = entries.get(fingerprint) if entries else None
+        if entry is None:
+            return None
+        if entry.expires < time.time():
+            del entries[fingerprint]
+            MEMO_EVICTIONS.inc("expired")
+            return None
+        entries.move_to_end(fingerprint)
+        entry.hits += 1
+        return entry
+
+    def invalidate(self, role: Optional[str] = None, fingerprint: Optional[str] = None, task_id: Optional[str] = None) -> int:
+        """Drops memoized results: one task's (its current fingerprint), one fingerprint's, a role's, or all. Returns how many."""
+        if task_id is not None:
+            task = self.board.get_task(task_id)
+            if task is None:
+                return 0
+            role, fingerprint = task.role, self.fingerprint(task)
+        removed = 0
+        for entry_role, entries in self._entries.items():
+            if role is not None and entry_role != role:
+                continue
+            if fingerprint is None:
+                removed += len(entries)
+                entries.clear()
+            elif entries.pop(fingerprint, None) is not None:
+                removed += 1
+        if removed:
+            MEMO_EVICTIONS.inc("invalidated", amount=removed)
+        return removed
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "policies": {role: policy._asdict() for role, policy in self.policies.items()},
+            "roles": {
+                role: {"entries": len(self._entries.get(role, ())), **counts}
+                for role, counts in self.counts.items()
+            },
+            "running": len(self._leaders),
+            "waiting": len(self._waiting),
+        }
+
+    def sizes(self) -> Dict[str, int]:
+        """Memoized results per role."""
+        return {role: len(entries) for role, entries in self._entries.items()}
+
+    def entries(self, role: str, limit: int = 100) -> List[dict]:
+        """Most recently used first."""
+        now = time.time()
+        listed = []
+        for fingerprint, entry in reversed(self._entries.get(role, OrderedDict()).items()):
+            if len(listed) >= limit:
+                break
+            if entry.expires >= now:
+                listed.append({"fingerprint": fingerprint, "source": entry.source, "hits": entry.hits, "expires": entry.expires,
+                               "result_digest": entry.fields.get("result_digest"), "result_size": entry.fields.get("result_size")})
+        return listed
+
+    # --- Hooks (synchronous, inside Blackboard mutations) -------------------
+
+    def _on_ready(self, task: TaskRecord):
+        if self.policy(task.role) is None or task.id in self._waiting:
+            return
+        fingerprint = self.fingerprint(task)
+        leader = self._leaders.get(fingerprint)
+        if leader == task.id:
+            return  # The running one was re-queued (e.g. its lease expired); it stays the leader
+        entry = self.lookup(task.role, fingerprint)
+        if entry is not None:
+            self._count(task.role, "hit")
+            self.board.ready_queue.discard(task.id)
+            self._completions.put_nowait((task.id, entry.fields, entry.source))
+        elif leader is not None:
+            self._count(task.role, "collapsed")
+            self.board.ready_queue.discard(task.id)
+            self._followers.setdefault(fingerprint, []).append(task.id)
+            self._waiting[task.id] = fingerprint
+        else:
+            self._count(task.role, "miss")
+            self._leaders[fingerprint] = task.id
+            self._leading[task.id] = (task.role, fingerprint)
+
+    def _on_mutation(self, kind: str, op: str, item_id: Optional[str], data: dict):
+        if kind != "task" or op != "update" or "status" not in data:
+            return
+        status = data["status"]
+        if item_id in self._waiting and status != TaskStatus.PENDING:
+            # Finished or claimed some other way; it no longer waits
+            fingerprint = self._waiting.pop(item_id)
+            self._followers[fingerprint].remove(item_id)
+            if not self._followers[fingerprint]:
+                del self._followers[fingerprint]
+        if item_id not in self._leading or status in (TaskStatus.PENDING, TaskStatus.IN_PROGRESS):
+            return
+        role, fingerprint = self._leading.pop(item_id)
+        del self._leaders[fingerprint]
+        followers = self._followers.pop(fingerprint, [])
+        for follower in followers:
+            del self._waiting[follower]
+        if status == TaskStatus.DONE:
+            task = self.board.get_task(item_id)
+            fields = {"result": task.result, "result_digest": task.result_digest, "result_size": task.result_size}
+            self._remember(role, fingerprint, fields, item_id)
+            for follower in followers:
+                self._completions.put_nowait((follower, fields, item_id))
+        elif followers:
+            # The run failed: the first waiting task runs instead, the others keep waiting for it
+            self._completions.put_nowait((followers[0], None, None))
+            self._followers[fingerprint] = followers[1:]
+            for follower in followers[1:]:
+                self._waiting[follower] = fingerprint
+
+    def _remember(self, role: str, fingerprint: str, fields: dict, source: str):
+        policy = self.policy(role)
+        entries = self._entries.setdefault(role, OrderedDict())
+        entries[fingerprint] = _Entry(fields, time.time() + policy.ttl, source)
+        entries.move_to_end(fingerprint)
+        if len(entries) <= policy.max_entries:
+            return
+        now = time.time()
+        for key in [key for key, entry in entries.items() if entry.expires < now]:
+            del entries[key]
+            MEMO_EVICTIONS.inc("expired")
+        while len(entries) > policy.max_entries:
+            if policy.eviction == "lfu":
+                victim = min(entries, key=lambda key: entries[key].hits)
+            else:
+                victim = next(iter(entries))
+            del entries[victim]
+            MEMO_EVICTIONS.inc("evicted")
+
+    def _count(self, role: str, outcome: str):
+        counts = self.counts.setdefault(role, {"hit": 0, "miss": 0, "collapsed": 0})
+        counts[outcome] += 1
+        MEMO_LOOKUPS.inc(role, outcome)
+
+    # --- Completion ------------------------------------------------------------
+
+    async def _run(self):
+        while True:
+            task_id, fields, source = await self._completions.get()
+            try:
+                if fields is None:
+                    self.board._announce_ready([task_id])  # Back in the ready queue, as the new leader
+                else:
+                    await self._complete(task_id, fields, source)
+            except Exception as e:
+                print(f"❌ Memo error ({task_id}): {e}")
+
+    async def _complete(self, task_id: str, fields: dict, source: str):
+        task = self.board.get_task(task_id)
+        if not task or task.status != TaskStatus.PENDING:
+            return
+        # Other workers may race for the same task; only the holder of the claim key proceeds
+        if not await self.board.state.acquire(f"claim:{task_id}", CLAIMANT) or task.status != TaskStatus.PENDING:
+            return
+        await self.board.update_task_status(task_id, TaskStatus.DONE, result_fields=fields)
+        await self.board.add_log(task.role, f"Reused the result of identical task {source} for {task_id}.")
+
+
+# Singleton
+task_memo = TaskMemo(blackboard, parse_policies(TASK_MEMO_ROLES, TASK_MEMO_MAX_ENTRIES))
@@ -0,0 +1,64 @@
+import time
+from typing import Dict, Optional, Tuple
+
+from ..models.task import TaskStatus
+from ..core.metrics import MetricsRegistry, DURATION_BUCKETS, metrics
+from .blackboard import Blackboard, blackboard
+
+
+class LifecycleMetrics:
+    """
+    Task and agent lifecycle metrics derived from Blackboard mutations: how long tasks
+    wait PENDING before being claimed and run IN_PROGRESS before finishing, per role,
+    plus task and agent counts per (role, status) computed at scrape time.
+    """
+
+    def __init__(self, board: Blackboard, registry: MetricsRegistry):
+        self.board = board
+        self.wait = registry.histogram("task_wait_seconds", "Time a task spent PENDING before being claimed.", ["role"], DURATION_BUCKETS)
+        self.run = registry.histogram("task_run_seconds", "Time a task spent IN_PROGRESS, by final status.", ["role", "status"], DURATION_BUCKETS)
+        self.transitions = registry.counter("task_transitions", "Task status changes, by new status.", ["status"])
+        registry.gauge("tasks", "Tasks by role and status.", ["role", "status"], fn=lambda: _by_role_status(board.task_store.counts()))
+        registry.gauge("agents", "Agents by role and status.", ["role", "status"], fn=lambda: _by_role_status(board.agent_store.counts()))
+        registry.gauge("task_leases", "Claimed tasks holding a lease.", fn=lambda: {(): len(board.leases)})
+        self._since: Dict[str, Tuple[TaskStatus, float]] = {}  # task -> (status, when it entered it)
+        self._started = False
+
+    def start(self):
+        """Subscribes to the Blackboard; call after recovery so replayed history isn't timed."""
+        if self._started:
+            return
+        self._started = True
+        self.board.subscribe(self._on_mutation)
+
+    def _on_mutation(self, kind: str, op: str, item_id: Optional[str], data: dict):
+        if kind != "task":
+            return
+        now = time.monotonic()
+        if op == "add":
+            self._since[data["id"]] = (TaskStatus(data["status"]), now)
+            return
+        status = data.get("status")
+        if status is None:
+            return
+        status = TaskStatus(status)
+        previous, since = self._since.get(item_id, (None, now))
+        if status == previous:
+            return
+        task = self.board.get_task(item_id)
+        self._since.pop(item_id, None)
+        self.transitions.inc(status.value)
+        if previous == TaskStatus.PENDING and status == TaskStatus.IN_PROGRESS:
+            self.wait.observe(now - since, task.role)
+        elif previous == TaskStatus.IN_PROGRESS and status != TaskStatus.PENDING:
+            self.run.observe(now - since, task.role, status.value)
+        if status in (TaskStatus.PENDING, TaskStatus.IN_PROGRESS):
+            self._since[item_id] = (status, now)
+
+
+def _by_role_status(counts: dict) -> dict:
+    return {(role, getattr(status, "value", status)): count for (role, status), count in counts.items()}
+
+
+# Singleton
+lifecycle_metrics = LifecycleMetrics(blackboard, metrics)
@@ -0,0 +1,157 @@
+"""
+Large task results: --tasks completions, each reporting a --size-mb result shaped like a
+code diff (a --duplicates share of them repeat an earlier result, as agents re-reporting
+the same output do). Compares keeping results inline on the task (what every completion
+did before the artifact store; an inline limit above the result size) with offloading
+them to the artifact store, and reports:
+
+  - memory the Blackboard retains afterwards (tracemalloc; the artifact LRU cache only
+    fills as artifacts are read, so it is empty here);
+  - bytes per `task_updated` broadcast and of a full dashboard snapshot, which is also
+    roughly what the WAL and replication carry per completion;
+  - completion latency (hashing, compression and the write run in a worker thread);
+  - disk used, and download throughput of whole artifacts from disk and from the cache,
+    and of a 64 KiB range from the middle.
+
+Run from the repository root:
+    python -m apps.api.benchmarks.bench_artifacts --tasks 40 --size-mb 2
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from apps.api.app.models.task import Task, TaskStatus
+from apps.api.app.services.artifact_store import ArtifactStore
+from apps.api.app.services.blackboard import Blackboard
+
+WORDS = ["self", "return", "await", "task", "result", "if", "for", "in", "None", "value", "board", "def", "import", "status"]
+
+
+def make_result(seed: int, size: int) -> str:
+    rng = random.Random(seed)
+    lines, total, n = [], 0, 0
+    while total < size:
+        n += 1
+        line = f"{rng.choice('+- ')} {' ' * rng.randrange(0, 12, 4)}{' '.join(rng.choice(WORDS) for _ in range(rng.randint(3, 10)))}  # {rng.getrandbits(32):08x} L{n}\n"
+        lines.append(line)
+        total += len(line)
+    return "".join(lines)[:size]
+
+
+def workload(args):
+    size = int(args.size_mb * 1024 * 1024)
+    rng = random.Random(args.seed)
+    seeds = []
+    for i in range(args.tasks):
+        seeds.append(rng.choice(seeds) if seeds and rng.random() < args.duplicates else i)
+    return size, seeds
+
+
+async def _quiet_log(*_):
+    pass
+
+
+async def complete_all(board: Blackboard, texts: dict, seeds, measure_memory: bool):
+    await board.add_tasks([Task(id=f"t{i}", description="bench", role="Coder") for i in range(len(seeds))])
+    latencies, broadcast = [], []
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0] if measure_memory else 0
+    for i, seed in enumerate(seeds):
+        result = texts[seed].encode().decode()  # A fresh string, as a request would bring
+        started = time.perf_counter()
+        await board.update_task_status(f"t{i}", TaskStatus.DONE, result=result)
+        latencies.append(time.perf_counter() - started)
+        broadcast.append(len(json.dumps(board.get_task(f"t{i}").to_dict())))
+        del result
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before if measure_memory else 0
+    snapshot = len(json.dumps([task.to_dict() for task in board.tasks]))
+    return latencies, broadcast, snapshot, retained
+
+
+def disk_bytes(root: str) -> int:
+    return sum(os.path.getsize(os.path.join(d, name)) for d, _, names in os.walk(root) for name in names)
+
+
+def download(store: ArtifactStore, digests):
+    started, total = time.perf_counter(), 0
+    for digest in digests:
+        artifact = store.stat(digest)
+        total += sum(len(chunk) for chunk in store.iter_range(artifact))
+    return total / (time.perf_counter() - started) / 1024 / 1024
+
+
+async def run(mode: str, args, root: str, texts: dict) -> dict:
+    size, seeds = workload(args)
+    inline = size + 1 if mode == "inline" else args.inline_bytes
+    cache = int(args.cache_mb * 1024 * 1024)
+
+    def board_for(directory):
+        board = Blackboard()
+        board.add_log = _quiet_log
+        board.artifacts = ArtifactStore(root=directory, inline_bytes=inline, cache_bytes=cache, level=args.level)
+        return board
+
+    tracemalloc.start()
+    _, _, _, retained = await complete_all(board_for(os.path.join(root, "memory")), texts, seeds, measure_memory=True)
+    tracemalloc.stop()
+
+    board = board_for(os.path.join(root, "timed"))
+    latencies, broadcast, snapshot, _ = await complete_all(board, texts, seeds, measure_memory=False)
+    report = {
+        "retained_mb": retained / 1024 / 1024,
+        "broadcast_kb": statistics.mean(broadcast) / 1024,
+        "snapshot_kb": snapshot / 1024,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "disk_mb": disk_bytes(board.artifacts.root) / 1024 / 1024 if os.path.isdir(board.artifacts.root) else 0.0,
+    }
+    digests = sorted({task.result_digest for task in board.tasks if task.result_digest})
+    if digests:
+        store = board.artifacts
+        store.cache_bytes = 0  # Nothing fits: read through from disk
+        report["disk_read_mb_s"] = download(store, digests)
+        store.cache_bytes = max(cache, size * 8 + 1)
+        download(store, digests)
+        report["cached_read_mb_s"] = download(store, digests)
+        store.cache_bytes = 0
+        artifact = store.stat(digests[0])
+        started = time.perf_counter()
+        sum(len(c) for c in store.iter_range(artifact, artifact.size // 2, artifact.size // 2 + 64 * 1024))
+        report["range_ms"] = (time.perf_counter() - started) * 1000
+    return report
+
+
+async def main(args):
+    size, seeds = workload(args)
+    texts = {seed: make_result(seed, size) for seed in set(seeds)}
+    print(f"{args.tasks} results of {args.size_mb:g} MiB, {args.tasks - len(texts)} duplicates")
+    print(f"{'mode':<10} {'retained':>10} {'broadcast':>10} {'snapshot':>10} {'p50':>9} {'max':>9} {'disk':>9}"
+          f" {'disk read':>11} {'cache read':>11} {'64K range':>10}")
+    for mode in ("inline", "artifacts"):
+        with tempfile.TemporaryDirectory() as root:
+            r = await run(mode, args, root, texts)
+        row = (f"{mode:<10} {r['retained_mb']:>8.1f}MB {r['broadcast_kb']:>8.1f}KB {r['snapshot_kb']:>8.0f}KB "
+               f"{r['p50_ms']:>7.1f}ms {r['max_ms']:>7.1f}ms {r['disk_mb']:>7.1f}MB")
+        if "disk_read_mb_s" in r:
+            row += f" {r['disk_read_mb_s']:>7.0f}MB/s {r['cached_read_mb_s']:>7.0f}MB/s {r['range_ms']:>8.1f}ms"
+        print(row)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=40)
+    parser.add_argument("--size-mb", type=float, default=2, help="Size of each result")
+    parser.add_argument("--duplicates", type=float, default=0.25, help="Share of results repeating an earlier one")
+    parser.add_argument("--inline-bytes", type=int, default=1024, help="Artifact store inline limit")
+    parser.add_argument("--cache-mb", type=float, default=64, help="Artifact store LRU cache size")
+    parser.add_argument("--level", type=int, default=1, help="Artifact store zlib level")
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
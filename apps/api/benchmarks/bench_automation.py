@@ -0,0 +1,82 @@
+"""
+UI automation dispatcher benchmark with a stub executor (no IDE or osascript needed).
+
+Submits a burst of triggers spread over a few roles and reports how many executor runs
+they needed once queued prompts for the same role were merged, end-to-end throughput,
+and the worst event-loop lag meanwhile. The "blocking" row reproduces the old behaviour
+(subprocess.communicate() called from inside the coroutine) for comparison.
+
+Run from the repository root:
+    python -m apps.api.benchmarks.bench_automation --triggers 200 --roles 4 --run-ms 50
+"""
+import argparse
+import asyncio
+import subprocess
+import time
+
+from apps.api.app.services import automation as automation_module
+from apps.api.app.services.automation import AutomationService, CommandExecutor
+
+
+class BlockingService(AutomationService):
+    """One synchronous subprocess per trigger, as run_applescript used to do."""
+
+    def submit(self, role: str, description: str) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        argv, stdin = self.executor.command(self.build_prompt(role, [description]))
+        subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True).communicate(stdin)
+        self.sent += 1
+        future.set_result(None)
+        return future
+
+
+async def measure(service: AutomationService, triggers: int, roles: int, spacing: float, tick: float = 0.005) -> dict:
+    lags = []
+    running = True
+
+    async def ticker():
+        while running:
+            t0 = time.perf_counter()
+            await asyncio.sleep(tick)
+            lags.append(time.perf_counter() - t0 - tick)
+
+    async def producer():
+        futures = []
+        for i in range(triggers):
+            futures.append(service.submit(f"Role{i % roles}", f"Task {i}"))
+            if spacing:
+                await asyncio.sleep(spacing)
+        await asyncio.gather(*futures)
+
+    monitor = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await producer()
+    elapsed = time.perf_counter() - start
+    running = False
+    await monitor
+    await service.stop()
+    return {"seconds": elapsed, "rate": triggers / elapsed, "runs": service.sent + service.failed, "max_lag_ms": max(lags, default=0) * 1000}
+
+
+async def run(args):
+    # The dispatcher's completion logs are not what is being measured
+    async def _quiet(*_):
+        pass
+    automation_module.blackboard.add_log = _quiet
+
+    executor = CommandExecutor(["sleep", str(args.run_ms / 1000)])
+    spacing = args.spacing_ms / 1000
+    print(f"{'mode':<22} {'triggers':>8} {'runs':>6} {'seconds':>8} {'trig/s':>8} {'max loop lag':>13}")
+    rows = [("blocking (old)", BlockingService(executor=executor)), ("queued + merged", AutomationService(executor=executor))]
+    for name, service in rows:
+        r = await measure(service, args.triggers, args.roles, spacing)
+        print(f"{name:<22} {args.triggers:>8} {r['runs']:>6} {r['seconds']:>8.2f} {r['rate']:>8.1f} {r['max_lag_ms']:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--triggers", type=int, default=200)
+    parser.add_argument("--roles", type=int, default=4)
+    parser.add_argument("--run-ms", type=float, default=50, help="Stub executor runtime per trigger")
+    parser.add_argument("--spacing-ms", type=float, default=1, help="Delay between submitted triggers")
+    asyncio.run(run(parser.parse_args()))
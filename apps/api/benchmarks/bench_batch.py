@@ -0,0 +1,101 @@
+"""
+Batch task submission and completion: imports an N-task mission graph (random DAG)
+one task at a time versus through Blackboard.add_tasks, with the batch listed in
+dependency order and shuffled, completes it one by one versus through update_tasks, and
+times the same import over HTTP as one request per task versus one POST /api/v1/tasks/batch.
+
+In-process there is no per-call I/O to save: a batch in dependency order is validated in
+one pass and comes out ahead (no per-task broadcast, no GC passes during the insert), a
+shuffled one also pays for the topological sort and is about on par. The batch pays off
+at the API boundary, where each task would otherwise be a round-trip. In-process times
+are the best of --repeat runs.
+
+Run from the repository root:
+    python -m apps.api.benchmarks.bench_batch --tasks 10000
+"""
+import argparse
+import asyncio
+import gc
+import random
+import time
+
+import httpx
+
+from apps.api.app.models.task import Task, TaskStatus
+from apps.api.app.services.blackboard import Blackboard
+
+
+def graph(count: int, seed: int, prefix: str = "t"):
+    rng = random.Random(seed)
+    specs = []
+    for i in range(count):
+        deps = sorted({f"{prefix}{rng.randrange(i)}" for _ in range(rng.randint(0, 2))}) if i else []
+        specs.append({"id": f"{prefix}{i}", "description": f"Task {i}", "role": rng.choice(["Architect", "Coder", "Reviewer"]), "dependencies": deps})
+    return specs
+
+
+async def one_by_one(specs) -> dict:
+    board = Blackboard()
+    start = time.perf_counter()
+    for spec in specs:
+        await board.add_task(Task(**spec))
+    added = time.perf_counter() - start
+    start = time.perf_counter()
+    for spec in specs:
+        await board.update_task_status(spec["id"], TaskStatus.DONE, result="ok")
+    return {"add": added, "complete": time.perf_counter() - start}
+
+
+async def batched(specs, seed: int, shuffle: bool) -> dict:
+    board = Blackboard()
+    listed = list(specs)
+    if shuffle:
+        random.Random(seed).shuffle(listed)
+    start = time.perf_counter()
+    await board.add_tasks([Task(**spec) for spec in listed])
+    added = time.perf_counter() - start
+    start = time.perf_counter()
+    await board.update_tasks([(spec["id"], TaskStatus.DONE, "ok") for spec in specs])
+    return {"add": added, "complete": time.perf_counter() - start}
+
+
+async def best_of(mode, repeat: int) -> dict:
+    best = {}
+    for _ in range(repeat):
+        gc.collect()  # The previous run's board would otherwise be collected during this one
+        for key, value in (await mode()).items():
+            best[key] = min(value, best.get(key, value))
+    return best
+
+
+async def over_http(specs, batch: bool) -> float:
+    from apps.api.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api") as client:
+        start = time.perf_counter()
+        for chunk in [specs] if batch else ([spec] for spec in specs):
+            response = await client.post("/api/v1/tasks/batch", json={"tasks": chunk})
+            response.raise_for_status()
+        return time.perf_counter() - start
+
+
+async def run(args):
+    specs = graph(args.tasks, args.seed)
+    print(f"{args.tasks} tasks, {sum(len(s['dependencies']) for s in specs)} dependency edges")
+    print(f"{'mode':<16} {'add':>10} {'complete':>10}")
+    modes = (("one by one", lambda: one_by_one(specs)),
+             ("batch, in order", lambda: batched(specs, args.seed, shuffle=False)),
+             ("batch, shuffled", lambda: batched(specs, args.seed, shuffle=True)))
+    for name, mode in modes:
+        result = await best_of(mode, args.repeat)
+        print(f"{name:<16} {result['add'] * 1000:>7.1f} ms {result['complete'] * 1000:>7.1f} ms")
+    print(f"{'HTTP, 1 request per task':<26} {await over_http(graph(args.tasks, args.seed, 'single'), batch=False) * 1000:>8.1f} ms")
+    print(f"{'HTTP, 1 batch request':<26} {await over_http(graph(args.tasks, args.seed, 'batch'), batch=True) * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3, help="In-process runs per mode; the best is reported")
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,95 @@
+"""
+Micro-benchmarks for the Blackboard lookup call sites: linear list scans (the
+previous implementation) against the IndexedStore lookups.
+
+Run from the repository root:
+    python -m apps.api.benchmarks.bench_blackboard --sizes 1000 5000 20000
+"""
+import argparse
+import random
+import timeit
+
+from apps.api.app.models.agent import Agent, AgentStatus
+from apps.api.app.models.task import Task, TaskStatus
+from apps.api.app.services.blackboard import Blackboard
+
+ROLES = ["Architect", "Coder", "Reviewer", "Executive"]
+
+
+def populate(n_tasks: int, n_agents: int, seed: int = 3) -> Blackboard:
+    rng = random.Random(seed)
+    board = Blackboard()
+    # Most of a long-running board is finished work; pending tasks sit at the tail
+    for i in range(n_tasks):
+        status = TaskStatus.DONE if i < n_tasks * 0.9 else rng.choice(list(TaskStatus))
+        board.task_store.add(Task(id=f"t{i}", description="x", role=rng.choice(ROLES), status=status))
+    for i in range(n_agents):
+        busy = i < n_agents * 0.9
+        agent = Agent(id=f"a{i}", role=ROLES[i % len(ROLES)], status=AgentStatus.BUSY if busy else AgentStatus.IDLE)
+        board.agent_store.add(agent)
+        if busy:
+            agent.current_task_id = f"t{n_tasks - 1 - i}"
+            board._agent_by_task[agent.current_task_id] = agent.id
+    return board
+
+
+def call_sites(board: Blackboard, n_tasks: int, n_agents: int):
+    tasks, agents = board.tasks, board.agents
+    role = "Reviewer"
+    last_task = f"t{n_tasks - 1}"
+    last_agent = f"a{n_agents - 1}"
+
+    return {
+        "update_task_status (by id)": (
+            lambda: next(t for t in tasks if t.id == last_task),
+            lambda: board.get_task(last_task),
+        ),
+        "update_agent_status (by id)": (
+            lambda: next(a for a in agents if a.id == last_agent),
+            lambda: board.get_agent(last_agent),
+        ),
+        "mcp fetch_next_task": (
+            lambda: next((t for t in tasks if t.role == role and t.status in [TaskStatus.IN_PROGRESS, TaskStatus.PENDING]), None),
+            lambda: board.next_task(role, TaskStatus.IN_PROGRESS) or board.next_task(role, TaskStatus.PENDING),
+        ),
+        "mcp poll_tasks": (
+            lambda: [t for t in tasks if t.role == role and t.status == TaskStatus.PENDING],
+            lambda: (board.count_tasks(role), board.next_task(role)),
+        ),
+        "mcp submit (agent by task)": (
+            lambda: next((a for a in agents if a.current_task_id == last_task), None),
+            lambda: board.agent_for_task(last_task),
+        ),
+        "poller pending task": (
+            lambda: [t for t in tasks if t.role == role and t.status == TaskStatus.PENDING],
+            lambda: board.next_task(role),
+        ),
+        "dispatch idle agent": (
+            lambda: next((a for a in agents if a.role == role and a.status == AgentStatus.IDLE), None),
+            lambda: board.idle_agent(role),
+        ),
+    }
+
+
+def per_call_us(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--agents", type=int, default=200)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>7} {'call site':<30} {'scan (us)':>11} {'indexed (us)':>13} {'speedup':>9}")
+    for n in args.sizes:
+        board = populate(n, args.agents)
+        for name, (scan, indexed) in call_sites(board, n, args.agents).items():
+            before = per_call_us(scan, args.number)
+            after = per_call_us(indexed, args.number)
+            print(f"{n:>7} {name:<30} {before:>11.2f} {after:>13.3f} {before / after:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
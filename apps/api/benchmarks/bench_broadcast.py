@@ -0,0 +1,118 @@
+"""
+Broadcast pipeline benchmark: per-event emits ("immediate") against coalesced
+batch frames ("batched") fanned out to many simulated Socket.IO clients.
+
+Each client has a bounded inbound queue; a small share of clients are slow, so
+a blocking fan-out shows up as stalled mutations.
+
+Run from the repository root:
+    python -m apps.api.benchmarks.bench_broadcast --clients 1000 --missions 20
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from typing import List
+
+from apps.api.app.core.broadcaster import BATCH_EVENT, Broadcaster
+
+
+class SimulatedServer:
+    """
+    Stands in for socketio.AsyncServer: encodes once per emit and enqueues the packet to
+    every client. Publish timestamps travel next to the packet so that simulated clients,
+    which share one process here, don't pay a decode each.
+    """
+
+    def __init__(self, clients: int, slow_ratio: float, queue_size: int, sample_every: int):
+        self.queues = [asyncio.Queue(maxsize=queue_size) for _ in range(clients)]
+        self.slow = {i for i in range(clients) if random.random() < slow_ratio}
+        self.sample_every = sample_every
+        self.latencies: List[float] = []
+        self.packets = 0
+
+    async def emit(self, event, data, room=None):
+        packet = json.dumps([event, data])
+        items = data if event == BATCH_EVENT else [[event, data]]
+        stamps = [d["ts"] for _, d in items if "ts" in d]
+        self.packets += 1
+        for q in self.queues:
+            await q.put((packet, stamps))
+
+    async def client(self, i: int):
+        q = self.queues[i]
+        sampled = i % self.sample_every == 0
+        while True:
+            packet, stamps = await q.get()
+            if i in self.slow:
+                await asyncio.sleep(0.001)
+            if sampled:
+                now = time.perf_counter()
+                self.latencies.extend(now - ts for ts in stamps)
+            q.task_done()
+
+
+async def run_mode(batched: bool, args) -> dict:
+    random.seed(args.seed)
+    server = SimulatedServer(args.clients, args.slow_ratio, args.queue_size, args.sample_every)
+    broadcaster = Broadcaster(server, batched=batched, window_ms=args.window_ms)
+    consumers = [asyncio.create_task(server.client(i)) for i in range(args.clients)]
+
+    # Each mission mimics Commander.plan: add N tasks, log, then walk each task through its states
+    published = 0
+    mutation_time = 0.0
+    start = time.perf_counter()
+    for m in range(args.missions):
+        for t in range(args.tasks_per_mission):
+            tid = f"m{m}t{t}"
+            for event, status in (("task_added", "pending"), ("task_updated", "in_progress"), ("task_updated", "done")):
+                t0 = time.perf_counter()
+                await broadcaster.emit(event, {"id": tid, "status": status, "ts": t0}, key=("task", tid))
+                await broadcaster.emit("agent_log", {"agent": "Commander", "message": tid, "ts": t0})
+                mutation_time += time.perf_counter() - t0
+                published += 2
+            await asyncio.sleep(0)
+        await asyncio.sleep(args.interval_ms / 1000)
+
+    await broadcaster.stop()
+    await asyncio.gather(*(q.join() for q in server.queues))
+    elapsed = time.perf_counter() - start
+    for c in consumers:
+        c.cancel()
+
+    lat = sorted(server.latencies)
+    return {
+        "mode": "batched" if batched else "immediate",
+        "events": published,
+        "accept_rate": published / mutation_time,
+        "end_to_end_rate": published / elapsed,
+        "packets": server.packets,
+        "p50_ms": statistics.median(lat) * 1000,
+        "p99_ms": lat[int(len(lat) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--missions", type=int, default=20)
+    parser.add_argument("--tasks-per-mission", type=int, default=50)
+    parser.add_argument("--interval-ms", type=float, default=100, help="pause between missions")
+    parser.add_argument("--window-ms", type=float, default=50)
+    parser.add_argument("--slow-ratio", type=float, default=0.01)
+    parser.add_argument("--queue-size", type=int, default=256)
+    parser.add_argument("--sample-every", type=int, default=10, help="record latencies for every Nth client")
+    parser.add_argument("--seed", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'mode':>10} {'events':>7} {'packets':>8} {'accepted ev/s':>14} {'delivered ev/s':>15} {'p50 ms':>8} {'p99 ms':>8}")
+    for batched in (False, True):
+        r = asyncio.run(run_mode(batched, args))
+        print(f"{r['mode']:>10} {r['events']:>7} {r['packets']:>8} {r['accept_rate']:>14,.0f} "
+              f"{r['end_to_end_rate']:>15,.0f} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Mission analytics on large DAGs: one mission of N tasks, each depending on one to three
+of the --width tasks before it (long chains, about --width tasks ready at a time). Measures:
+  - indexing the whole graph (one batch, or on startup after recovery);
+  - adding tasks one by one, as a streamed plan does (tail propagation to ancestors);
+  - running the mission to completion: per-event overhead of the analytics on a status
+    change, compared with recomputing the longest path from scratch for every event;
+  - queries: summary/ETA, critical path, slack for every open task, and the lazy
+    recompute after duration estimates drift.
+
+Run from the repository root:
+    python -m apps.api.benchmarks.bench_critical_path --tasks 100000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from apps.api.app.models.task import Task, TaskStatus
+from apps.api.app.services.blackboard import Blackboard
+from apps.api.app.services.mission_analytics import MissionAnalytics
+
+ROLES = ["Architect", "Coder", "Reviewer", "Executive"]
+
+
+def graph(count: int, width: int, seed: int):
+    rng = random.Random(seed)
+    for i in range(count):
+        deps = {f"t{rng.randrange(max(0, i - width), i)}" for _ in range(rng.randint(1, 3))} if i >= width else set()
+        yield Task(id=f"t{i}", description="bench", role=ROLES[i % len(ROLES)], dependencies=sorted(deps), mission_id="m")
+
+
+def longest_path(board: Blackboard, durations: dict) -> float:
+    """What a non-incremental engine does per event: a full pass over the open graph."""
+    tail, best = {}, 0.0
+    tasks = [t for t in board.task_store.values() if t.status != TaskStatus.DONE]
+    children = {t.id: [] for t in tasks}
+    for t in tasks:
+        for dep in t.dependencies:
+            if dep in children:
+                children[dep].append(t.id)
+    for t in reversed(tasks):
+        tail[t.id] = durations[t.role] + max((tail[c] for c in children[t.id]), default=0.0)
+        best = max(best, tail[t.id])
+    return best
+
+
+async def _quiet_log(*_):
+    pass
+
+
+async def build(tasks, analytics: bool):
+    board = Blackboard()
+    board.add_log = _quiet_log
+    await board.add_tasks(tasks)
+    engine = MissionAnalytics(board, default_duration=60, update_interval=3600) if analytics else None
+    return board, engine
+
+
+def run_to_completion(board: Blackboard, limit: int):
+    """Claims and finishes ready tasks in ready-queue order; returns (seconds spent, tasks finished)."""
+    started = time.perf_counter()
+    finished = 0
+    while finished < limit:
+        progressed = False
+        for role in ROLES:
+            task_id = board.ready_queue.pop(role, board._claimable)
+            if task_id is None:
+                continue
+            board.task_store.update(task_id, status=TaskStatus.IN_PROGRESS)
+            board._set_task_status(task_id, TaskStatus.DONE)
+            finished += 1
+            progressed = True
+        if not progressed:
+            break
+    return time.perf_counter() - started, finished
+
+
+async def main(args):
+    tasks = list(graph(args.tasks, args.width, args.seed))
+    edges = sum(len(t.dependencies) for t in tasks)
+    print(f"{args.tasks} tasks, {edges} dependencies")
+
+    board, engine = await build(tasks, analytics=True)
+    started = time.perf_counter()
+    engine.start()
+    index = time.perf_counter() - started
+    print(f"index whole graph            {index * 1000:>9.1f} ms")
+
+    stream_board = Blackboard()
+    stream_board.add_log = _quiet_log
+    stream_engine = MissionAnalytics(stream_board, default_duration=60, update_interval=3600)
+    stream_engine.start()
+    started = time.perf_counter()
+    for task in tasks[: args.stream]:
+        await stream_board.add_task(task)
+    streamed = time.perf_counter() - started
+    plain = Blackboard()
+    plain.add_log = _quiet_log
+    started = time.perf_counter()
+    for task in tasks[: args.stream]:
+        await plain.add_task(task)
+    baseline = time.perf_counter() - started
+    print(f"add one by one               {(streamed - baseline) / args.stream * 1e6:>9.1f} us/task over plain add_task")
+
+    started = time.perf_counter()
+    summary = engine.summary("m")
+    query = time.perf_counter() - started
+    started = time.perf_counter()
+    path = engine.critical_path("m")
+    path_time = time.perf_counter() - started
+    started = time.perf_counter()
+    slack = engine.slack("m")
+    slack_time = time.perf_counter() - started
+    print(f"summary / ETA                {query * 1000:>9.2f} ms   (critical path {summary['critical_remaining']:.0f}s of work, frontier {len(engine.missions['m'].frontier)})")
+    print(f"critical path                {path_time * 1000:>9.2f} ms   ({len(path)} tasks)")
+    print(f"slack of every open task     {slack_time * 1000:>9.1f} ms   ({sum(1 for s in slack.values() if s == 0)} with none)")
+
+    durations = {role: 60.0 for role in ROLES}
+    started = time.perf_counter()
+    longest_path(board, durations)
+    full = time.perf_counter() - started
+    print(f"full recompute (per event)   {full * 1000:>9.1f} ms   what every status change would cost without increments")
+
+    engine._estimate["Coder"] = 90.0
+    engine.missions["m"].stale = True
+    started = time.perf_counter()
+    engine.summary("m")
+    print(f"re-estimate after drift      {(time.perf_counter() - started) * 1000:>9.1f} ms   (at most once per update interval)")
+
+    plain, _ = await build(tasks, analytics=False)
+    with_analytics, done = run_to_completion(board, args.finish)
+    without, _ = run_to_completion(plain, args.finish)
+    print(f"{f'finish {done} tasks':<28} {with_analytics / done * 1e6:>9.1f} us/task with analytics, {without / done * 1e6:.1f} without")
+    await engine.stop()
+    await stream_engine.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--width", type=int, default=200, help="How far back dependencies reach")
+    parser.add_argument("--stream", type=int, default=2000, help="Tasks added one by one")
+    parser.add_argument("--finish", type=int, default=20000, help="Tasks run to completion")
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
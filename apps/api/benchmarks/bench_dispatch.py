@@ -0,0 +1,125 @@
+"""
+Dispatcher simulation: hundreds of simulated agents with different speeds work through
+thousands of tasks on a real Blackboard + Dispatcher; reports makespan and utilisation
+per placement policy.
+
+Each task has 0.5-1.5x the mean amount of work; an agent finishes it in work / speed seconds
+(speeds are spread over --speed-min..--speed-max). Optionally agents join or go OFFLINE
+halfway through, exercising rebalancing and rescue. "first-idle" approximates the old
+behaviour (hand a task to whichever matching agent is idle, nothing queued per agent).
+
+Run from the repository root:
+    python -m apps.api.benchmarks.bench_dispatch --agents 50 --tasks 1000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from apps.api.app.models.agent import AgentStatus
+from apps.api.app.models.task import Task, TaskStatus
+from apps.api.app.services.blackboard import Blackboard
+from apps.api.app.services.dispatcher import Dispatcher
+
+
+class FirstIdleDispatcher(Dispatcher):
+    def _choose(self, role, exclude=None):
+        for agent_id in self._capable.get(role, ()):
+            if agent_id not in self._running and agent_id not in self._offline and not self._queues[agent_id]:
+                return agent_id
+        return None
+
+
+async def simulate(policy: str, args) -> dict:
+    rng = random.Random(args.seed)
+    board = Blackboard()
+    board.add_log = _quiet_log  # Keep the log store out of the measurement
+    speeds = {}
+    busy = {"seconds": 0.0}
+    done = asyncio.Event()
+    completed = {"count": 0}
+
+    async def work(agent, task):
+        started = time.perf_counter()
+        await asyncio.sleep(work_units[task.id] / speeds[agent.id])
+        busy["seconds"] += time.perf_counter() - started
+        current = board.get_agent(agent.id)
+        # An agent that went OFFLINE meanwhile lost the task to someone else
+        if current.status == AgentStatus.OFFLINE or current.current_task_id != task.id:
+            return
+        await board.update_task_status(task.id, TaskStatus.DONE)
+        completed["count"] += 1
+        if completed["count"] == args.tasks:
+            done.set()
+
+    cls = FirstIdleDispatcher if policy == "first-idle" else Dispatcher
+    dispatcher = cls(board, work, policy=policy, queue_size=0 if policy == "first-idle" else args.queue_size, default_duration=args.work_ms / 1000)
+    if policy == "first-idle":
+        dispatcher.queue_size = 1  # Room for the one task being started, nothing queued behind it
+
+    async def register(count: int):
+        for _ in range(count):
+            agent = await board.register_agent("Coder")
+            speeds[agent.id] = rng.uniform(args.speed_min, args.speed_max)
+
+    await register(args.agents)
+    await dispatcher.start()
+
+    async def feed_ready():
+        while True:
+            dispatcher.offer(await board.scheduler.ready.get())
+
+    feeder = asyncio.create_task(feed_ready())
+    work_units = {}
+    start = time.perf_counter()
+    for i in range(args.tasks):
+        task = Task(id=f"t{i}", description=f"Task {i}", role="Coder")
+        work_units[task.id] = rng.uniform(0.5, 1.5) * args.work_ms / 1000
+        await board.add_task(task)
+
+    if args.join or args.fail:
+        await asyncio.sleep(args.event_after_ms / 1000)
+        for agent in rng.sample(list(board.agent_store.values()), args.fail):
+            await board.update_agent_status(agent.id, AgentStatus.OFFLINE)
+            speeds[agent.id] = 0  # Offline agents don't contribute capacity
+        await register(args.join)
+
+    await asyncio.wait_for(done.wait(), args.timeout)
+    makespan = time.perf_counter() - start
+    feeder.cancel()
+    await dispatcher.stop()
+
+    capacity = sum(s for s in speeds.values())
+    ideal = sum(work_units.values()) / capacity
+    agents = len(board.agent_store) - args.fail
+    return {"makespan": makespan, "ideal": ideal, "utilisation": busy["seconds"] / (agents * makespan)}
+
+
+async def _quiet_log(*_):
+    pass
+
+
+async def run(args):
+    print(f"{args.agents} agents (speed {args.speed_min}-{args.speed_max}x), {args.tasks} tasks (mean {args.work_ms} ms of work)"
+          + (f", +{args.join} joining / {args.fail} going offline" if args.join or args.fail else ""))
+    print(f"{'policy':<14} {'makespan':>10} {'ideal':>8} {'vs ideal':>9} {'utilisation':>12}")
+    for policy in args.policies:
+        r = await simulate(policy, args)
+        print(f"{policy:<14} {r['makespan']:>8.2f} s {r['ideal']:>6.2f} s {r['makespan'] / r['ideal']:>8.2f}x {r['utilisation'] * 100:>10.1f} %")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--work-ms", type=float, default=200, help="Mean work per task at speed 1x")
+    parser.add_argument("--speed-min", type=float, default=0.25)
+    parser.add_argument("--speed-max", type=float, default=2.0)
+    parser.add_argument("--queue-size", type=int, default=2)
+    parser.add_argument("--join", type=int, default=0, help="Agents registered mid-run")
+    parser.add_argument("--fail", type=int, default=0, help="Agents marked OFFLINE mid-run")
+    parser.add_argument("--event-after-ms", type=float, default=100)
+    parser.add_argument("--policies", nargs="+", default=["first-idle", "least_loaded", "ect"])
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=120)
+    asyncio.run(run(parser.parse_args()))
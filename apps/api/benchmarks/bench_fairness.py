@@ -0,0 +1,145 @@
+"""
+Fair scheduling simulation: one bulk mission floods a role with thousands of tasks, then
+small missions and a few urgent (high priority, with a deadline) ones arrive while it
+runs. Agents claim through the real Blackboard (claim_next_task) in simulated time;
+reports per mission class how long tasks waited to be claimed and how long missions took
+from arrival to their last task done, for the fifo and fair ready-queue policies.
+
+With --max-pending, new missions go through admission control (reject policy) and the
+rejected ones are counted instead of queued.
+
+Run from the repository root:
+    python -m apps.api.benchmarks.bench_fairness --agents 20 --bulk 5000 --missions 40
+"""
+import argparse
+import asyncio
+import heapq
+import itertools
+import random
+
+from apps.api.app.models.task import Task, TaskPriority, TaskStatus
+from apps.api.app.services.admission import AdmissionController, AdmissionError
+from apps.api.app.services.blackboard import Blackboard
+from apps.api.app.services.fair_queue import FairQueue
+
+ROLE = "Coder"
+
+
+def percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def workload(args):
+    """(arrival, mission id, class, priority, deadline, service times) per mission."""
+    rng = random.Random(args.seed)
+    missions = [(0.0, "bulk", "bulk", TaskPriority.NORMAL, None, [rng.expovariate(1 / args.service) for _ in range(args.bulk)])]
+    horizon = args.bulk * args.service / args.agents
+    for i in range(args.missions):
+        arrival = rng.uniform(0.05, 0.8) * horizon
+        size = rng.randint(5, 20)
+        services = [rng.expovariate(1 / args.service) for _ in range(size)]
+        if i % args.urgent_every == 0:
+            missions.append((arrival, f"urgent-{i}", "urgent", TaskPriority.HIGH, arrival + args.deadline, services))
+        else:
+            missions.append((arrival, f"small-{i}", "small", TaskPriority.NORMAL, None, services))
+    return sorted(missions, key=lambda m: m[0])
+
+
+async def simulate(policy: str, args) -> dict:
+    board = Blackboard()
+    board.ready_queue = FairQueue(policy=policy)
+    board.add_log = _quiet_log
+    admission = AdmissionController(board, max_pending=args.max_pending, policy="reject")
+    admission.start()
+
+    clock = {"now": 0.0}
+    events = []  # (time, seq, kind, payload)
+    seq = itertools.count()
+    for mission in workload(args):
+        heapq.heappush(events, (mission[0], next(seq), "arrive", mission))
+
+    service, arrived_at, klass, mission_of = {}, {}, {}, {}
+    remaining, mission_arrival, mission_done = {}, {}, {}
+    waits = {"bulk": [], "small": [], "urgent": []}
+    deadlines = {"met": 0, "missed": 0}
+    rejected = {"bulk": 0, "small": 0, "urgent": 0}
+    idle = [f"agent-{i}" for i in range(args.agents)]
+
+    while events:
+        now, _, kind, payload = heapq.heappop(events)
+        clock["now"] = now
+        if kind == "arrive":
+            arrival, mission_id, cls, priority, deadline, services = payload
+            try:
+                await admission.admit([mission_id])
+            except AdmissionError:
+                rejected[cls] += 1
+                continue
+            tasks = []
+            for n, seconds in enumerate(services):
+                task_id = f"{mission_id}-{n}"
+                service[task_id], arrived_at[task_id], klass[task_id], mission_of[task_id] = seconds, now, cls, mission_id
+                tasks.append(Task(id=task_id, description="simulated", role=ROLE, mission_id=mission_id, priority=priority, deadline=deadline))
+            remaining[mission_id], mission_arrival[mission_id] = len(tasks), now
+            await board.add_tasks(tasks)
+        else:
+            agent_id, task_id = payload
+            await board.update_task_status(task_id, TaskStatus.DONE)
+            idle.append(agent_id)
+            mission_id = mission_of[task_id]
+            remaining[mission_id] -= 1
+            if remaining[mission_id] == 0:
+                mission_done[mission_id] = now - mission_arrival[mission_id]
+                deadline = board.get_task(task_id).deadline
+                if deadline is not None:
+                    deadlines["met" if now <= deadline else "missed"] += 1
+
+        while idle:
+            task = await board.claim_next_task(ROLE, idle[-1])
+            if task is None:
+                break
+            agent_id = idle.pop()
+            waits[klass[task.id]].append(now - arrived_at[task.id])
+            heapq.heappush(events, (now + service[task.id], next(seq), "finish", (agent_id, task.id)))
+
+    completions = {"bulk": [], "small": [], "urgent": []}
+    for mission_id, seconds in mission_done.items():
+        completions[mission_id.split("-")[0]].append(seconds)
+    return {"waits": waits, "completions": completions, "deadlines": deadlines, "rejected": rejected, "makespan": clock["now"]}
+
+
+async def _quiet_log(*_):
+    pass
+
+
+def report(policy: str, result: dict):
+    print(f"\n{policy}  (makespan {result['makespan']:.0f}s, urgent deadlines met {result['deadlines']['met']}"
+          f"/{result['deadlines']['met'] + result['deadlines']['missed']})")
+    print(f"  {'class':<8} {'tasks':>6} {'wait p50':>9} {'wait p99':>9} {'missions':>9} {'done p50':>9} {'done p99':>9} {'rejected':>9}")
+    for cls in ("bulk", "small", "urgent"):
+        waits, done = result["waits"][cls], result["completions"][cls]
+        print(f"  {cls:<8} {len(waits):>6} {percentile(waits, 0.5):>8.1f}s {percentile(waits, 0.99):>8.1f}s "
+              f"{len(done):>9} {percentile(done, 0.5):>8.1f}s {percentile(done, 0.99):>8.1f}s {result['rejected'][cls]:>9}")
+
+
+async def main(args):
+    print(f"{args.agents} agents, bulk mission of {args.bulk} tasks, {args.missions} small missions "
+          f"(every {args.urgent_every}th urgent, deadline {args.deadline:g}s), mean service {args.service:g}s")
+    for policy in ("fifo", "fair"):
+        report(policy, await simulate(policy, args))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--agents", type=int, default=20)
+    parser.add_argument("--bulk", type=int, default=5000, help="Tasks of the mission that arrives first")
+    parser.add_argument("--missions", type=int, default=40, help="Small missions (5-20 tasks) arriving while it runs")
+    parser.add_argument("--urgent-every", type=int, default=5, help="Every Nth small mission is high priority with a deadline")
+    parser.add_argument("--deadline", type=float, default=60, help="Seconds after arrival an urgent mission is due")
+    parser.add_argument("--service", type=float, default=1.0, help="Mean seconds an agent spends on a task")
+    parser.add_argument("--max-pending", type=int, default=0, help="Admission limit on PENDING tasks (0: admit all)")
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
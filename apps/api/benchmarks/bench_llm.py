@@ -0,0 +1,77 @@
+"""
+LLMService benchmark against the offline fake backend: event-loop lag while plans
+are generated, throughput under the concurrency limit, and cache-hit latency.
+
+The "blocking" row reproduces the old behaviour (a synchronous SDK call made from
+inside the coroutine) for comparison.
+
+Run from the repository root:
+    python -m apps.api.benchmarks.bench_llm --requests 32 --latency 0.2
+"""
+import argparse
+import asyncio
+import time
+
+from apps.api.app.services.llm import FakeLLMBackend, LLMService, ResponseCache
+
+
+class BlockingBackend(FakeLLMBackend):
+    async def generate_json(self, prompt: str) -> str:
+        self.calls += 1
+        time.sleep(self.latency)  # What a synchronous generate_content does to the loop
+        return self.responder(prompt)
+
+
+async def measure(service: LLMService, prompts, tick: float = 0.005) -> dict:
+    lags = []
+    running = True
+
+    async def ticker():
+        while running:
+            t0 = time.perf_counter()
+            await asyncio.sleep(tick)
+            lags.append(time.perf_counter() - t0 - tick)
+
+    monitor = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(service.generate_json(p) for p in prompts))
+    elapsed = time.perf_counter() - start
+    running = False
+    await monitor
+    return {"seconds": elapsed, "rate": len(prompts) / elapsed, "max_lag_ms": max(lags, default=0) * 1000}
+
+
+async def run(args):
+    prompts = [f"Build feature {i}" for i in range(args.requests)]
+    print(f"{'mode':<28} {'requests':>8} {'seconds':>8} {'req/s':>8} {'max loop lag':>13}")
+
+    rows = [
+        ("blocking (old)", LLMService(BlockingBackend(args.latency), max_concurrency=args.concurrency, cache=ResponseCache(ttl=0))),
+        ("async + semaphore", LLMService(FakeLLMBackend(args.latency), max_concurrency=args.concurrency, cache=ResponseCache(ttl=0))),
+    ]
+    for name, service in rows:
+        r = await measure(service, prompts)
+        print(f"{name:<28} {args.requests:>8} {r['seconds']:>8.2f} {r['rate']:>8.1f} {r['max_lag_ms']:>10.1f} ms")
+
+    backend = FakeLLMBackend(args.latency)
+    service = LLMService(backend, max_concurrency=args.concurrency)
+    r = await measure(service, ["same plan"] * args.requests)
+    print(f"{'identical, in flight':<28} {args.requests:>8} {r['seconds']:>8.2f} {r['rate']:>8.1f} {r['max_lag_ms']:>10.1f} ms   backend calls: {backend.calls}")
+
+    start = time.perf_counter()
+    for _ in range(10_000):
+        await service.generate_json("same plan")
+    per_hit = (time.perf_counter() - start) / 10_000
+    print(f"{'cache hit':<28} {10_000:>8} {per_hit * 10_000:>8.2f} {1 / per_hit:>8.0f}   {per_hit * 1e6:.1f} us per hit, backend calls: {backend.calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake backend latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=4)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Multi-worker deployment check and throughput benchmark.
+
+Starts a broker plus N real API worker processes (uvicorn, fake LLM backend, stub UI
+automation) sharing one Blackboard through it, then for each N:
+  1. drives a mixed read/write HTTP load round-robin across the workers and reports req/s;
+  2. submits missions through different workers and checks that every worker converges
+     to the same log and that each task was claimed by exactly one worker.
+
+Throughput only scales with N when the machine has spare cores: every worker applies
+every write, so reads scale and writes don't.
+
+Run from the repository root:
+    python -m apps.api.benchmarks.bench_multiworker --workers 1 2 4 --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+from apps.api.app.core.broker import Broker
+
+BASE_PORT = 18100
+
+
+async def start_workers(count: int, broker_url: str):
+    env = {
+        **os.environ,
+        "BROKER_URL": broker_url,
+        "LLM_BACKEND": "fake",
+        "AUTOMATION_EXECUTOR": "command",
+        "AUTOMATION_COMMAND": "true",
+        "BROADCAST_WINDOW_MS": "50",
+    }
+    env.pop("BLACKBOARD_DATA_DIR", None)
+    processes = []
+    urls = []
+    for i in range(count):
+        port = BASE_PORT + i
+        processes.append(await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "uvicorn", "apps.api.main:app_socketio", "--port", str(port), "--log-level", "warning",
+            env=env, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+        ))
+        urls.append(f"http://127.0.0.1:{port}")
+
+    async with httpx.AsyncClient() as client:
+        for url in urls:
+            for _ in range(200):
+                try:
+                    if (await client.get(url + "/")).status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError(f"Worker {url} did not start")
+    return processes, urls
+
+
+async def load(urls, requests: int, concurrency: int, write_ratio: float) -> float:
+    counter = iter(range(requests))
+    writes_every = max(1, round(1 / write_ratio)) if write_ratio else 0
+
+    async def client_loop(client: httpx.AsyncClient):
+        for i in counter:
+            url = urls[i % len(urls)]
+            if writes_every and i % writes_every == 0:
+                response = await client.post(url + "/api/v1/agents/create", json={"role": "Coder"})
+            else:
+                response = await client.get(url + "/api/v1/logs", params={"limit": 20})
+            response.raise_for_status()
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        return requests / (time.perf_counter() - start)
+
+
+async def check_missions(urls, missions: int) -> dict:
+    async with httpx.AsyncClient(timeout=30) as client:
+        await asyncio.gather(*(
+            client.post(urls[i % len(urls)] + "/api/v1/plan", json={"prompt": f"Mission {i}"}) for i in range(missions)
+        ))
+
+        # Converged when every worker has seen the same number of log entries
+        start = time.perf_counter()
+        while True:
+            seqs = [(await client.get(url + "/api/v1/logs", params={"limit": 1})).json()["latest_seq"] for url in urls]
+            if len(set(seqs)) == 1:
+                await asyncio.sleep(0.5)
+                again = [(await client.get(url + "/api/v1/logs", params={"limit": 1})).json()["latest_seq"] for url in urls]
+                if again == seqs:
+                    break
+            elif time.perf_counter() - start > 30:
+                break
+            await asyncio.sleep(0.1)
+
+        claims = 0
+        after = 0
+        while True:
+            page = (await client.get(urls[-1] + "/api/v1/logs", params={"agent": "Architect", "after_seq": after, "limit": 1000})).json()
+            claims += sum(1 for e in page["entries"] if e["message"].startswith("Switching to active status"))
+            if len(page["entries"]) < 1000:
+                break
+            after = page["next_seq"]
+    return {"log_seqs": seqs, "architect_claims": claims}
+
+
+async def run(args):
+    broker = Broker()
+    server = await broker.serve("127.0.0.1", args.broker_port)
+    print(f"{'workers':>7} {'req/s':>9} {'converged':>10} {'claims':>12}")
+    try:
+        for count in args.workers:
+            broker.__init__()  # Fresh shared state for every deployment
+            processes, urls = await start_workers(count, f"tcp://127.0.0.1:{args.broker_port}")
+            try:
+                await load(urls, min(200, args.requests), args.concurrency, args.write_ratio)  # Warm-up
+                rate = await load(urls, args.requests, args.concurrency, args.write_ratio)
+                result = await check_missions(urls, args.missions)
+            finally:
+                for process in processes:
+                    process.terminate()
+                await asyncio.gather(*(p.wait() for p in processes))
+            converged = "yes" if len(set(result["log_seqs"])) == 1 else f"no {result['log_seqs']}"
+            claims = f"{result['architect_claims']}/{args.missions}"
+            print(f"{count:>7} {rate:>9.0f} {converged:>10} {claims:>12}")
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument("--missions", type=int, default=20)
+    parser.add_argument("--broker-port", type=int, default=18099)
+    asyncio.run(run(parser.parse_args()))
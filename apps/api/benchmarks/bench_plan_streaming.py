@@ -0,0 +1,66 @@
+"""
+Planning round-trip benchmark: batch (wait for the whole JSON array) against
+streaming (add each task as soon as its object is complete), using the fake
+streaming LLM backend.
+
+Run from the repository root:
+    python -m apps.api.benchmarks.bench_plan_streaming --tasks 200
+"""
+import argparse
+import asyncio
+import json
+import random
+
+from apps.api.app.services.commander import Commander
+from apps.api.app.services.llm import FakeLLMBackend, ResponseCache, llm_service
+
+ROLES = ["Architect", "Coder", "Reviewer", "Executive"]
+
+
+def plan_responder(n: int, shuffle: bool):
+    def respond(prompt: str) -> str:
+        tasks = [
+            {
+                "id": f"task_{i}",
+                "description": f"Step {i}: implement part {i} of the requested system with tests",
+                "role": ROLES[i % len(ROLES)],
+                "dependencies": [f"task_{i - 1}"] if i % 5 else [],
+            }
+            for i in range(n)
+        ]
+        if shuffle:
+            random.Random(1).shuffle(tasks)
+        return json.dumps(tasks, indent=2)
+    return respond
+
+
+async def run(args):
+    llm_service.backend = FakeLLMBackend(
+        latency=args.first_token,
+        responder=plan_responder(args.tasks, args.shuffle),
+        chunk_size=args.chunk_size,
+        chunk_latency=args.chunk_latency,
+    )
+    llm_service.cache = ResponseCache(ttl=0)
+
+    print(f"{'mode':>10} {'tasks':>6} {'first chunk':>12} {'first task':>11} {'total':>9} {'rejected':>9}")
+    for stream in (False, True):
+        commander = Commander(streaming=stream)
+        await commander.plan("Build a scalable CRM system")
+        m = commander.metrics[-1]
+        print(f"{m['mode']:>10} {m['tasks']:>6} {m['first_chunk_ms']:>9.0f} ms {m['first_task_ms']:>8.0f} ms "
+              f"{m['total_ms']:>6.0f} ms {m['rejected']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--first-token", type=float, default=0.5, help="seconds until the first chunk")
+    parser.add_argument("--chunk-size", type=int, default=64, help="characters per streamed chunk")
+    parser.add_argument("--chunk-latency", type=float, default=0.01, help="seconds between chunks")
+    parser.add_argument("--shuffle", action="store_true", help="emit tasks out of dependency order")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
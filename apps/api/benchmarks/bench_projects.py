@@ -0,0 +1,188 @@
+"""
+Multi-project isolation: for each count in --projects (e.g. 1,10,100,300), that many
+projects are active at once and every one runs the same workload: a mission of --tasks
+chained tasks (Architect -> Coder -> Reviewer -> ...) every --interval seconds, placed by
+a dispatcher on the project's own agents (one per role), each finishing its task after
+--work-ms. Reported per project, over all projects of the run:
+
+  - dispatch latency: task ready -> started on an agent (scheduler loop + dispatcher);
+  - mission latency: mission added -> its last task done (ideally tasks x work);
+  - Blackboard op latency: adding a mission and completing a task, timed around the call;
+  - what one project's dashboard receives per second (Socket.IO frames and events), and
+    the size of the full state sync it gets on reconnect.
+
+"partitioned" opens the projects through ProjectRegistry: a Blackboard, Orchestrator
+(scheduler loop and dispatcher) and Socket.IO room each. "shared" is the single Blackboard
+the API had before: every project's missions on one board and one dispatcher, every event
+sent to every dashboard. Broadcasts go through the real batching broadcaster into a
+stand-in for Socket.IO that only counts, so the per-room frames are the ones a server
+would send.
+
+Run from the repository root:
+    python -m apps.api.benchmarks.bench_projects --projects 1,10,100,300 --seconds 8
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import defaultdict
+from typing import Dict
+
+from apps.api.app.core.broadcaster import BATCH_EVENT, broadcaster
+from apps.api.app.models.task import Task, TaskStatus
+from apps.api.app.services.blackboard import Blackboard
+from apps.api.app.services.orchestrator import Orchestrator
+from apps.api.app.services.projects import ProjectRegistry, projects
+from apps.api.app.services.state_sync import StateSync
+
+ROLES = ["Architect", "Coder", "Reviewer"]
+
+
+class CountingServer:
+    """Stands in for socketio.AsyncServer: encodes each emit once, as it would, and counts it per room."""
+
+    def __init__(self):
+        self.frames: Dict[str, int] = defaultdict(int)
+        self.events: Dict[str, int] = defaultdict(int)
+        self.bytes: Dict[str, int] = defaultdict(int)
+
+    async def emit(self, event, data, room=None):
+        self.frames[room] += 1
+        self.events[room] += len(data) if event == BATCH_EVENT else 1
+        self.bytes[room] += len(json.dumps([event, data]))
+
+
+class Workload:
+    """One project's missions and simulated agents, on whichever board (and dispatcher) it is given."""
+
+    def __init__(self, name: str, board: Blackboard, args, stats: dict):
+        self.name = name
+        self.board = board
+        self.args = args
+        self.stats = stats
+        self.missions = 0
+        self._added: Dict[str, float] = {}  # last task of a mission -> when the mission was added
+        self._ready: Dict[str, float] = {}  # task -> when it became ready
+
+    def on_ready(self, task):
+        self._ready[task.id] = time.perf_counter()
+
+    async def run_agent(self, agent, task):
+        # The dispatcher's trigger: the agent starts the task now and reports it done after --work-ms
+        self.stats["dispatch"].append(time.perf_counter() - self._ready.pop(task.id, time.perf_counter()))
+        await asyncio.sleep(self.args.work_ms / 1000)
+        started = time.perf_counter()
+        await self.board.update_task_status(task.id, TaskStatus.DONE, result="ok")
+        now = time.perf_counter()
+        self.stats["complete_op"].append(now - started)
+        added = self._added.pop(task.id, None)
+        if added is not None:
+            self.stats["mission"].append(now - added)
+
+    async def feed(self, until: float, rng: random.Random):
+        await asyncio.sleep(rng.uniform(0, self.args.interval))  # Projects don't all start in step
+        while time.perf_counter() < until:
+            self.missions += 1
+            mission = f"{self.name}-m{self.missions}"
+            ids = [f"{mission}-t{i}" for i in range(self.args.tasks)]
+            tasks = [Task(id=task_id, description=f"Step {i}", role=ROLES[i % len(ROLES)], mission_id=mission,
+                          dependencies=ids[i - 1:i]) for i, task_id in enumerate(ids)]
+            started = time.perf_counter()
+            await self.board.add_tasks(tasks)
+            self.stats["add_op"].append(time.perf_counter() - started)
+            self._added[ids[-1]] = started
+            await asyncio.sleep(self.args.interval)
+
+
+async def _quiet_log(*_):
+    pass
+
+
+async def run(mode: str, count: int, args) -> dict:
+    rng = random.Random(args.seed)
+    server = broadcaster.server = CountingServer()
+    stats = {"dispatch": [], "mission": [], "add_op": [], "complete_op": []}
+    if mode == "partitioned":
+        registry = ProjectRegistry(projects.default, None, max_projects=count)
+        workloads = []
+        for i in range(count):
+            project = await registry.open(f"p{i}")
+            workload = Workload(project.id, project.board, args, stats)
+            project.orchestrator.dispatcher.trigger = workload.run_agent
+            project.board.on_ready(workload.on_ready)
+            workloads.append(workload)
+    else:
+        registry = None
+        board = Blackboard()
+        board.room = None  # As before projects: every event to every client
+        orchestrator = Orchestrator(board)
+        await orchestrator.start()
+        workloads = [Workload(f"p{i}", board, args, stats) for i in range(count)]
+        # One dispatcher places every project's tasks; each goes back to its project's workload
+        owner = {w.name: w for w in workloads}
+        board.on_ready(lambda task: owner[task.mission_id.split("-")[0]].on_ready(task))
+        orchestrator.dispatcher.trigger = lambda agent, task: owner[task.mission_id.split("-")[0]].run_agent(agent, task)
+
+    for workload in workloads:
+        workload.board.add_log = _quiet_log  # Logs are the same either way; keep them out of the counts
+        for role in ROLES:
+            await workload.board.register_agent(role)
+
+    await asyncio.sleep(0.2)
+    server.frames.clear(), server.events.clear(), server.bytes.clear()
+    started = time.perf_counter()
+    until = started + args.seconds
+    await asyncio.gather(*(w.feed(until, random.Random(rng.random())) for w in workloads))
+    await asyncio.sleep(args.tasks * args.work_ms / 1000 + 0.5)  # Let the last missions finish
+    elapsed = time.perf_counter() - started
+
+    probe = workloads[0]
+    room = probe.board.room
+    sync = StateSync(probe.board)
+    report = {
+        "missions": sum(w.missions for w in workloads),
+        "frames_s": server.frames[room] / elapsed,
+        "events_s": server.events[room] / elapsed,
+        "kb_s": server.bytes[room] / elapsed / 1024,
+        "sync_kb": len(sync.snapshot_json()) / 1024,
+    }
+    for key, values in stats.items():
+        values = sorted(values) or [0.0]
+        report[f"{key}_p50"] = statistics.median(values) * 1000
+        report[f"{key}_p99"] = values[min(len(values) - 1, int(len(values) * 0.99))] * 1000
+
+    if registry:
+        await registry.stop()
+    else:
+        await orchestrator.stop()
+    await broadcaster.flush()
+    return report
+
+
+async def main(args):
+    counts = [int(c) for c in args.projects.split(",")]
+    print(f"Each project: a {args.tasks}-task mission every {args.interval:g}s, {args.work_ms:g} ms of work per task, "
+          f"{len(ROLES)} agents; {args.seconds:g}s per run. Latencies in ms (p50/p99); dashboard = one project's.")
+    print(f"{'mode':<12} {'projects':>8} {'missions':>9} {'dispatch':>13} {'mission':>13} {'add op':>11} {'complete op':>11}"
+          f" {'frames/s':>9} {'events/s':>9} {'KB/s':>8} {'sync KB':>8}")
+    for mode in args.modes:
+        for count in counts:
+            r = await run(mode, count, args)
+            print(f"{mode:<12} {count:>8} {r['missions']:>9} {r['dispatch_p50']:>6.1f}/{r['dispatch_p99']:<6.1f}"
+                  f" {r['mission_p50']:>6.1f}/{r['mission_p99']:<6.1f} {r['add_op_p50']:>5.2f}/{r['add_op_p99']:<5.2f}"
+                  f" {r['complete_op_p50']:>5.2f}/{r['complete_op_p99']:<5.2f} {r['frames_s']:>9.1f} {r['events_s']:>9.1f}"
+                  f" {r['kb_s']:>8.1f} {r['sync_kb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", default="1,10,100,300", help="Comma-separated counts of active projects")
+    parser.add_argument("--modes", nargs="+", default=["partitioned", "shared"])
+    parser.add_argument("--tasks", type=int, default=3, help="Chained tasks per mission")
+    parser.add_argument("--interval", type=float, default=2, help="Seconds between a project's missions")
+    parser.add_argument("--work-ms", type=float, default=20, help="Time an agent takes per task")
+    parser.add_argument("--seconds", type=float, default=8, help="Duration of each run")
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,84 @@
+"""
+Blackboard entity representation: Pydantic Task models (what the Blackboard used to
+store) versus slotted TaskRecords. Measures:
+  - memory for N tasks (tracemalloc, objects plus their strings and lists);
+  - attribute scans (the role/status filtering done by the MCP tools and the dispatcher);
+  - serialization: model_dump() per call versus to_dict(), cold (first call after a
+    change) and cached (every further room, listener or snapshot asking for it).
+
+Run from the repository root:
+    python -m apps.api.benchmarks.bench_records --tasks 100000
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from apps.api.app.models.records import TaskRecord
+from apps.api.app.models.task import Task, TaskStatus
+
+ROLES = ["Architect", "Coder", "Reviewer", "Executive"]
+
+
+def specs(count: int, seed: int):
+    rng = random.Random(seed)
+    for i in range(count):
+        deps = [f"task-{rng.randrange(i)}" for _ in range(rng.randint(0, 2))] if i else []
+        # Built fresh like parsed JSON, so nothing is shared by accident
+        yield {"id": f"task-{i}", "description": f"Implement part {i} of the mission", "role": "".join(rng.choice(ROLES)),
+               "dependencies": deps, "status": "pending"}
+
+
+def measure_memory(build, count: int, seed: int):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = [build(spec) for spec in specs(count, seed)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return items, after - before
+
+
+def timed(fn, repeat: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return time.perf_counter() - start
+
+
+def run(args):
+    models, model_bytes = measure_memory(lambda spec: Task(**spec), args.tasks, args.seed)
+    records, record_bytes = measure_memory(lambda spec: TaskRecord.from_model(Task(**spec)), args.tasks, args.seed)
+    print(f"{args.tasks} tasks")
+    print(f"{'':<28} {'pydantic':>12} {'record':>12}")
+    print(f"{'memory':<28} {model_bytes / 2**20:>9.1f} MB {record_bytes / 2**20:>9.1f} MB   ({model_bytes / record_bytes:.1f}x)")
+    print(f"{'bytes per task':<28} {model_bytes / args.tasks:>12.0f} {record_bytes / args.tasks:>12.0f}")
+
+    def scan(items):
+        return lambda: sum(1 for t in items if t.role == "Coder" and t.status == TaskStatus.PENDING)
+
+    model_scan, record_scan = timed(scan(models), 5) / 5, timed(scan(records), 5) / 5
+    print(f"{'scan role+status':<28} {model_scan * 1000:>9.1f} ms {record_scan * 1000:>9.1f} ms")
+
+    n = len(models)
+    dump = timed(lambda: [t.model_dump() for t in models])
+    cold = timed(lambda: [t.apply({"result": "ok"}) or t.to_dict() for t in records])
+    cached = timed(lambda: [t.to_dict() for t in records])
+    print(f"{'serialize (per call)':<28} {n / dump:>9.0f}/s {n / cold:>10.0f}/s   cold, incl. the update")
+    print(f"{'serialize (cached)':<28} {'':>12} {n / cached:>10.0f}/s")
+
+    # One status change broadcast to `rooms` rooms, plus journal and state sync listeners
+    fanout = args.rooms + 2
+    subset_models, subset_records = models[:10000], records[:10000]
+    per_model = timed(lambda: [[t.model_dump() for _ in range(fanout)] for t in subset_models])
+    per_record = timed(lambda: [t.apply({"status": TaskStatus.DONE}) or [t.to_dict() for _ in range(fanout)] for t in subset_records])
+    print(f"{f'update seen {fanout}x':<28} {len(subset_models) / per_model:>9.0f}/s {len(subset_records) / per_record:>10.0f}/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--rooms", type=int, default=4, help="Rooms (and similar consumers) a change is sent to")
+    parser.add_argument("--seed", type=int, default=7)
+    run(parser.parse_args())
@@ -0,0 +1,204 @@
+"""
+Cold start of an API worker, each run in a fresh interpreter:
+
+  - import profile: `python -X importtime -c "import apps.api.main"`, the total import
+    time and where it goes (self time per top-level package, slowest direct imports);
+  - startup: a uvicorn worker on --port, timed from spawn until it answers /health at
+    all (serving) and until /health reports ready (SDKs loaded, warm-ups done), with its
+    resident memory once ready (VmRSS) and at its peak (VmHWM), from /proc.
+
+Medians over --runs. The worker gets the Gemini backend with a dummy key unless the
+environment or --env says otherwise, so the SDK is loaded as in production (no request
+is ever sent); `--env MCP_ENABLED=false` and the like compare configurations.
+
+`--save FILE` stores the report as a JSON baseline; `--baseline FILE` compares against
+one and exits with status 1 if any measurement grew by more than `--tolerance`.
+
+Run from the repository root:
+    python -m apps.api.benchmarks.bench_startup --runs 5 --save /tmp/startup.json
+    python -m apps.api.benchmarks.bench_startup --runs 5 --baseline /tmp/startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+# Lower is better for all of them; tiny changes are noise
+FLOORS = {"import_ms": 20, "serving_ms": 50, "ready_ms": 50, "rss_mb": 2, "peak_rss_mb": 2}
+
+
+def worker_env(overrides: List[str]) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("GEMINI_API_KEY", "startup-benchmark")
+    env.setdefault("AUTOMATION_EXECUTOR", "fake")
+    env.pop("BLACKBOARD_DATA_DIR", None)  # Recovering a journal would measure the journal
+    env.pop("BROKER_URL", None)
+    for item in overrides:
+        key, _, value = item.partition("=")
+        env[key] = value
+    return env
+
+
+def import_profile(env: Dict[str, str]) -> dict:
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", "import apps.api.main"],
+                            env=env, capture_output=True, text=True, check=True).stderr
+    total, packages, direct = 0, {}, []
+    depth_of_main = None
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), len(match[3]), match[4]
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + self_us
+        if name == "apps.api.main":
+            total, depth_of_main = cumulative_us, indent
+        direct.append((indent, cumulative_us, name))
+    # Children are printed before their parent, one level deeper
+    direct = [(us, name) for indent, us, name in direct if depth_of_main is not None and indent == depth_of_main + 2]
+    return {
+        "import_ms": total / 1000,
+        "packages_ms": {name: us / 1000 for name, us in sorted(packages.items(), key=lambda p: -p[1])},
+        "direct_ms": {name: us / 1000 for us, name in sorted(direct, reverse=True)},
+    }
+
+
+def memory_mb(pid: int) -> Dict[str, float]:
+    fields = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                fields[key] = int(value.split()[0]) / 1024
+    return {"rss_mb": fields.get("VmRSS"), "peak_rss_mb": fields.get("VmHWM")}
+
+
+def cold_start(env: Dict[str, str], port: int, timeout: float) -> dict:
+    url = f"http://127.0.0.1:{port}/health"
+    started = time.perf_counter()
+    worker = subprocess.Popen([sys.executable, "-m", "uvicorn", "apps.api.main:app_socketio", "--port", str(port), "--log-level", "warning"],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    serving = ready = None
+    body = {}
+    try:
+        with httpx.Client(timeout=1) as client:
+            while ready is None and time.perf_counter() - started < timeout:
+                if worker.poll() is not None:
+                    raise RuntimeError(f"worker exited with status {worker.returncode}")
+                try:
+                    response = client.get(url)
+                except httpx.TransportError:
+                    time.sleep(0.005)
+                    continue
+                now = time.perf_counter()
+                serving = serving or now
+                body = response.json()
+                if response.status_code == 200:
+                    ready = now
+                elif body.get("status") == "degraded":
+                    raise RuntimeError(f"worker degraded: {body['components']}")
+                else:
+                    time.sleep(0.005)
+        if ready is None:
+            raise RuntimeError(f"worker not ready after {timeout}s")
+        memory = memory_mb(worker.pid)
+    finally:
+        worker.terminate()
+        worker.wait(10)
+    return {
+        "serving_ms": (serving - started) * 1000,
+        "ready_ms": (ready - started) * 1000,
+        **memory,
+        "components": {name: c["seconds"] for name, c in body["components"].items()},
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    regressions = []
+    for key, floor in FLOORS.items():
+        before, after = baseline["results"].get(key), report["results"].get(key)
+        if before is not None and after is not None and after > before * (1 + tolerance) and after - before > floor:
+            regressions.append(f"{key}: {before} -> {after}")
+    return regressions
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=18400)
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds a worker may take to become ready")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Extra environment for the worker")
+    parser.add_argument("--top", type=int, default=8, help="Packages and imports to list")
+    parser.add_argument("--save", help="Write the report to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a report saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative growth before flagging")
+    args = parser.parse_args()
+
+    env = worker_env(args.env)
+    profiles = [import_profile(env) for _ in range(args.runs)]
+    starts = [cold_start(env, args.port, args.timeout) for _ in range(args.runs)]
+    fastest = min(profiles, key=lambda p: p["import_ms"])
+
+    results = {"import_ms": round(statistics.median(p["import_ms"] for p in profiles), 1)}
+    for key in ("serving_ms", "ready_ms", "rss_mb", "peak_rss_mb"):
+        results[key] = round(statistics.median(s[key] for s in starts), 1)
+    components = {name: round(statistics.median(s["components"][name] or 0 for s in starts) * 1000, 1) for name in starts[0]["components"]}
+    report = {
+        "meta": {"commit": _git_commit(), "python": platform.python_version(), "cpus": os.cpu_count(), "runs": args.runs, "env": args.env},
+        "results": results,
+        "components_ms": components,
+        "packages_ms": {k: round(v, 1) for k, v in list(fastest["packages_ms"].items())[: args.top]},
+        "direct_ms": {k: round(v, 1) for k, v in list(fastest["direct_ms"].items())[: args.top]},
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"{args.runs} runs, commit {report['meta']['commit']}, median of each")
+    for key, value in results.items():
+        row = f"  {key:<14} {value:>9}"
+        before = (baseline or {}).get("results", {}).get(key)
+        if before:
+            row += f"   {100 * (value / before - 1):+.0f}%"
+        print(row)
+    print("  warm-ups (ms, after the worker started serving):", json.dumps(components))
+    print(f"import self time by package (fastest run, {fastest['import_ms']:.0f} ms in all):")
+    for name, ms in report["packages_ms"].items():
+        print(f"  {name:<28} {ms:>8.1f} ms")
+    print("slowest imports of apps.api.main, including what they import:")
+    for name, ms in report["direct_ms"].items():
+        print(f"  {name:<56} {ms:>8.1f} ms")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Saved baseline to {args.save}")
+    if baseline:
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"❌ Regression: {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Dashboard reconnects: a board of N tasks sees a burst of status changes while C
+clients are disconnected, then all of them reconnect at once (a reconnect storm).
+Compares what each client costs and receives when it re-downloads the full state
+versus asking StateSync for the deltas since its last seq, and the cost of the
+shared snapshot itself (built once per seq).
+
+Run from the repository root:
+    python -m apps.api.benchmarks.bench_sync --tasks 10000 --clients 200 --changes 100
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from apps.api.app.models.task import Task, TaskStatus
+from apps.api.app.services.blackboard import Blackboard
+from apps.api.app.services.state_sync import StateSync
+
+
+async def run(args):
+    board = Blackboard()
+    sync = StateSync(board, max_deltas=args.tasks)
+    sync.start()
+    await board.add_tasks([Task(id=f"t{i}", description=f"Task {i}", role="Coder") for i in range(args.tasks)])
+    for i in range(100):
+        await board.add_log("Commander", f"Message {i}")
+    # Every client last synced here
+    seen = sync.sync()
+    cursor = (seen["seq"], seen["epoch"], seen["log_seq"])
+
+    rng = random.Random(args.seed)
+    for task_id in rng.sample(range(args.tasks), args.changes):
+        await board.update_task_status(f"t{task_id}", TaskStatus.IN_PROGRESS)
+        await board.add_log("Coder", f"Working on t{task_id}")
+
+    start = time.perf_counter()
+    for _ in range(args.clients):
+        # What a client without StateSync has to fetch: everything, serialized for it alone
+        state = {"tasks": [t.to_dict() for t in board.tasks], "agents": [a.to_dict() for a in board.agents],
+                 "logs": [e.to_dict() for e in board.log_store.entries()]}
+        dump_bytes = len(json.dumps(state))
+    full_per_client = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.clients):
+        full_bytes = len(sync.snapshot_json())
+    cached_per_client = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.clients):
+        delta_bytes = len(json.dumps(sync.sync(*cursor)))
+    delta_per_client = time.perf_counter() - start
+
+    print(f"{args.tasks} tasks, {args.changes} changed while {args.clients} clients were away")
+    print(f"{'reply':<22} {'per client':>12} {'storm':>10} {'bytes':>10}")
+    for name, total, size in (("full dump", full_per_client, dump_bytes),
+                              ("shared snapshot", cached_per_client, full_bytes),
+                              ("delta", delta_per_client, delta_bytes)):
+        print(f"{name:<22} {total / args.clients * 1e6:>9.1f} us {total * 1000:>7.1f} ms {size:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--changes", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
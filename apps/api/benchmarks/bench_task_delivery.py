@@ -0,0 +1,65 @@
+"""
+Task delivery latency from the Blackboard to an out-of-process style AgentPoller.
+
+The poller talks to the real API routes over HTTP (an in-process ASGI transport, so no
+server or network is needed), long-polling the task feed for several roles at once.
+Tasks are added one at a time; latency is measured from `add_task` to the poller's
+handler receiving the claimed task. The old poller scanned every 5 s, i.e. 0-5000 ms
+(about 2500 ms on average) per task.
+
+Run from the repository root:
+    python -m apps.api.benchmarks.bench_task_delivery --tasks 200 --roles 4
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from apps.api.main import app
+from apps.api.app.models.task import Task
+from apps.api.app.services.agent_poller import AgentPoller
+from apps.api.app.services.blackboard import blackboard
+from apps.api.app.services.task_feed import task_feed
+
+
+async def run(args):
+    task_feed.start()
+    await blackboard.set_auto_trigger(True)
+    roles = [f"Role{i}" for i in range(args.roles)]
+    added_at = {}
+    latencies = []
+    received = asyncio.Event()
+
+    async def on_task(task: dict):
+        latencies.append(time.perf_counter() - added_at[task["id"]])
+        received.set()
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://api", timeout=60)
+    poller = AgentPoller(roles, client=client, on_task=on_task)
+    runner = asyncio.create_task(poller.run())
+    await asyncio.sleep(0.1)  # Let it sync and open its first long-poll
+
+    for i in range(args.tasks):
+        received.clear()
+        task = Task(id=f"t{i}", description=f"Task {i}", role=roles[i % len(roles)])
+        added_at[task.id] = time.perf_counter()
+        await blackboard.add_task(task)
+        await asyncio.wait_for(received.wait(), 5)
+        await asyncio.sleep(args.interval_ms / 1000)
+
+    runner.cancel()
+    latencies.sort()
+    ms = [x * 1000 for x in latencies]
+    print(f"tasks delivered: {len(ms)} over {args.roles} roles (one poller)")
+    print(f"latency ms: mean {statistics.mean(ms):.2f}  p50 {ms[len(ms) // 2]:.2f}  p99 {ms[int(len(ms) * 0.99) - 1]:.2f}  max {ms[-1]:.2f}")
+    print("old 5 s sleep loop: 0-5000 ms, ~2500 ms mean")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--roles", type=int, default=4)
+    parser.add_argument("--interval-ms", type=float, default=5, help="Pause between added tasks")
+    asyncio.run(run(parser.parse_args()))
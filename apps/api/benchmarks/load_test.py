@@ -0,0 +1,403 @@
+"""
+Load test for the whole API: starts `apps/api/main.py` in-process under uvicorn, with the
+LLM backend and the UI automation executor replaced by in-process fakes, and drives for
+`--duration` seconds at once:
+
+  - HTTP users, each looping POST /api/v1/plan (a fresh prompt every time, so no LLM cache hits);
+  - an HTTP user registering agents with POST /api/v1/agents/create;
+  - MCP agents, each holding an SSE session and looping fetch_next_task -> submit_task_completion,
+    falling back to poll_tasks when there is no work;
+  - Socket.IO clients that connect, join an agent room and listen, over the Engine.IO
+    long-polling transport (spoken directly, so no extra client dependency is needed).
+
+Reports throughput and latency percentiles per operation, plus the delay between a log
+entry being written and a dashboard receiving it, and a few server-side metrics.
+
+`--save FILE` stores the report as a JSON baseline; `--baseline FILE` compares against
+one, flags operations whose p50/p99 latency rose or whose throughput fell by more than
+`--tolerance`, and exits with status 1 if any did. Baselines only compare meaningfully
+on the same machine and with the same options.
+
+The load generator shares the event loop (and the CPU) with the server, and a polling
+client costs a request per frame it receives, so keep the load below saturation
+(server loop_lag_p99_ms well under the latencies measured) or the numbers turn noisy.
+
+Run from the repository root:
+    python -m apps.api.benchmarks.load_test --duration 20 --save /tmp/baseline.json
+    python -m apps.api.benchmarks.load_test --duration 20 --baseline /tmp/baseline.json
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import httpx
+import uvicorn
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from apps.api.main import app_socketio
+from apps.api.app.core.metrics import metrics
+from apps.api.app.services.automation import FakeExecutor, automation
+from apps.api.app.services.blackboard import blackboard
+from apps.api.app.services.llm import FakeLLMBackend, llm_service
+
+ROLES = ["Architect", "Coder", "Reviewer"]
+RECORD_SEP = "\x1e"  # Separates Engine.IO packets in one polling payload
+
+
+class Recorder:
+    """Latency samples (seconds) and error counts per operation."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def record(self, op: str, seconds: float):
+        self.samples.setdefault(op, []).append(seconds)
+
+    def error(self, op: str, e: Exception):
+        count = self.errors[op] = self.errors.get(op, 0) + 1
+        if count == 1:
+            print(f"⚠️ {op} failed: {type(e).__name__}: {e}", file=sys.stderr)
+
+    @contextlib.asynccontextmanager
+    async def timed(self, op: str):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.error(op, e)
+            return
+        self.record(op, time.perf_counter() - started)
+
+    def report(self, duration: float) -> Dict[str, dict]:
+        ops = {}
+        for op in sorted(set(self.samples) | set(self.errors)):
+            samples = sorted(self.samples.get(op, ()))
+            ops[op] = {
+                "count": len(samples),
+                "errors": self.errors.get(op, 0),
+                "rps": round(len(samples) / duration, 2),
+                "p50_ms": _ms(percentile(samples, 50)),
+                "p90_ms": _ms(percentile(samples, 90)),
+                "p99_ms": _ms(percentile(samples, 99)),
+                "max_ms": _ms(samples[-1] if samples else None),
+            }
+        return ops
+
+
+def percentile(ordered: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list (None when empty)."""
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * p // 100))
+    return ordered[int(rank) - 1]
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+class PollingSocketClient:
+    """
+    Minimal Socket.IO (v5) client over the Engine.IO v4 long-polling transport: one
+    long-lived GET receives packets, POSTs send them. Enough to connect, emit events,
+    answer pings and receive broadcasts.
+    """
+
+    def __init__(self, http: httpx.AsyncClient):
+        self.http = http
+        self.sid: Optional[str] = None
+
+    async def connect(self):
+        response = await self.http.get("/socket.io/", params={"EIO": "4", "transport": "polling"})
+        response.raise_for_status()
+        self.sid = json.loads(response.text.split(RECORD_SEP)[0][1:])["sid"]
+        await self._send("40")
+        while True:
+            for packet in await self._receive():
+                if packet.startswith("40"):
+                    return
+                if packet.startswith("44"):
+                    raise ConnectionError(f"Socket.IO connect refused: {packet[2:]}")
+
+    async def emit(self, event: str, data):
+        await self._send("42" + json.dumps([event, data]))
+
+    async def listen(self, on_event, stop: asyncio.Event):
+        while not stop.is_set():
+            for packet in await self._receive():
+                if packet == "2":
+                    await self._send("3")
+                elif packet.startswith("42"):
+                    event, *args = json.loads(packet[2:])
+                    on_event(event, args[0] if args else None)
+                elif packet == "1" or packet.startswith("41"):
+                    return
+
+    async def close(self):
+        if self.sid:
+            with contextlib.suppress(httpx.HTTPError):
+                await self._send("41", "1")
+            self.sid = None
+
+    async def _send(self, *packets: str):
+        params = {"EIO": "4", "transport": "polling", "sid": self.sid}
+        response = await self.http.post("/socket.io/", params=params, content=RECORD_SEP.join(packets))
+        response.raise_for_status()
+
+    async def _receive(self) -> List[str]:
+        params = {"EIO": "4", "transport": "polling", "sid": self.sid}
+        response = await self.http.get("/socket.io/", params=params)
+        response.raise_for_status()
+        return response.text.split(RECORD_SEP)
+
+
+async def plan_user(http: httpx.AsyncClient, rec: Recorder, stop: asyncio.Event, think: float):
+    while not stop.is_set():
+        async with rec.timed("http.plan"):
+            response = await http.post("/api/v1/plan", json={"prompt": f"Build service {uuid.uuid4().hex[:8]}"})
+            response.raise_for_status()
+        await _think(stop, think)
+
+
+async def agent_user(http: httpx.AsyncClient, rec: Recorder, stop: asyncio.Event, think: float, agent_ids: List[str]):
+    i = 0
+    while not stop.is_set():
+        async with rec.timed("http.agents_create"):
+            response = await http.post("/api/v1/agents/create", json={"role": ROLES[i % len(ROLES)]})
+            response.raise_for_status()
+            agent_ids.append(response.json()["id"])
+        i += 1
+        await _think(stop, think)
+
+
+async def mcp_agent(url: str, role: str, rec: Recorder, stop: asyncio.Event, think: float):
+    async with sse_client(url) as (read_stream, write_stream):
+        async with ClientSession(read_stream, write_stream) as session:
+            async with rec.timed("mcp.initialize"):
+                await session.initialize()
+            while not stop.is_set():
+                text = await _call(session, rec, "fetch_next_task", {"role": role})
+                if text and text.startswith("TASK_ID: "):
+                    task_id = text.split("\n", 1)[0][len("TASK_ID: "):]
+                    await _call(session, rec, "submit_task_completion", {"task_id": task_id, "result": "done"})
+                    continue
+                await _call(session, rec, "poll_tasks", {"role": role})
+                await _think(stop, think)
+
+
+async def _call(session: ClientSession, rec: Recorder, tool: str, arguments: dict) -> Optional[str]:
+    text = None
+    async with rec.timed(f"mcp.{tool}"):
+        result = await session.call_tool(tool, arguments)
+        if result.isError:
+            raise RuntimeError(result.content[0].text if result.content else "tool error")
+        text = result.content[0].text
+    return text
+
+
+async def socket_user(base_url: str, rec: Recorder, stop: asyncio.Event, agent_ids: List[str], received: Dict[str, int]):
+    def on_event(event: str, data):
+        # The dashboard path: one `batch` frame per flush carrying [[event, data], ...]
+        events = data if event == "batch" else [[event, data]]
+        now = time.time()
+        for name, payload in events:
+            received[name] = received.get(name, 0) + 1
+            if name == "agent_log" and isinstance(payload, dict) and "ts" in payload:
+                rec.record("sio.log_delivery", max(0.0, now - payload["ts"]))
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as http:
+        client = PollingSocketClient(http)
+        async with rec.timed("sio.connect"):
+            await client.connect()
+        if client.sid is None:
+            return
+        try:
+            if agent_ids:
+                await client.emit("join_agent_room", {"agent_id": random.choice(agent_ids)})
+            await client.listen(on_event, stop)
+        except httpx.HTTPError as e:
+            if not stop.is_set():
+                rec.error("sio.listen", e)
+        finally:
+            await client.close()
+
+
+async def _think(stop: asyncio.Event, seconds: float):
+    if seconds > 0:
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(stop.wait(), seconds)
+
+
+def server_metrics() -> dict:
+    lag = metrics.get("event_loop_lag_seconds")
+    frames = metrics.get("socketio_frames")
+    events = metrics.get("socketio_events")
+    return {
+        "tasks": len(blackboard.task_store),
+        "tasks_done": sum(1 for t in blackboard.tasks if t.status == "done"),
+        "agents": len(blackboard.agent_store),
+        "llm_calls": llm_service.backend.calls,
+        "ui_triggers": automation.executor.prompts,
+        "socketio_frames": frames.value() if frames else None,
+        "socketio_events": events.value() if events else None,
+        "loop_lag_p99_ms": _ms(lag.quantile(0.99)) if lag else None,
+    }
+
+
+async def run(args) -> dict:
+    llm_service.backend = FakeLLMBackend(latency=args.llm_ms / 1000)
+    automation.executor = FakeExecutor(latency=args.trigger_ms / 1000)
+
+    config = uvicorn.Config(app_socketio, host="127.0.0.1", port=args.port, log_level="warning", lifespan="on")
+    server = uvicorn.Server(config)
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        if serving.done():
+            serving.result()
+        await asyncio.sleep(0.01)
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    rec = Recorder()
+    stop = asyncio.Event()
+    agent_ids: List[str] = []
+    received: Dict[str, int] = {}
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as http:
+        # A few agents up front, so the dispatcher has somewhere to place plans from the start
+        for role in ROLES:
+            response = await http.post("/api/v1/agents/create", json={"role": role})
+            agent_ids.append(response.json()["id"])
+
+        workers = [asyncio.create_task(socket_user(base_url, rec, stop, agent_ids, received)) for _ in range(args.sockets)]
+        workers += [asyncio.create_task(plan_user(http, rec, stop, args.plan_think_ms / 1000)) for _ in range(args.plan_users)]
+        workers += [asyncio.create_task(agent_user(http, rec, stop, args.agent_think_ms / 1000, agent_ids)) for _ in range(args.agent_users)]
+        workers += [asyncio.create_task(mcp_agent(f"{base_url}/mcp/sse", ROLES[i % len(ROLES)], rec, stop, args.mcp_think_ms / 1000))
+                    for i in range(args.mcp_agents)]
+
+        started = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        stop.set()
+        elapsed = time.perf_counter() - started
+        done, pending = await asyncio.wait(workers, timeout=10)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            if not task.cancelled() and task.exception():
+                rec.error("worker", task.exception())
+
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "options": {k: v for k, v in vars(args).items() if k not in ("save", "baseline", "verbose")},
+        },
+        "duration_s": round(elapsed, 2),
+        "ops": rec.report(elapsed),
+        "server": {**server_metrics(), "socketio_received": received},
+    }
+    server.should_exit = True
+    await serving
+    return report
+
+
+def compare(report: dict, baseline: dict, tolerance: float, floor_ms: float) -> List[str]:
+    """Regressions of `report` against `baseline`; latency changes under `floor_ms` are ignored as noise."""
+    regressions = []
+    for op, base in baseline.get("ops", {}).items():
+        current = report["ops"].get(op)
+        if current is None:
+            continue
+        for key in ("p50_ms", "p99_ms"):
+            before, after = base.get(key), current.get(key)
+            if before is not None and after is not None and after > before * (1 + tolerance) and after - before > floor_ms:
+                regressions.append(f"{op} {key}: {before} -> {after}")
+        # A handful of samples says nothing about throughput
+        if base.get("count", 0) >= 20 and current["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"{op} rps: {base['rps']} -> {current['rps']}")
+        if current["errors"] > base.get("errors", 0):
+            regressions.append(f"{op} errors: {base.get('errors', 0)} -> {current['errors']}")
+    return regressions
+
+
+def print_report(report: dict, baseline: Optional[dict]):
+    print(f"{report['duration_s']} s, commit {report['meta']['commit']}")
+    print(f"{'operation':<30} {'count':>7} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for op, r in report["ops"].items():
+        row = f"{op:<30} {r['count']:>7} {r['errors']:>5} {r['rps']:>8}"
+        for key in ("p50_ms", "p90_ms", "p99_ms", "max_ms"):
+            row += f" {'-' if r[key] is None else r[key]:>9}"
+        base = (baseline or {}).get("ops", {}).get(op)
+        if base and base.get("p99_ms") and r["p99_ms"] is not None:
+            row += f"   p99 {100 * (r['p99_ms'] / base['p99_ms'] - 1):+.0f}%"
+        print(row)
+    print("server:", json.dumps(report["server"]))
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=15, help="Seconds of load")
+    parser.add_argument("--plan-users", type=int, default=2)
+    parser.add_argument("--plan-think-ms", type=float, default=100)
+    parser.add_argument("--agent-users", type=int, default=1)
+    parser.add_argument("--agent-think-ms", type=float, default=500)
+    parser.add_argument("--mcp-agents", type=int, default=6)
+    parser.add_argument("--mcp-think-ms", type=float, default=50, help="Pause after finding no work")
+    parser.add_argument("--sockets", type=int, default=20, help="Simulated Socket.IO dashboards")
+    parser.add_argument("--llm-ms", type=float, default=200, help="Fake LLM latency")
+    parser.add_argument("--trigger-ms", type=float, default=20, help="Fake UI trigger latency")
+    parser.add_argument("--port", type=int, default=18300)
+    parser.add_argument("--save", help="Write the report to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a report saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown before flagging")
+    parser.add_argument("--floor-ms", type=float, default=2, help="Ignore latency changes smaller than this")
+    parser.add_argument("--verbose", action="store_true", help="Show the API's own output")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    # The API prints a line per connection and log entry; keep the report readable
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        report = asyncio.run(run(args))
+
+    print_report(report, baseline)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Saved baseline to {args.save}")
+    if baseline:
+        regressions = compare(report, baseline, args.tolerance, args.floor_ms)
+        for line in regressions:
+            print(f"❌ Regression: {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Concurrency stress test for the task claim/lease protocol.
+
+Many claimants (orchestrator, pollers, MCP agents) race for the same tasks; every
+task must end up with exactly one winner. Leases that are never renewed must be
+re-queued and claimable again.
+
+Run from the repository root:
+    python -m apps.api.benchmarks.stress_claims --tasks 2000 --claimants 64
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+
+from apps.api.app.models.task import Task, TaskStatus
+from apps.api.app.services.blackboard import Blackboard
+
+ROLES = ["Architect", "Coder", "Reviewer", "Executive"]
+
+
+async def race_same_task(board: Blackboard, task_id: str, claimants: int) -> int:
+    async def attempt(i: int):
+        await asyncio.sleep(0)
+        return await board.claim_task(task_id, f"claimant-{i}")
+
+    results = await asyncio.gather(*(attempt(i) for i in range(claimants)))
+    return sum(1 for r in results if r is not None)
+
+
+async def race_by_role(board: Blackboard, claimants: int, rng: random.Random) -> Counter:
+    wins: Counter = Counter()
+
+    async def worker(i: int):
+        role = ROLES[i % len(ROLES)]
+        while True:
+            # Random yields interleave claimants the way real awaits would
+            for _ in range(rng.randint(0, 2)):
+                await asyncio.sleep(0)
+            task = await board.claim_next_task(role, f"{role}-{i}")
+            if not task:
+                return
+            wins[task.id] += 1
+
+    await asyncio.gather(*(worker(i) for i in range(claimants)))
+    return wins
+
+
+async def run(n_tasks: int, claimants: int, seed: int):
+    rng = random.Random(seed)
+    board = Blackboard()
+    for i in range(n_tasks):
+        await board.add_task(Task(id=f"t{i}", description="stress", role=ROLES[i % len(ROLES)]))
+
+    # 1. Everyone races for one task
+    winners = await race_same_task(board, "t0", claimants)
+    assert winners == 1, f"expected 1 winner for t0, got {winners}"
+    print(f"single task: {claimants} claimants -> {winners} winner")
+
+    # 2. Per-role workers drain the board concurrently
+    start = time.perf_counter()
+    wins = await race_by_role(board, claimants, rng)
+    elapsed = time.perf_counter() - start
+    doubles = [t for t, c in wins.items() if c > 1]
+    assert not doubles, f"tasks claimed more than once: {doubles[:10]}"
+    assert len(wins) == n_tasks - 1, f"{n_tasks - 1 - len(wins)} tasks never claimed"
+    print(f"drain: {n_tasks - 1} tasks, {claimants} claimants, 0 double claims, {(n_tasks - 1) / elapsed:,.0f} claims/s")
+
+    # 3. Expired leases are re-queued and won by exactly one claimant again
+    half = [f"t{i}" for i in range(0, n_tasks, 2)]
+    for task_id in half:
+        board.heartbeat(task_id, ttl=0.001)
+    await asyncio.sleep(0.01)
+    requeued = await board.expire_leases()
+    assert sorted(requeued) == sorted(half), "not every expired lease was re-queued"
+    assert all(board.get_task(t).status == TaskStatus.PENDING for t in half)
+
+    rewins = await race_by_role(board, claimants, rng)
+    assert set(rewins) == set(half) and max(rewins.values()) == 1
+    print(f"expiry: {len(requeued)} leases expired, re-queued and re-claimed once each")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--claimants", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    asyncio.run(run(args.tasks, args.claimants, args.seed))
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,160 @@
-from fastapi import FastAPI
+import time
+IMPORT_STARTED = time.perf_counter()
+
+# Before any app module reads its settings from the environment
+from dotenv import load_dotenv
+load_dotenv()
+
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import socketio
-import uvicorn
+import asyncio
+import os
+import re
 from contextlib import asynccontextmanager
 from apps.api.app.core.socket import sio
-from mcp.server.sse import SseServerTransport
-from fastapi import Request
-from fastapi.responses import Response
+from apps.api.app.core.broadcaster import broadcaster
+from apps.api.app.core.broker import BROKER_URL
+from apps.api.app.core.metrics import metrics, loop_monitor, MetricsMiddleware, SLOW_REQUEST_MS
+from apps.api.app.core.lazy import Lazy
+from fastapi import Request, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 # Initialize Socket.IO logic here if needed
 
-from apps.api.app.services.blackboard import blackboard
+from apps.api.app.services.blackboard import blackboard, DEFAULT_PROJECT
+from apps.api.app.models.agent import AgentStatus
+from apps.api.app.models.task import Task, TaskPriority, TaskStatus
 from apps.api.app.services.orchestrator import orchestrator
 from apps.api.app.services.commander import commander
-from apps.api.app.services.mcp_server import mcp_server
+from apps.api.app.services.persistence import persistence
+from apps.api.app.services.automation import automation
+from apps.api.app.services.task_feed import task_feed
+from apps.api.app.services.replication import replication
+from apps.api.app.services.telemetry import lifecycle_metrics
+from apps.api.app.services.state_sync import state_sync
+from apps.api.app.services.admission import admission, AdmissionError
+from apps.api.app.services.mission_analytics import mission_analytics
+from apps.api.app.services.task_memo import task_memo
+from apps.api.app.services.projects import projects, Project, ProjectError, ProjectLimitError, PROJECT_ID
+from apps.api.app.services.llm import llm_service
 from pydantic import BaseModel
+from typing import List, Optional
+from dataclasses import asdict
+import uuid
+from urllib.parse import parse_qs
+
+MCP_ENABLED = os.getenv("MCP_ENABLED", "true").lower() == "true"  # Serve /mcp/sse for IDE agents
+
+def _build_mcp():
+    # The MCP SDK is the heaviest import after the LLM SDK; load it with its endpoints
+    from mcp.server.sse import SseServerTransport
+    from apps.api.app.services.mcp_server import mcp_server
+    return mcp_server, SseServerTransport("/mcp/messages")
+
+mcp = Lazy("mcp", _build_mcp)
+IMPORT_SECONDS = time.perf_counter() - IMPORT_STARTED
+startup = {"ready": False, "seconds": None}
 
 class PlanRequest(BaseModel):
     prompt: str
+    priority: TaskPriority = TaskPriority.NORMAL
+    deadline: Optional[float] = None
+    mission_id: Optional[str] = None
+    project: Optional[str] = None  # Created on first use; the default project when omitted
 
 class AgentRequest(BaseModel):
     role: str
+    capabilities: List[str] = []
+    project: Optional[str] = None
+
+class AgentStatusRequest(BaseModel):
+    status: AgentStatus
+
+class ClaimRequest(BaseModel):
+    roles: List[str]
+    claimant: str
+    project: Optional[str] = None
+
+class TaskSpec(BaseModel):
+    id: Optional[str] = None
+    description: str
+    role: str
+    dependencies: List[str] = []
+    mission_id: Optional[str] = None
+    priority: TaskPriority = TaskPriority.NORMAL
+    deadline: Optional[float] = None
+
+class TaskBatchRequest(BaseModel):
+    tasks: List[TaskSpec]
+    project: Optional[str] = None
+
+class StatusUpdate(BaseModel):
+    task_id: str
+    status: TaskStatus
+    result: Optional[str] = None
+
+class StatusBatchRequest(BaseModel):
+    updates: List[StatusUpdate]
+    project: Optional[str] = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Antigravity API Starting...")
+    started = time.perf_counter()
+    loop_monitor.start()
+    # Replay the write-ahead log before anything can mutate the Blackboard
+    await persistence.start()
+    # With a broker, catch up with the other workers before serving
+    await replication.start()
+    task_feed.start()
+    lifecycle_metrics.start()
+    state_sync.start()
+    admission.start()
+    mission_analytics.start()
+    task_memo.start()
     await orchestrator.start()
+    # Projects other than the default one, recovered from their own journals
+    await projects.start()
+    # SDKs load in worker threads while requests are already served; /health reports when they are in
+    components = [llm_service.load()] + ([mcp.warm()] if MCP_ENABLED else [])
+    warming = asyncio.ensure_future(_finish_startup(components, started))
     yield
     # Shutdown
+    warming.cancel()
+    await projects.stop()
     await orchestrator.stop()
+    await mission_analytics.stop()
+    await task_memo.stop()
+    await automation.stop()
+    await broadcaster.stop()
+    await replication.stop()
+    await persistence.stop()
+    blackboard.log_store.close()
+    await loop_monitor.stop()
     print("🛑 Antigravity API Stopping...")
 
+async def _finish_startup(components, started: float):
+    await asyncio.gather(*components, return_exceptions=True)
+    startup["ready"], startup["seconds"] = True, time.perf_counter() - started
+    print(f"✅ Ready in {startup['seconds']:.2f}s (imports took {IMPORT_SECONDS:.2f}s)")
+
+async def _open_project(project_id: Optional[str]) -> Project:
+    """The project a write goes to, created on first use."""
+    try:
+        return await projects.open(project_id)
+    except ProjectLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ProjectError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _project(project_id: Optional[str]) -> Project:
+    project = projects.get(project_id)
+    if project is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project
+
 app = FastAPI(title="Antigravity API", version="2.0.0", lifespan=lifespan)
 
 # Mount Socket.IO app
@@ -45,56 +168,332 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware, slow_ms=SLOW_REQUEST_MS, long_lived=["/mcp/sse", "/api/v1/tasks/events"])
 
 @app.get("/")
 async def root():
     return {"status": "online", "message": "Antigravity Orchestration API v2"}
 
+@app.get("/health")
+async def health():
+    """Readiness: 200 once startup finished and every enabled component loaded, 503 until then or if one failed."""
+    components = {"llm": llm_service.loader.status()}
+    if MCP_ENABLED:
+        components["mcp"] = mcp.status()
+    failed = any(c["state"] == "failed" for c in components.values())
+    ready = startup["ready"] and not failed
+    body = {
+        "status": "ready" if ready else "degraded" if failed else "starting",
+        "components": components,
+        "import_seconds": round(IMPORT_SECONDS, 3),
+        "startup_seconds": None if startup["seconds"] is None else round(startup["seconds"], 3),
+        "pid": os.getpid(),
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus text exposition of this worker's metrics."""
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/v1/metrics/stalls")
+async def loop_stalls():
+    """Latest stack samples of a blocked event loop (needs LOOP_STALL_MS)."""
+    return {"stall_ms": loop_monitor.stall * 1000, "recent": loop_monitor.recent}
+
+@app.get("/api/v1/projects")
+async def list_projects():
+    """Projects open in this worker, with their Socket.IO room and task and agent counts."""
+    return {"projects": projects.summaries(), "max_projects": projects.max_projects}
+
 @app.post("/api/v1/plan")
 async def create_plan(request: PlanRequest):
-    await commander.plan(request.prompt)
-    return {"status": "planning_started"}
+    project = await _open_project(request.project)
+    try:
+        mission_id = await commander.plan(request.prompt, priority=request.priority, deadline=request.deadline,
+                                          mission_id=request.mission_id, project=project)
+    except AdmissionError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {"status": "planning_started", "mission_id": mission_id, "project": project.id}
+
+@app.get("/api/v1/plan/metrics")
+async def plan_metrics():
+    """Recent planning round-trips: time to first LLM chunk, to first schedulable task, and in total."""
+    return {"streaming": commander.streaming, "recent": list(commander.metrics)}
+
+@app.get("/api/v1/automation/status")
+async def automation_status():
+    """UI trigger queue: roles waiting for the IDE window and the outcome of recent triggers."""
+    return {
+        "executor": type(automation.executor).__name__,
+        "pending": automation.pending_roles(),
+        "sent": automation.sent,
+        "failed": automation.failed,
+        "merged": automation.merged,
+        "recent": [asdict(r) for r in automation.results],
+    }
 
 @app.post("/api/v1/agents/create")
 async def create_agent(request: AgentRequest):
-    agent = await blackboard.register_agent(request.role)
-    return agent.model_dump()
+    project = await _open_project(request.project)
+    agent = await project.board.register_agent(request.role, request.capabilities)
+    return agent.to_dict()
+
+@app.post("/api/v1/agents/{agent_id}/status")
+async def set_agent_status(agent_id: str, request: AgentStatusRequest, project: Optional[str] = None):
+    """Marks an agent OFFLINE (its work is re-placed) or back online."""
+    board = _project(project).board
+    agent = board.get_agent(agent_id)
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    # Going offline drops the current task; the dispatcher re-places it
+    task_id = None if request.status == AgentStatus.OFFLINE else agent.current_task_id
+    await board.update_agent_status(agent_id, request.status, task_id=task_id)
+    return agent.to_dict()
+
+@app.get("/api/v1/dispatcher")
+async def dispatcher_stats(project: Optional[str] = None):
+    """Per-agent running task, queue and observed mean task duration."""
+    return _project(project).orchestrator.dispatcher.stats()
+
+@app.get("/api/v1/queue")
+async def ready_queue(role: Optional[str] = None, limit: int = 20, project: Optional[str] = None):
+    """Ready tasks per role and mission, the next ones `role` would claim, and the admission backlog."""
+    project = _project(project)
+    queue = project.board.ready_queue
+    return {
+        "policy": queue.policy,
+        "ready": queue.pending(),
+        "next": queue.peek(role, max(1, min(limit, 1000))) if role else [],
+        "pending": project.admission.pending(),
+        "max_pending": project.admission.max_pending,
+    }
+
+@app.get("/api/v1/missions")
+async def list_missions(project: Optional[str] = None):
+    """Progress, remaining critical path and ETA of every mission; also pushed as `mission_updated` events."""
+    analytics = _project(project).mission_analytics
+    return {"missions": [analytics.summary(m) for m in list(analytics.missions)]}
+
+@app.get("/api/v1/missions/{mission_id}")
+async def get_mission(mission_id: str, slack: bool = False, project: Optional[str] = None):
+    """One mission's summary and critical path, plus every open task's slack in seconds with `slack=true`."""
+    analytics = _project(project).mission_analytics
+    summary = analytics.summary(mission_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Mission not found")
+    reply = {**summary, "critical_path": analytics.critical_path(mission_id)}
+    if slack:
+        reply["slack"] = analytics.slack(mission_id)
+    return reply
+
+@app.get("/api/v1/memo")
+async def memo_stats(role: Optional[str] = None, limit: int = 100, project: Optional[str] = None):
+    """Reuse of identical tasks' results: hits, misses and collapsed duplicates per role, plus `role`'s entries."""
+    memo = _project(project).task_memo
+    reply = memo.stats()
+    if role:
+        reply["entries"] = memo.entries(role, max(1, min(limit, 1000)))
+    return reply
+
+@app.delete("/api/v1/memo")
+async def invalidate_memo(role: Optional[str] = None, fingerprint: Optional[str] = None, task_id: Optional[str] = None,
+                          project: Optional[str] = None):
+    """Forgets memoized results: the one `task_id` would reuse, one `fingerprint`, all of a `role`, or everything."""
+    return {"invalidated": _project(project).task_memo.invalidate(role=role, fingerprint=fingerprint, task_id=task_id)}
+
+@app.get("/api/v1/logs")
+async def get_logs(agent: Optional[str] = None, after_seq: int = 0, until_seq: Optional[int] = None, limit: int = 100,
+                   project: Optional[str] = None):
+    """Pages logs by agent and sequence range, so reconnecting dashboards fetch only what they missed."""
+    limit = max(1, min(limit, 1000))
+    log_store = _project(project).board.log_store
+    entries = log_store.page(agent, after_seq, until_seq, limit)
+    return {
+        "entries": [e.to_dict() for e in entries],
+        "next_seq": entries[-1].seq if entries else after_seq,
+        "latest_seq": log_store.seq,
+    }
+
+@app.get("/api/v1/state")
+async def get_state(since_seq: Optional[int] = None, epoch: Optional[str] = None, log_seq: Optional[int] = None,
+                    project: Optional[str] = None):
+    """Full state snapshot, or only what changed after `since_seq` of `epoch`; see StateSync."""
+    sync = _project(project).state_sync
+    if since_seq is None:
+        return Response(sync.snapshot_json(), media_type="application/json")
+    return sync.sync(since_seq, epoch, log_seq)
+
+@app.get("/api/v1/tasks/events")
+async def task_events(roles: List[str] = Query(...), after_seq: int = 0, timeout: float = 25, project: Optional[str] = None):
+    """Long-poll for task events of the given roles after `after_seq`; see TaskFeed."""
+    project = _project(project)
+    events, reset = await project.task_feed.wait(roles, after_seq, max(0.0, min(timeout, 60.0)))
+    return {
+        "events": events,
+        "next_seq": project.task_feed.seq,
+        "reset": reset,
+        "auto_trigger_enabled": project.board.auto_trigger_enabled,
+    }
+
+@app.post("/api/v1/tasks/claim")
+async def claim_task(request: ClaimRequest):
+    """Claims the next ready PENDING task (fair across missions) for the first of `roles` that has one."""
+    board = _project(request.project).board
+    for role in request.roles:
+        task = await board.claim_next_task(role, request.claimant)
+        if task:
+            return {"task": task.to_dict()}
+    return {"task": None}
+
+@app.post("/api/v1/tasks/batch")
+async def add_tasks(request: TaskBatchRequest):
+    """Adds a whole task graph at once; dependencies may refer to other tasks of the batch."""
+    tasks = [
+        Task(id=spec.id or str(uuid.uuid4())[:8], description=spec.description, role=spec.role, dependencies=spec.dependencies,
+             mission_id=spec.mission_id, priority=spec.priority, deadline=spec.deadline)
+        for spec in request.tasks
+    ]
+    project = await _open_project(request.project)
+    try:
+        await project.admission.admit({task.mission_id for task in tasks})
+        added = await project.board.add_tasks(tasks)
+    except AdmissionError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    await project.board.add_log("System", f"Batch of {len(added)} tasks registered.")
+    return {"added": len(added), "ids": [task.id for task in added]}
+
+@app.post("/api/v1/tasks/status/batch")
+async def update_tasks(request: StatusBatchRequest):
+    """Applies many status updates (e.g. completions) at once; all or nothing."""
+    board = _project(request.project).board
+    try:
+        updated = await board.update_tasks([(u.task_id, u.status, u.result) for u in request.updates])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"updated": len(updated)}
+
+@app.get("/api/v1/tasks/{task_id}/result")
+async def get_task_result(task_id: str, request: Request, project: Optional[str] = None):
+    """A task's full result, however large; see get_artifact."""
+    task = _project(project).board.get_task(task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if task.result_digest is None:
+        return Response(task.result or "", media_type="text/plain; charset=utf-8")
+    return await get_artifact(task.result_digest, request)
+
+@app.get("/api/v1/artifacts/{digest}")
+async def get_artifact(digest: str, request: Request):
+    """Streams a stored result; a single `Range: bytes=start-end` (or `-suffix`) gets 206 with that part."""
+    artifact = await asyncio.to_thread(blackboard.artifacts.stat, digest)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    headers = {"Accept-Ranges": "bytes", "ETag": f'"{digest}"', "Cache-Control": "public, max-age=31536000, immutable"}
+    start, end, status = 0, artifact.size, 200
+    # Anything but one well-formed range is ignored and the whole artifact sent, as HTTP allows
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", request.headers.get("range", "").strip())
+    if match and any(match.groups()):
+        if match[1]:
+            start = int(match[1])
+            end = min(int(match[2]) + 1, artifact.size) if match[2] else artifact.size
+        else:
+            start = max(0, artifact.size - int(match[2]))
+        if start >= end:
+            raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{artifact.size}"})
+        status = 206
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{artifact.size}"
+    headers["Content-Length"] = str(end - start)
+    # A plain iterator: Starlette reads it in a worker thread, so disk reads don't block the loop
+    return StreamingResponse(blackboard.artifacts.iter_range(artifact, start, end), status_code=status,
+                             media_type="text/plain; charset=utf-8", headers=headers)
 
 # MCP SSE Endpoints
-sse = SseServerTransport("/mcp/messages")
+class AlreadySent(Response):
+    """The MCP transport answers through request._send itself; a second response would make uvicorn raise."""
+
+    async def __call__(self, scope, receive, send):
+        pass
 
 @app.get("/mcp/sse")
 async def handle_sse(request: Request):
+    if not MCP_ENABLED:
+        raise HTTPException(status_code=404, detail="MCP is disabled")
+    mcp_server, sse = await mcp.aget()
     async with sse.connect_sse(request.scope, request.receive, request._send) as (read_stream, write_stream):
         await mcp_server.run(read_stream, write_stream, mcp_server.create_initialization_options())
+    return AlreadySent()
 
 @app.post("/mcp/messages")
 async def handle_messages(request: Request):
+    if not MCP_ENABLED:
+        raise HTTPException(status_code=404, detail="MCP is disabled")
+    _, sse = await mcp.aget()
     await sse.handle_post_message(request.scope, request.receive, request._send)
+    return AlreadySent()
 
 @sio.event
-async def connect(sid, environ):
+async def connect(sid, environ, auth=None):
+    # Dashboards follow one project, from `auth` or `?project=`; its room carries all of its events
+    project_id = (auth or {}).get("project") or parse_qs(environ.get("QUERY_STRING", "")).get("project", [None])[0]
+    if project_id and not PROJECT_ID.match(project_id):
+        raise socketio.exceptions.ConnectionRefusedError(f"Invalid project id {project_id!r}")
+    await _join_project(sid, project_id or DEFAULT_PROJECT)
     print(f"Client connected: {sid}")
     await sio.emit('message', {'data': 'Connected to Antigravity API'}, room=sid)
 
+async def _join_project(sid, project_id: str):
+    session = await sio.get_session(sid)
+    if session.get("project"):
+        await sio.leave_room(sid, f"project:{session['project']}")
+    await sio.enter_room(sid, f"project:{project_id}")
+    await sio.save_session(sid, {**session, "project": project_id})
+
+async def _session_project(sid) -> Optional[Project]:
+    return projects.get((await sio.get_session(sid)).get("project"))
+
+@sio.event
+async def join_project(sid, data):
+    """Switches the client to another project's room; it should `sync` again afterwards."""
+    project_id = (data or {}).get("project") or DEFAULT_PROJECT
+    if not PROJECT_ID.match(project_id):
+        return {"error": f"Invalid project id {project_id!r}"}
+    await _join_project(sid, project_id)
+    return {"project": project_id}
+
+@sio.event
+async def sync(sid, data):
+    """Acknowledges with the deltas since the client's `seq`, or a full snapshot (`reset`)."""
+    data = data or {}
+    project = await _session_project(sid)
+    if project is None:
+        # Nothing planned in it yet: an empty board, replaced by the first `sync` after it is created
+        return {"reset": True, "epoch": None, "seq": 0, "tasks": [], "agents": [], "auto_trigger_enabled": False, "log_seq": 0, "logs": []}
+    return project.state_sync.sync(data.get("seq"), data.get("epoch"), data.get("log_seq"))
+
 @sio.event
 async def toggle_auto_trigger(sid, data):
     enabled = data.get("enabled", False)
-    await blackboard.set_auto_trigger(enabled)
+    project = await _session_project(sid)
+    if project:
+        await project.board.set_auto_trigger(enabled)
 
 @sio.event
 async def join_agent_room(sid, data):
     agent_id = data.get("agent_id")
     if agent_id:
-        sio.enter_room(sid, agent_id)
+        await sio.enter_room(sid, agent_id)
         print(f"Client {sid} joined room: {agent_id}")
 
 @sio.event
 async def agent_log(sid, data):
     agent = data.get("agent")
     message = data.get("message")
-    if agent and message:
-        await blackboard.add_log(agent, message)
+    project = await _session_project(sid)
+    if agent and message and project:
+        await project.board.add_log(agent, message)
 
 @sio.event
 async def disconnect(sid):
@@ -102,7 +501,12 @@ async def disconnect(sid):
 
 def start():
     """Entry point for poetry/scripts"""
-    uvicorn.run("apps.api.main:app_socketio", host="0.0.0.0", port=8000, reload=True)
+    import uvicorn
+    workers = int(os.getenv("API_WORKERS", "1"))
+    if workers > 1 and not BROKER_URL:
+        print("⚠️ WARNING: API_WORKERS > 1 without BROKER_URL; every worker gets its own Blackboard.")
+    # uvicorn can't reload and run several workers at once
+    uvicorn.run("apps.api.main:app_socketio", host="0.0.0.0", port=8000, reload=workers == 1, workers=workers)
 
 if __name__ == "__main__":
     start()
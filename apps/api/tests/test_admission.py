@@ -0,0 +1,27 @@
+import asyncio
+
+from apps.api.app.models.task import Task, TaskStatus
+from apps.api.app.services.admission import AdmissionController
+from apps.api.app.services.blackboard import Blackboard
+
+
+async def backlog(board, n):
+    await board.add_tasks([Task(id=f"t{i}", description="Work", role="Coder", mission_id="m0") for i in range(n)])
+
+
+def test_every_waiter_is_admitted_once_the_backlog_drops():
+    async def scenario():
+        board = Blackboard(project="admission-test")
+        admission = AdmissionController(board, max_pending=2, max_wait=1)
+        admission.start()
+        await backlog(board, 2)
+        waiters = [asyncio.create_task(admission.admit([f"m{i}"])) for i in range(1, 4)]
+        await asyncio.sleep(0)
+        assert not any(w.done() for w in waiters)
+
+        await board.update_task_status("t0", TaskStatus.DONE, result="ok")
+        await asyncio.wait_for(asyncio.gather(*waiters), 0.5)
+        assert not admission._waiters
+
+    asyncio.run(scenario())
+
@@ -0,0 +1,77 @@
+import os
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from apps.api import main
+from apps.api.app.services.artifact_store import ArtifactStore
+
+TEXT = "".join(f"line {i}: the quick brown fox\n" for i in range(20000)).encode()  # Compresses well
+NOISE = random.Random(7).randbytes(200 * 1024)  # Doesn't: stored as is
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArtifactStore(str(tmp_path), cache_bytes=64 * 1024)  # Anything over 8 KiB is streamed from disk
+
+
+@pytest.fixture
+def client(store, monkeypatch):
+    monkeypatch.setattr(main.blackboard, "artifacts", store)
+    return TestClient(main.app)
+
+
+def test_put_compresses_when_it_pays_and_deduplicates(store):
+    text, stored = store.put(TEXT)
+    assert stored and text.compressed and text.stored < text.size == len(TEXT)
+    noise, _ = store.put(NOISE)
+    assert not noise.compressed and noise.stored == noise.size
+    again, stored = store.put(TEXT)
+    assert again == text and not stored
+    assert store.read(text.digest) == TEXT
+    assert not [name for _, _, names in os.walk(store.root) for name in names if name.endswith(".tmp")]
+
+
+@pytest.mark.parametrize("data", [TEXT, NOISE, b"small artifact " * 100], ids=["compressed", "raw", "cached"])
+def test_iter_range_returns_exactly_the_requested_bytes(store, data):
+    artifact, _ = store.put(data)
+    for start, end in [(0, None), (0, 1), (5, 70000), (65530, 65540), (len(data) - 3, len(data)), (10, len(data) + 99)]:
+        assert b"".join(store.iter_range(artifact, start, end)) == data[start:end]
+
+
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=10-19", 10, 20),
+    ("bytes=70000-", 70000, None),
+    ("bytes=-25", -25, None),
+    ("bytes=100-99999999", 100, None),
+    ("bytes=0-0", 0, 1),
+])
+def test_single_range_gets_206_with_that_part(client, store, header, start, end):
+    artifact, _ = store.put(TEXT)
+    response = client.get(f"/api/v1/artifacts/{artifact.digest}", headers={"Range": header})
+    assert response.status_code == 206
+    part = TEXT[start:end]
+    assert response.content == part
+    first = start if start >= 0 else len(TEXT) + start
+    assert response.headers["content-range"] == f"bytes {first}-{first + len(part) - 1}/{len(TEXT)}"
+    assert response.headers["content-length"] == str(len(part))
+
+
+def test_whole_artifact_without_or_with_an_unusable_range(client, store):
+    artifact, _ = store.put(NOISE)
+    for headers in ({}, {"Range": "bytes=1-2,5-6"}, {"Range": "lines=1-2"}, {"Range": "bytes=-"}):
+        response = client.get(f"/api/v1/artifacts/{artifact.digest}", headers=headers)
+        assert response.status_code == 200
+        assert response.content == NOISE
+        assert response.headers["accept-ranges"] == "bytes"
+        assert response.headers["etag"] == f'"{artifact.digest}"'
+
+
+def test_unsatisfiable_range_and_unknown_artifacts(client, store):
+    artifact, _ = store.put(TEXT)
+    response = client.get(f"/api/v1/artifacts/{artifact.digest}", headers={"Range": f"bytes={len(TEXT)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(TEXT)}"
+    assert client.get(f"/api/v1/artifacts/{'0' * 64}").status_code == 404
+    assert client.get("/api/v1/artifacts/not-a-digest").status_code == 404
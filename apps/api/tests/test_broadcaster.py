@@ -0,0 +1,94 @@
+import asyncio
+from collections import defaultdict
+
+from apps.api.app.core.broadcaster import BATCH_EVENT, Broadcaster
+
+
+class RecordingServer:
+    """Stands in for socketio.AsyncServer: keeps each room's frames."""
+
+    def __init__(self):
+        self.frames = defaultdict(list)
+
+    async def emit(self, event, data, room=None):
+        assert event == BATCH_EVENT
+        self.frames[room].append(data)
+
+
+def broadcast(steps, **options):
+    """Runs `steps(broadcaster)` (publishes, and None to flush) and returns what each room received."""
+    async def run():
+        server = RecordingServer()
+        broadcaster = Broadcaster(server, **options)
+        for step in steps:
+            if step is None:
+                await broadcaster.flush()
+            else:
+                step(broadcaster)
+        await broadcaster.stop()
+        return server.frames
+
+    return asyncio.run(run())
+
+
+def task(status, **fields):
+    return {"id": "t1", "role": "Coder", "status": status, "claimed_by": None, **fields}
+
+
+def test_updates_in_one_window_coalesce_and_later_ones_are_diffs():
+    frames = broadcast([
+        lambda b: b.publish("task_added", task("pending"), key=("task", "t1"), room="r"),
+        lambda b: b.publish("task_updated", task("in_progress", claimed_by="a"), key=("task", "t1"), room="r"),
+        None,
+        lambda b: b.publish("task_updated", task("done", claimed_by="a"), key=("task", "t1"), room="r"),
+    ])
+    assert frames["r"] == [
+        [["task_added", task("in_progress", claimed_by="a")]],
+        [["task_updated", {"status": "done", "id": "t1"}]],
+    ]
+
+
+def test_batch_events_count_as_last_sent_for_their_entities():
+    # A task sent in a tasks_updated batch and then put back must not be diffed against an older state
+    frames = broadcast([
+        lambda b: b.publish("task_updated", task("in_progress", claimed_by="a"), key=("task", "t1"), room="r"),
+        None,
+        lambda b: b.publish("tasks_updated", [task("pending")], room="r", entity="task"),
+        None,
+        lambda b: b.publish("task_updated", task("in_progress", claimed_by="a"), key=("task", "t1"), room="r"),
+    ])
+    assert frames["r"][-1] == [["task_updated", {"status": "in_progress", "claimed_by": "a", "id": "t1"}]]
+
+
+def test_rooms_are_separate():
+    frames = broadcast([
+        lambda b: b.publish("task_updated", task("pending"), key=("task", "t1"), room="project:a"),
+        lambda b: b.publish("agent_log", {"message": "hi"}, room="project:b"),
+    ])
+    assert frames["project:a"] == [[["task_updated", task("pending")]]]
+    assert frames["project:b"] == [[["agent_log", {"message": "hi"}]]]
+
+
+def test_unkeyed_overflow_drops_the_oldest_of_that_room_only():
+    def flood(b):
+        for i in range(5):
+            b.publish("agent_log", {"seq": i}, room="busy")
+        b.publish("agent_log", {"seq": 0}, room="quiet")
+
+    frames = broadcast([flood], max_pending=3)
+    assert frames["busy"] == [[["agent_log", {"seq": i}] for i in (2, 3, 4)]]
+    assert frames["quiet"] == [[["agent_log", {"seq": 0}]]]
+
+
+def test_last_sent_states_are_bounded():
+    def send(b):
+        for i in range(10):
+            b.publish("task_updated", {"id": f"t{i}", "status": "pending"}, key=("task", f"t{i}"), room="r")
+
+    async def run():
+        broadcaster = Broadcaster(RecordingServer(), max_entities=4)
+        send(broadcaster)
+        await broadcaster.stop()
+        return list(broadcaster._last_sent)
+
+    assert asyncio.run(run()) == [("r", ("task", f"t{i}")) for i in range(6, 10)]
@@ -0,0 +1,44 @@
+import asyncio
+
+from apps.api.app.models.agent import AgentStatus
+from apps.api.app.models.task import Task, TaskStatus
+from apps.api.app.services.blackboard import Blackboard
+from apps.api.app.services.dispatcher import Dispatcher
+
+
+async def settle(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "dispatcher did not settle"
+        await asyncio.sleep(0.01)
+
+
+def test_failed_trigger_fails_the_task_and_frees_the_agent():
+    async def scenario():
+        board = Blackboard(project="dispatch-test")
+        triggered = []
+
+        async def trigger(agent, task):
+            triggered.append(task.id)
+            if task.id == "t1":
+                raise RuntimeError("IDE window not found")
+
+        dispatcher = Dispatcher(board, trigger, queue_size=1)
+        await dispatcher.start()
+        agent = await board.register_agent("Coder")
+        await board.add_tasks([Task(id="t1", description="Build", role="Coder"), Task(id="t2", description="Ship", role="Coder")])
+        dispatcher.offer("t1")
+        dispatcher.offer("t2")
+
+        await settle(lambda: triggered == ["t1", "t2"])
+        assert board.get_task("t1").status == TaskStatus.ERROR
+        assert "IDE window not found" in board.get_task("t1").result
+        await settle(lambda: board.get_agent(agent.id).current_task_id == "t2")
+        assert board.get_agent(agent.id).status == AgentStatus.BUSY
+
+        await board.update_task_status("t2", TaskStatus.DONE, result="ok")
+        await settle(lambda: board.get_agent(agent.id).status == AgentStatus.IDLE)
+        assert dispatcher.load() == {"running": 0, "queued": 0, "backlog": 0}
+        await dispatcher.stop()
+
+    asyncio.run(scenario())
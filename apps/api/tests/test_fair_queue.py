@@ -0,0 +1,88 @@
+from apps.api.app.models.records import TaskRecord
+from apps.api.app.models.task import TaskPriority
+from apps.api.app.services.fair_queue import FairQueue
+
+
+def task(task_id, mission=None, priority=TaskPriority.NORMAL, deadline=None, role="Coder"):
+    return TaskRecord(task_id, task_id, role, mission_id=mission, priority=priority, deadline=deadline)
+
+
+def drain(queue, role="Coder", accept=lambda task_id: True):
+    popped = []
+    while (task_id := queue.pop(role, accept)) is not None:
+        popped.append(task_id)
+    return popped
+
+
+def test_earliest_deadline_first_within_a_mission():
+    queue = FairQueue()
+    for t in (task("none", "m"), task("late", "m", deadline=300.0), task("soon", "m", deadline=100.0),
+              task("high", "m", priority=TaskPriority.HIGH)):
+        queue.push(t)
+    assert drain(queue) == ["soon", "late", "high", "none"]
+
+
+def test_priority_then_criticality_then_arrival_without_deadlines():
+    queue = FairQueue()
+    queue.critical = lambda task_id: {"short": 1.0, "long": 5.0}.get(task_id, 0.0)
+    for t in (task("first", "m"), task("low", "m", priority=TaskPriority.LOW), task("short", "m"), task("long", "m")):
+        queue.push(t)
+    assert drain(queue) == ["long", "short", "first", "low"]
+
+
+def test_a_flooding_mission_does_not_starve_the_others():
+    queue = FairQueue()
+    for i in range(100):
+        queue.push(task(f"big-{i}", "big"))
+    for i in range(3):
+        queue.push(task(f"small-{i}", "small"))
+    first = drain(queue)[:6]
+    assert sum(task_id.startswith("small") for task_id in first) == 3
+
+
+def test_higher_priority_missions_get_a_larger_share():
+    queue = FairQueue()
+    for i in range(40):
+        queue.push(task(f"h-{i}", "high", priority=TaskPriority.HIGH))
+        queue.push(task(f"l-{i}", "low", priority=TaskPriority.LOW))
+    first = drain(queue)[:20]
+    assert sum(task_id.startswith("h") for task_id in first) == 16
+
+
+def test_fifo_policy_ignores_missions_priorities_and_deadlines():
+    queue = FairQueue(policy="fifo")
+    for t in (task("a", "m1", deadline=500.0), task("b", "m2", priority=TaskPriority.HIGH), task("c", "m1", deadline=1.0)):
+        queue.push(t)
+    assert drain(queue) == ["a", "b", "c"]
+
+
+def test_discarded_and_rejected_tasks_are_skipped():
+    queue = FairQueue()
+    for name in "abcd":
+        queue.push(task(name, "m"))
+    queue.push(task("a", "m"))  # Already queued: ignored
+    assert len(queue) == 4
+    queue.discard("b")
+    assert "b" not in queue
+    assert queue.peek("Coder", 10) == ["a", "c", "d"]
+    assert drain(queue, accept=lambda task_id: task_id != "c") == ["a", "d"]
+    assert len(queue) == 0 and queue.pop("Coder", lambda task_id: True) is None
+
+
+def test_reprioritize_reorders_a_queued_task():
+    queue = FairQueue()
+    scores = {"a": 1.0, "b": 2.0}
+    queue.critical = scores.get
+    queue.push(task("a", "m"))
+    queue.push(task("b", "m"))
+    scores["a"] = 9.0
+    queue.reprioritize(task("a", "m"))
+    assert drain(queue) == ["a", "b"]
+
+
+def test_pending_counts_per_role_and_mission():
+    queue = FairQueue()
+    queue.push(task("a", "m1"))
+    queue.push(task("b", "m1"))
+    queue.push(task("c", None, role="Reviewer"))
+    assert queue.pending() == {"Coder": {"m1": 2}, "Reviewer": {None: 1}}
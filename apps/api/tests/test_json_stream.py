@@ -0,0 +1,43 @@
+import json
+
+from apps.api.app.core.json_stream import JsonArrayStream
+
+PLAN = [
+    {"id": "t1", "description": "Design the API", "role": "Architect", "dependencies": []},
+    {"id": "t2", "description": "Implement {braces} and [brackets]", "role": "Coder", "dependencies": ["t1"]},
+    {"id": "t3", "description": "Quote \"this\", escape \\ and end with a brace }", "role": "Reviewer",
+     "dependencies": ["t2"], "meta": {"nested": [{"deep": True}]}},
+]
+
+
+def feed_in_chunks(text, size):
+    stream = JsonArrayStream()
+    objects = []
+    for i in range(0, len(text), size):
+        objects.extend(stream.feed(text[i:i + size]))
+    return objects
+
+
+def test_objects_come_out_whole_whatever_the_chunking():
+    text = json.dumps(PLAN)
+    for size in (1, 2, 7, 64, len(text)):
+        assert feed_in_chunks(text, size) == PLAN
+
+
+def test_each_object_is_yielded_as_soon_as_it_closes():
+    stream = JsonArrayStream()
+    text = json.dumps(PLAN)
+    first_end = text.index("}") + 1
+    assert stream.feed(text[:first_end - 1]) == []
+    assert stream.feed(text[first_end - 1:first_end]) == [PLAN[0]]
+
+
+def test_prose_before_the_array_is_skipped():
+    text = "Sure! Here is the plan {not json}:\n```json\n" + json.dumps(PLAN) + "\n```"
+    assert feed_in_chunks(text, 5) == PLAN
+
+
+def test_nothing_before_the_array_starts():
+    stream = JsonArrayStream()
+    assert stream.feed('{"id": "stray"}') == []
+    assert stream.feed('[{"id": "t1"}]') == [{"id": "t1"}]
@@ -0,0 +1,36 @@
+from apps.api.app.services.leases import LeaseTable
+
+
+def test_leases_are_indexed_by_owner_and_role_oldest_first():
+    leases = LeaseTable(ttl=60)
+    leases.grant("a", "agent-1", role="Coder")
+    leases.grant("b", "agent-2", role="Coder")
+    leases.grant("c", "agent-1", role="Coder")
+    leases.grant("d", "agent-1", role="Reviewer")
+    assert leases.held("agent-1", "Coder") == ["a", "c"]
+    assert sorted(leases.holders("Coder")) == ["agent-1", "agent-2"]
+    assert leases.holders("Tester") == []
+
+
+def test_release_expiry_and_regrant_keep_the_index_current():
+    leases = LeaseTable(ttl=60)
+    leases.grant("a", "agent-1", role="Coder")
+    leases.grant("b", "agent-1", role="Coder", ttl=1)
+    leases.grant("a", "agent-2", role="Coder")
+    assert leases.held("agent-1", "Coder") == ["b"]
+    assert sorted(lease.task_id for lease in leases.pop_expired(now=float("inf"))) == ["a", "b"]
+    assert leases.holders("Coder") == [] and len(leases) == 0
+    leases.grant("c", "agent-1", role="Coder")
+    leases.release("c")
+    assert leases.held("agent-1", "Coder") == [] and leases._held == {}
+
+
+def test_transfer_is_compare_and_set():
+    leases = LeaseTable(ttl=60)
+    leases.grant("a", "dispatcher", role="Coder")
+    assert leases.transfer("a", "someone-else", "ide") is None
+    lease = leases.transfer("a", "dispatcher", "ide")
+    assert lease.owner == "ide"
+    assert leases.held("ide", "Coder") == ["a"] and leases.held("dispatcher", "Coder") == []
+    assert leases.transfer("a", "dispatcher", "ide-2") is None
+    assert leases.renew("a", "dispatcher") is None and leases.renew("a", "ide") is lease
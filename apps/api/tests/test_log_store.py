@@ -0,0 +1,54 @@
+from apps.api.app.services.log_store import LogStore
+
+
+def seqs(entries):
+    return [entry.seq for entry in entries]
+
+
+def fill(store):
+    # Interleaved agents: a gets odd sequence numbers, b even ones
+    for i in range(1, 21):
+        store.append("a" if i % 2 else "b", f"message {i}")
+
+
+def test_pages_by_sequence_range_and_limit():
+    store = LogStore(capacity=100)
+    fill(store)
+    assert seqs(store.page(limit=5)) == [1, 2, 3, 4, 5]
+    assert seqs(store.page(after_seq=5, limit=5)) == [6, 7, 8, 9, 10]
+    assert seqs(store.page(after_seq=15, until_seq=18)) == [16, 17, 18]
+    assert store.page(after_seq=20) == []
+
+
+def test_pages_one_agent():
+    store = LogStore(capacity=100)
+    fill(store)
+    assert seqs(store.page("a", after_seq=10, limit=3)) == [11, 13, 15]
+    assert store.page("nobody") == []
+
+
+def test_without_segments_only_the_ring_buffer_is_kept():
+    store = LogStore(capacity=3)
+    fill(store)
+    assert seqs(store.page("a")) == [15, 17, 19]
+    assert seqs(store.page()) == [15, 16, 17, 18, 19, 20]
+
+
+def test_evicted_entries_are_paged_from_segments(tmp_path):
+    store = LogStore(capacity=3, segment_dir=str(tmp_path), segment_max_entries=4)
+    fill(store)
+    assert len(list(tmp_path.iterdir())) == 5
+    assert seqs(store.page(limit=100)) == list(range(1, 21))
+    assert seqs(store.page("b", after_seq=3, limit=4)) == [4, 6, 8, 10]
+    assert seqs(store.page(after_seq=6, until_seq=16, limit=4)) == [7, 8, 9, 10]
+    assert seqs(store.page(after_seq=12, until_seq=16)) == [13, 14, 15, 16]
+    store.close()
+
+
+def test_sequence_numbers_continue_after_a_restart(tmp_path):
+    store = LogStore(capacity=3, segment_dir=str(tmp_path))
+    fill(store)
+    store.close()
+    reopened = LogStore(capacity=3, segment_dir=str(tmp_path))
+    assert reopened.append("a", "after restart").seq == 21
+    reopened.close()
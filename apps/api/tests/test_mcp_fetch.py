@@ -0,0 +1,61 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from apps.api.app.models.task import Task, TaskStatus
+from apps.api.app.services import mcp_server
+from apps.api.app.services.blackboard import Blackboard
+from apps.api.app.services.dispatcher import CLAIMANT as DISPATCHER
+
+
+@pytest.fixture
+def board(monkeypatch):
+    board = Blackboard(project="fetch-test")
+    monkeypatch.setattr(mcp_server.projects, "get", lambda project_id=None: SimpleNamespace(board=board))
+    return board
+
+
+async def fetch(agent_id, role="Coder"):
+    reply = (await mcp_server.call_tool("fetch_next_task", {"role": role, "agent_id": agent_id}))[0].text
+    return reply.split("\n")[0].removeprefix("TASK_ID: ") if reply.startswith("TASK_ID") else None
+
+
+def test_ide_agent_takes_over_a_task_a_poller_claimed(board):
+    async def scenario():
+        await board.add_tasks([Task(id="t1", description="Build", role="Coder"), Task(id="t2", description="Test", role="Tester")])
+        await board.claim_task("t1", "poller:Coder+Tester")
+        await board.claim_task("t2", "poller:Coder+Tester")
+        replies = await asyncio.gather(fetch("ide-1"), fetch("ide-2"))
+        assert [reply for reply in replies if reply] == ["t1"]
+        owner = board.get_task("t1").claimed_by
+        assert owner in ("ide-1", "ide-2") and board.leases.get("t1").owner == owner
+        assert board.heartbeat("t1", "poller:Coder+Tester") is None
+        assert board.get_task("t2").claimed_by == "poller:Coder+Tester"
+
+    asyncio.run(scenario())
+
+
+def test_own_task_is_resumed_and_other_agents_tasks_are_left_alone(board):
+    async def scenario():
+        await board.add_tasks([Task(id="t1", description="Build", role="Coder"), Task(id="t2", description="Ship", role="Coder")])
+        await board.claim_task("t1", "ide-1")
+        assert await fetch("ide-1") == "t1"
+        assert await fetch("ide-1") == "t1"
+        assert await fetch("ide-2") == "t2"
+        assert await fetch("ide-3") is None
+        assert board.get_task("t1").claimed_by == "ide-1"
+
+    asyncio.run(scenario())
+
+
+def test_ide_agent_takes_over_a_task_the_dispatcher_handed_to_the_ide(board):
+    async def scenario():
+        await board.add_task(Task(id="t1", description="Build", role="Coder"))
+        await board.claim_task("t1", DISPATCHER)
+        assert await fetch("ide-1") == "t1"
+        assert board.get_task("t1").status == TaskStatus.IN_PROGRESS
+        assert board.held_tasks("ide-1", "Coder") == [board.get_task("t1")]
+        assert board.held_tasks(DISPATCHER, "Coder") == []
+
+    asyncio.run(scenario())
@@ -0,0 +1,73 @@
+import asyncio
+import os
+
+from apps.api.app.models.task import Task, TaskStatus
+from apps.api.app.services.blackboard import Blackboard
+from apps.api.app.services.persistence import BlackboardPersistence
+
+
+async def restart(directory, snapshot_every=100000):
+    persistence = BlackboardPersistence(Blackboard(project="wal-test"), directory, commit_interval_ms=1,
+                                        snapshot_every=snapshot_every)
+    await persistence.start()
+    return persistence
+
+
+def segments(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith("wal-"))
+
+
+def test_recovers_tasks_and_statuses(tmp_path):
+    async def scenario():
+        persistence = await restart(str(tmp_path))
+        board = persistence.board
+        await board.add_tasks([Task(id="a", description="A", role="Coder"), Task(id="b", description="B", role="Coder", dependencies=["a"])])
+        await board.update_task_status("a", TaskStatus.DONE, result="done")
+        await persistence.stop()
+
+        recovered = (await restart(str(tmp_path))).board
+        assert recovered.get_task("a").result == "done"
+        assert recovered.scheduler.is_ready("b") and "b" in recovered.ready_queue
+
+    asyncio.run(scenario())
+
+
+def test_writes_after_a_torn_first_record_survive_later_restarts(tmp_path):
+    async def scenario():
+        persistence = await restart(str(tmp_path))
+        await persistence.board.add_task(Task(id="a", description="A", role="Coder"))
+        await persistence.stop()
+
+        # A crash tore the first record of the next segment, the one reopened at startup
+        torn = os.path.join(str(tmp_path), f"wal-{persistence.lsn + 1:012d}.log")
+        with open(torn, "w", encoding="utf-8") as f:
+            f.write(f'[{persistence.lsn + 1},"task","add","x",{{"id":"x"')
+
+        persistence = await restart(str(tmp_path))
+        assert len(persistence.board.task_store) == 1
+        await persistence.board.add_task(Task(id="b", description="B", role="Coder"))
+        await persistence.board.add_task(Task(id="c", description="C", role="Coder"))
+        await persistence.stop()
+
+        for _ in range(2):
+            persistence = await restart(str(tmp_path))
+            assert sorted(task.id for task in persistence.board.tasks) == ["a", "b", "c"]
+            await persistence.stop()
+
+    asyncio.run(scenario())
+
+
+def test_snapshot_replaces_the_segments_it_covers(tmp_path):
+    async def scenario():
+        persistence = await restart(str(tmp_path), snapshot_every=3)
+        for i in range(5):
+            await persistence.board.add_task(Task(id=f"t{i}", description="T", role="Coder"))
+            await asyncio.sleep(0.01)
+        await persistence.stop()
+        assert os.path.exists(os.path.join(str(tmp_path), "snapshot.json"))
+        assert len(segments(str(tmp_path))) == 1
+
+        recovered = (await restart(str(tmp_path))).board
+        assert len(recovered.task_store) == 5
+
+    asyncio.run(scenario())
@@ -0,0 +1,93 @@
+import asyncio
+from collections import defaultdict
+
+import pytest
+
+from apps.api.app.core.broadcaster import broadcaster
+from apps.api.app.models.task import Task, TaskStatus
+from apps.api.app.services.projects import ProjectError, ProjectLimitError, ProjectRegistry, projects
+
+
+class RecordingServer:
+    """Stands in for socketio.AsyncServer: keeps each room's frames."""
+
+    def __init__(self):
+        self.frames = defaultdict(list)
+
+    async def emit(self, event, data, room=None):
+        self.frames[room].append(data)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = RecordingServer()
+    monkeypatch.setattr(broadcaster, "server", server)
+    return server
+
+
+def test_projects_share_nothing(server):
+    async def scenario():
+        registry = ProjectRegistry(projects.default, None, max_projects=10)
+        alpha, beta = await asyncio.gather(registry.open("alpha"), registry.open("beta"))
+        for service in ("board", "orchestrator", "admission", "state_sync", "persistence", "task_feed", "mission_analytics", "task_memo"):
+            assert getattr(alpha, service) is not getattr(beta, service), service
+        assert alpha.board.artifacts is beta.board.artifacts is projects.default.board.artifacts
+
+        alpha.board.auto_trigger_enabled = False  # Keep the task PENDING: no dispatching to agents
+        feed_seq = beta.task_feed.seq
+        await broadcaster.flush()
+        server.frames.clear()  # Whatever starting the projects announced
+        await alpha.board.add_tasks([Task(id="t1", description="Build", role="Coder", mission_id="m1")])
+        await broadcaster.flush()
+
+        assert alpha.board.get_task("t1") is not None
+        assert beta.board.get_task("t1") is None and projects.default.board.get_task("t1") is None
+        assert await beta.board.claim_next_task("Coder", "agent") is None
+        events, _ = alpha.task_feed.read(["Coder"], 0)
+        assert events and {event["task"]["id"] for event in events} == {"t1"}
+        assert beta.task_feed.seq == feed_seq
+        assert alpha.mission_analytics.summary("m1") is not None
+        assert beta.mission_analytics.summary("m1") is None
+        assert set(server.frames) == {"project:alpha"}
+        assert alpha.summary()["tasks"] == 1 and beta.summary()["tasks"] == 0
+
+        await registry.stop()
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_opens_share_one_project_and_limits_hold():
+    async def scenario():
+        registry = ProjectRegistry(projects.default, None, max_projects=1)
+        first, second = await asyncio.gather(registry.open("gamma"), registry.open("gamma"))
+        assert first is second and len(registry) == 2
+        assert registry.get() is projects.default and await registry.open(None) is projects.default
+        with pytest.raises(ProjectLimitError):
+            await registry.open("delta")
+        for bad in ("../etc", "-x", "a" * 65, "a/b"):
+            with pytest.raises(ProjectError):
+                await registry.open(bad)
+        await registry.stop()
+        assert registry.get("gamma") is None
+
+    asyncio.run(scenario())
+
+
+def test_projects_are_recovered_from_their_own_journal(tmp_path, server):
+    async def scenario():
+        registry = ProjectRegistry(projects.default, str(tmp_path))
+        alpha = await registry.open("alpha")
+        await registry.open("beta")
+        alpha.board.auto_trigger_enabled = False
+        await alpha.board.add_task(Task(id="t1", description="Build", role="Coder"))
+        await alpha.board.update_task_status("t1", TaskStatus.DONE, result="built")
+        await registry.stop()
+
+        recovered = ProjectRegistry(projects.default, str(tmp_path))
+        await recovered.start()
+        assert sorted(project.id for project in recovered) == ["alpha", "beta", projects.default.id]
+        assert recovered.get("alpha").board.get_task("t1").result == "built"
+        assert recovered.get("beta").board.get_task("t1") is None
+        await recovered.stop()
+
+    asyncio.run(scenario())
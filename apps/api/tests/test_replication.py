@@ -0,0 +1,90 @@
+import asyncio
+
+from apps.api.app.core.broker import Broker
+from apps.api.app.models.task import Task, TaskStatus
+from apps.api.app.services.blackboard import Blackboard
+from apps.api.app.services.persistence import BlackboardPersistence
+from apps.api.app.services.replication import CHANNEL, BlackboardReplication
+
+
+async def settle():
+    await asyncio.sleep(0.05)
+
+
+async def serve(history_max=10000):
+    broker = Broker(history_max)
+    server = await broker.serve("127.0.0.1", 0)
+    return broker, server, f"tcp://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+
+async def worker(url, data_dir=None):
+    board = Blackboard(project="replication-test")
+    persistence = BlackboardPersistence(board, data_dir, commit_interval_ms=1)
+    await persistence.start()
+    replication = BlackboardReplication(board, url)
+    await replication.start()
+    return board, replication, persistence
+
+
+async def stop(replication, persistence):
+    await replication.stop()
+    await persistence.stop()
+
+
+def messages(board, agent="Coder"):
+    return board.log_store.messages(agent)
+
+
+def test_history_is_compacted_per_entity_and_capped_for_logs():
+    async def scenario():
+        broker, server, url = await serve(history_max=3)
+        a, replication, persistence = await worker(url)
+        await a.add_tasks([Task(id="t1", description="Build", role="Coder"), Task(id="t2", description="Test", role="Coder", dependencies=["t1"])])
+        for status in (TaskStatus.IN_PROGRESS, TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.DONE):
+            await a.update_task_status("t1", status, result="built" if status == TaskStatus.DONE else None)
+        for i in range(6):
+            await a.add_log("Coder", f"step {i}")
+        await settle()
+
+        assert list(broker._state[CHANNEL]) == ["task:t1", "task:t2"]
+        assert len(broker._history[CHANNEL]) == 3
+
+        late, late_replication, late_persistence = await worker(url)
+        assert late.get_task("t1").status == TaskStatus.DONE and late.get_task("t1").result == "built"
+        assert late.scheduler.is_ready("t2") and "t2" in late.ready_queue
+        assert messages(late) == ["step 3", "step 4", "step 5"]
+        assert [entry.ts for entry in late.log_store.entries()] == [entry.ts for entry in a.log_store.entries()][-3:]
+
+        await stop(replication, persistence)
+        await stop(late_replication, late_persistence)
+        server.close()
+
+    asyncio.run(scenario())
+
+
+def test_restarted_worker_catches_up_without_duplicating_logs(tmp_path):
+    async def scenario():
+        broker, server, url = await serve()
+        a, a_replication, a_persistence = await worker(url, str(tmp_path))
+        b, b_replication, b_persistence = await worker(url)
+        await a.add_task(Task(id="t1", description="Build", role="Coder"))
+        await a.add_log("Coder", "started")
+        await b.add_log("Coder", "from b")
+        await settle()
+        await stop(a_replication, a_persistence)
+
+        # While A is down
+        await b.update_task_status("t1", TaskStatus.DONE, result="built")
+        await b.add_log("Coder", "finished")
+        await settle()
+
+        a, a_replication, a_persistence = await worker(url, str(tmp_path))
+        assert a.get_task("t1").status == TaskStatus.DONE and a.get_task("t1").result == "built"
+        # Each worker orders logs as it received them; none is restored twice
+        assert sorted(messages(a)) == sorted(messages(b)) == ["finished", "from b", "started"]
+
+        await stop(a_replication, a_persistence)
+        await stop(b_replication, b_persistence)
+        server.close()
+
+    asyncio.run(scenario())
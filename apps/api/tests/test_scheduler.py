@@ -0,0 +1,91 @@
+import pytest
+
+from apps.api.app.services.scheduler import DependencyCycleError, MissingDependencyError, Scheduler
+
+
+def drain(scheduler):
+    ready = []
+    while not scheduler.ready.empty():
+        ready.append(scheduler.ready.get_nowait())
+    return ready
+
+
+def test_batch_in_any_order_is_inserted_dependencies_first():
+    scheduler = Scheduler()
+    order = scheduler.add_batch({"c": ["b"], "a": [], "b": ["a"], "d": ["a", "c"]})
+    assert order.index("a") < order.index("b") < order.index("c") < order.index("d")
+    assert drain(scheduler) == ["a"]
+
+
+def test_batch_already_in_order_is_kept_as_listed():
+    scheduler = Scheduler()
+    scheduler.add("root", [])
+    batch = {"x": ["root"], "y": ["x"], "z": ["x", "y"]}
+    assert scheduler.order(batch) == ["x", "y", "z"]
+
+
+def test_cycle_in_a_batch_is_rejected_without_registering_anything():
+    scheduler = Scheduler()
+    with pytest.raises(DependencyCycleError, match="cycle"):
+        scheduler.add_batch({"a": ["c"], "b": ["a"], "c": ["b"], "free": []})
+    assert "free" not in scheduler and "a" not in scheduler
+    assert drain(scheduler) == []
+
+
+def test_self_dependency_and_re_registration_are_cycles():
+    scheduler = Scheduler()
+    with pytest.raises(DependencyCycleError, match="itself"):
+        scheduler.order({"a": ["a"]})
+    scheduler.add("a", [])
+    with pytest.raises(DependencyCycleError, match="already registered"):
+        scheduler.add_batch({"b": [], "a": ["b"]})
+    with pytest.raises(DependencyCycleError, match="already registered"):
+        scheduler.add("a", [])
+
+
+def test_unknown_dependency_is_rejected():
+    scheduler = Scheduler()
+    with pytest.raises(MissingDependencyError):
+        scheduler.add_batch({"a": ["ghost"]})
+    with pytest.raises(MissingDependencyError):
+        scheduler.add("a", ["ghost"])
+
+
+def test_mark_done_unblocks_dependents_once_all_dependencies_are_done():
+    scheduler = Scheduler()
+    scheduler.add_batch({"a": [], "b": [], "c": ["a", "b"]})
+    assert drain(scheduler) == ["a", "b"]
+    assert scheduler.mark_done("a") == []
+    assert not scheduler.is_ready("c")
+    assert scheduler.mark_done("b") == ["c"]
+    assert scheduler.mark_done("b") == []
+    assert drain(scheduler) == ["c"]
+
+
+def test_tasks_registered_done_do_not_block_dependents():
+    scheduler = Scheduler()
+    scheduler.add("old", [], done=True)
+    scheduler.add("new", ["old"])
+    assert drain(scheduler) == ["new"]
+
+
+def test_finished_tasks_are_dropped_but_stay_valid_dependencies():
+    scheduler = Scheduler()
+    scheduler.add_batch({"a": [], "b": ["a"]})
+    scheduler.mark_done("a")
+    scheduler.mark_done("b")
+    assert scheduler._indegree == {} and scheduler._dependents == {}
+    assert "a" in scheduler and not scheduler.is_ready("a")
+    scheduler.add("c", ["a", "b"])
+    with pytest.raises(DependencyCycleError, match="already registered"):
+        scheduler.add("b", [])
+    assert drain(scheduler) == ["a", "b", "c"]
+
+
+def test_tasks_past_pending_stay_off_the_ready_queue():
+    scheduler = Scheduler()
+    scheduler.add("claimed", [], queued=False)
+    assert scheduler.is_ready("claimed")
+    assert drain(scheduler) == []
+    scheduler.requeue("claimed")
+    assert drain(scheduler) == ["claimed"]
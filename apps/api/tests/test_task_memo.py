@@ -0,0 +1,91 @@
+import asyncio
+
+from apps.api.app.models.task import Task, TaskStatus
+from apps.api.app.services.blackboard import Blackboard
+from apps.api.app.services.task_memo import TaskMemo, parse_policies
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def run_task(board, task_id, result):
+    task = await board.claim_task(task_id, "agent")
+    assert task is not None
+    await board.update_task_status(task_id, TaskStatus.DONE, result=result)
+    await settle()
+
+
+async def memo_board(spec="Reviewer:60"):
+    board = Blackboard(project="memo-test")
+    memo = TaskMemo(board, parse_policies(spec))
+    memo.start()
+    return board, memo
+
+
+def test_identical_task_reuses_the_result_until_invalidated():
+    async def scenario():
+        board, memo = await memo_board()
+        await board.add_task(Task(id="r1", description="Verify  the results", role="Reviewer"))
+        await run_task(board, "r1", "all good")
+
+        await board.add_task(Task(id="r2", description="verify the results", role="Reviewer"))
+        await settle()
+        assert board.get_task("r2").status == TaskStatus.DONE
+        assert board.get_task("r2").result == "all good"
+
+        assert memo.invalidate(task_id="r2") == 1
+        assert memo.invalidate(task_id="r2") == 0
+        await board.add_task(Task(id="r3", description="Verify the results", role="Reviewer"))
+        await settle()
+        assert board.get_task("r3").status == TaskStatus.PENDING
+        assert memo.counts["Reviewer"] == {"hit": 1, "miss": 2, "collapsed": 0}
+        await memo.stop()
+
+    asyncio.run(scenario())
+
+
+def test_invalidate_by_fingerprint_role_or_everything():
+    async def scenario():
+        board, memo = await memo_board("Reviewer:60,Tester:60")
+        for task_id, role, description in [("a", "Reviewer", "one"), ("b", "Reviewer", "two"), ("c", "Tester", "three")]:
+            await board.add_task(Task(id=task_id, description=description, role=role))
+            await run_task(board, task_id, f"result {task_id}")
+        assert memo.sizes() == {"Reviewer": 2, "Tester": 1}
+
+        fingerprint = memo.fingerprint(board.get_task("a"))
+        assert memo.invalidate(fingerprint=fingerprint) == 1
+        assert memo.invalidate(fingerprint=fingerprint) == 0
+        assert memo.invalidate(role="Reviewer") == 1
+        assert memo.sizes() == {"Reviewer": 0, "Tester": 1}
+        assert memo.invalidate() == 1
+        assert memo.stats()["roles"]["Tester"]["entries"] == 0
+        await memo.stop()
+
+    asyncio.run(scenario())
+
+
+def test_different_dependency_results_are_different_tasks():
+    async def scenario():
+        board, memo = await memo_board()
+        await board.add_tasks([
+            Task(id="c1", description="Build", role="Coder"),
+            Task(id="r1", description="Review", role="Reviewer", dependencies=["c1"]),
+            Task(id="c2", description="Build", role="Coder"),
+            Task(id="r2", description="Review", role="Reviewer", dependencies=["c2"]),
+        ])
+        await run_task(board, "c1", "build A")
+        await run_task(board, "r1", "approved A")
+        await run_task(board, "c2", "build B")
+        assert board.get_task("r2").status == TaskStatus.PENDING
+        assert memo.fingerprint(board.get_task("r1")) != memo.fingerprint(board.get_task("r2"))
+        await memo.stop()
+
+    asyncio.run(scenario())
+
+
+def test_policies_parse_ttl_size_and_eviction():
+    policies = parse_policies("Reviewer, Tester:30:5:lfu", max_entries=9)
+    assert policies["Reviewer"] == (3600, 9, "lru")
+    assert policies["Tester"] == (30, 5, "lfu")
@@ -8,8 +8,9 @@ import { Button } from "@/components/ui/button"
 import { Badge } from "@/components/ui/badge"
 import { ScrollArea } from "@/components/ui/scroll-area"
 import { Terminal, Shield, Cpu, Activity } from "lucide-react"
+import { currentProject } from "@/lib/utils"
 
-const socket = io("http://localhost:8000")
+const socket = io("http://localhost:8000", { auth: { project: currentProject() } })
 
 interface Log {
   agent: string
@@ -34,31 +35,37 @@ export default function AgentPage() {
 
     socket.emit("join_agent_room", { agent_id: agentId })
 
-    socket.on("agent_log", (log: any) => {
-      if (log.agent === role || log.agent === "System") {
-        setLogs(prev => [...prev, { ...log, timestamp: Date.now() }])
-      }
-    })
+    const handlers: Record<string, (data: any) => void> = {
+      agent_log: (log: any) => {
+        if (log.agent === role || log.agent === "System") {
+          setLogs(prev => [...prev, { ...log, timestamp: Date.now() }])
+        }
+      },
+      agent_updated: (agent: any) => {
+        if (agent.id === agentId && agent.status) {
+          setStatus(agent.status)
+        }
+      },
+      task_assigned: (data: any) => {
+        setCurrentTask(data.task)
+        setLogs(prev => [...prev, { 
+          agent: "System", 
+          message: `MISSION RECEIVED: ${data.task.description}`, 
+          timestamp: Date.now() 
+        }])
+      },
+    }
 
-    socket.on("agent_updated", (agent: any) => {
-      if (agent.id === agentId) {
-        setStatus(agent.status)
-      }
-    })
+    Object.entries(handlers).forEach(([event, handler]) => socket.on(event, handler))
 
-    socket.on("task_assigned", (data: any) => {
-      setCurrentTask(data.task)
-      setLogs(prev => [...prev, { 
-        agent: "System", 
-        message: `MISSION RECEIVED: ${data.task.description}`, 
-        timestamp: Date.now() 
-      }])
+    // The API coalesces events into one frame per tick: [[event, data], ...]
+    socket.on("batch", (frame: [string, any][]) => {
+      frame.forEach(([event, data]) => handlers[event]?.(data))
     })
 
     return () => {
-      socket.off("agent_log")
-      socket.off("agent_updated")
-      socket.off("task_assigned")
+      Object.keys(handlers).forEach(event => socket.off(event))
+      socket.off("batch")
     }
   }, [agentId, role, currentTask]) // Added currentTask to dependencies
 
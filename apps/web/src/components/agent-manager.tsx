@@ -5,6 +5,7 @@ import { Button } from "@/components/ui/button"
 import { Plus, Users, ExternalLink } from "lucide-react"
 import { Card, CardHeader, CardTitle, CardContent, CardDescription } from "@/components/ui/card"
 import { Badge } from "@/components/ui/badge"
+import { currentProject } from "@/lib/utils"
 
 interface Agent {
   id: string
@@ -15,6 +16,8 @@ interface Agent {
 
 export function AgentManager({ agents }: { agents: Agent[] }) {
   const [loading, setLoading] = useState(false)
+  const project = currentProject()
+  const projectParam = project ? `&project=${encodeURIComponent(project)}` : ""
 
   const handleCreateAgent = async () => {
     const roles = ["Architect", "Coder", "Reviewer"]
@@ -26,12 +29,12 @@ export function AgentManager({ agents }: { agents: Agent[] }) {
       const response = await fetch("http://localhost:8000/api/v1/agents/create", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ role })
+        body: JSON.stringify({ role, project })
       })
       
       if (response.ok) {
         const agent = await response.json()
-        const win = window.open(`/agent?agent_id=${agent.id}&role=${agent.role}`, "_blank", "width=600,height=800")
+        const win = window.open(`/agent?agent_id=${agent.id}&role=${agent.role}${projectParam}`, "_blank", "width=600,height=800")
         if (!win || win.closed || typeof win.closed === 'undefined') {
           alert("Popup blocked! Please allow popups for this site to open the Agent Node window.")
         }
@@ -64,7 +67,7 @@ export function AgentManager({ agents }: { agents: Agent[] }) {
               <div 
                 key={agent.id}
                 className="flex items-center gap-3 bg-slate-950/50 p-2 px-3 rounded-lg border border-slate-800 hover:border-purple-500/50 transition-colors cursor-pointer group"
-                onClick={() => window.open(`/agent?agent_id=${agent.id}&role=${agent.role}`, "_blank")}
+                onClick={() => window.open(`/agent?agent_id=${agent.id}&role=${agent.role}${projectParam}`, "_blank")}
               >
                 <div className="flex flex-col">
                   <span className="text-xs font-bold uppercase tracking-tighter text-slate-400">{agent.role}</span>
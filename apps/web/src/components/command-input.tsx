@@ -4,6 +4,7 @@ import { useState } from "react"
 import { Input } from "@/components/ui/input"
 import { Button } from "@/components/ui/button"
 import { Send, Zap } from "lucide-react"
+import { currentProject } from "@/lib/utils"
 
 export function CommandInput() {
   const [prompt, setPrompt] = useState("")
@@ -17,7 +18,7 @@ export function CommandInput() {
       const response = await fetch("http://localhost:8000/api/v1/plan", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ prompt })
+        body: JSON.stringify({ prompt, project: currentProject() })
       })
       if (response.ok) {
         setPrompt("")
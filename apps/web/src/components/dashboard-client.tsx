@@ -12,8 +12,9 @@ import { CommandInput } from "./command-input"
 import { Switch } from "@/components/ui/switch"
 import { Label } from "@/components/ui/label"
 import { AgentManager } from "./agent-manager"
+import { currentProject } from "@/lib/utils"
 
-const socket = io("http://localhost:8000")
+const socket = io("http://localhost:8000", { auth: { project: currentProject() } })
 
 type TaskStatus = "pending" | "in_progress" | "done" | "error"
 
@@ -24,6 +25,11 @@ interface Task {
   status: TaskStatus
   dependencies: string[]
   result?: string
+  result_digest?: string
+  result_size?: number
+  mission_id?: string
+  priority?: "low" | "normal" | "high"
+  deadline?: number
 }
 
 interface Log {
@@ -39,6 +45,25 @@ interface Agent {
   window_id: string
 }
 
+// Reply to the `sync` event: a full snapshot (reset) or what changed since our last seq
+interface SyncReply {
+  reset: boolean
+  epoch: string
+  seq: number
+  tasks: Task[]
+  agents: Agent[]
+  log_seq: number
+  logs: { seq: number, ts: number, agent: string, message: string }[]
+  auto_trigger_enabled?: boolean
+}
+
+const mergeById = <T extends { id: string }>(prev: T[], changed: T[]): T[] => {
+  const byId = new Map(changed.map(item => [item.id, item]))
+  const merged = prev.map(item => byId.has(item.id) ? { ...item, ...byId.get(item.id) } : item)
+  const known = new Set(prev.map(item => item.id))
+  return [...merged, ...changed.filter(item => !known.has(item.id))]
+}
+
 export default function DashboardClient() {
   const [tasks, setTasks] = useState<Task[]>([])
   const [agents, setAgents] = useState<Agent[]>([])
@@ -46,45 +71,76 @@ export default function DashboardClient() {
   const [isConnected, setIsConnected] = useState(false)
   const [autoTrigger, setAutoTrigger] = useState(false)
   const scrollRef = useRef<HTMLDivElement>(null)
+  const syncedRef = useRef<{ epoch?: string, seq?: number, log_seq?: number }>({})
 
   useEffect(() => {
-    socket.on("connect", () => setIsConnected(true))
-    socket.on("disconnect", () => setIsConnected(false))
-    
-    socket.on("task_added", (task: Task) => setTasks(prev => {
-      if (prev.find(t => t.id === task.id)) return prev
-      return [...prev, task]
-    }))
-    
-    socket.on("task_updated", (updatedTask: Task) => {
-      setTasks(prev => prev.map(t => t.id === updatedTask.id ? updatedTask : t))
+    // On every (re)connect, catch up on what we missed instead of reloading
+    socket.on("connect", () => {
+      setIsConnected(true)
+      socket.emit("sync", syncedRef.current, (reply: SyncReply) => {
+        syncedRef.current = { epoch: reply.epoch, seq: reply.seq, log_seq: reply.log_seq }
+        const logs = reply.logs.map(l => ({ agent: l.agent, message: l.message, timestamp: l.ts * 1000 }))
+        if (reply.reset) {
+          setTasks(reply.tasks)
+          setAgents(reply.agents)
+          setLogs(logs)
+        } else {
+          setTasks(prev => mergeById(prev, reply.tasks))
+          setAgents(prev => mergeById(prev, reply.agents))
+          setLogs(prev => [...prev, ...logs])
+        }
+        if (reply.auto_trigger_enabled !== undefined) setAutoTrigger(reply.auto_trigger_enabled)
+      })
     })
+    socket.on("disconnect", () => setIsConnected(false))
     
-    socket.on("agent_log", (log: Omit<Log, "timestamp">) => {
-       setLogs(prev => [...prev, { ...log, timestamp: Date.now() }])
-    })
-
-    socket.on("config_updated", (data: { auto_trigger_enabled: boolean }) => {
-      setAutoTrigger(data.auto_trigger_enabled)
-    })
+    // Task/agent updates may be partial diffs, so merge them into the known entity
+    const handlers: Record<string, (data: any) => void> = {
+      task_added: (task: Task) => setTasks(prev => {
+        if (prev.find(t => t.id === task.id)) return prev
+        return [...prev, task]
+      }),
+      task_updated: (updatedTask: Partial<Task> & { id: string }) => {
+        setTasks(prev => prev.map(t => t.id === updatedTask.id ? { ...t, ...updatedTask } : t))
+      },
+      // Batch submissions arrive as one event carrying every task
+      tasks_added: (added: Task[]) => setTasks(prev => {
+        const known = new Set(prev.map(t => t.id))
+        return [...prev, ...added.filter(t => !known.has(t.id))]
+      }),
+      tasks_updated: (updated: Task[]) => {
+        const byId = new Map(updated.map(t => [t.id, t]))
+        setTasks(prev => prev.map(t => byId.has(t.id) ? { ...t, ...byId.get(t.id) } : t))
+      },
+      agent_log: (log: Omit<Log, "timestamp"> & { seq: number }) => {
+        // Skip entries a sync reply already delivered
+        if (log.seq <= (syncedRef.current.log_seq ?? 0)) return
+        syncedRef.current.log_seq = log.seq
+        setLogs(prev => [...prev, { agent: log.agent, message: log.message, timestamp: Date.now() }])
+      },
+      config_updated: (data: { auto_trigger_enabled: boolean }) => {
+        setAutoTrigger(data.auto_trigger_enabled)
+      },
+      agent_added: (agent: Agent) => {
+        setAgents(prev => [...prev, agent])
+      },
+      agent_updated: (updatedAgent: Partial<Agent> & { id: string }) => {
+        setAgents(prev => prev.map(a => a.id === updatedAgent.id ? { ...a, ...updatedAgent } : a))
+      },
+    }
 
-    socket.on("agent_added", (agent: Agent) => {
-      setAgents(prev => [...prev, agent])
-    })
+    Object.entries(handlers).forEach(([event, handler]) => socket.on(event, handler))
 
-    socket.on("agent_updated", (updatedAgent: Agent) => {
-      setAgents(prev => prev.map(a => a.id === updatedAgent.id ? updatedAgent : a))
+    // The API coalesces events into one frame per tick: [[event, data], ...]
+    socket.on("batch", (frame: [string, any][]) => {
+      frame.forEach(([event, data]) => handlers[event]?.(data))
     })
 
     return () => {
       socket.off("connect")
       socket.off("disconnect")
-      socket.off("task_added")
-      socket.off("task_updated")
-      socket.off("agent_log")
-      socket.off("config_updated")
-      socket.off("agent_added")
-      socket.off("agent_updated")
+      Object.keys(handlers).forEach(event => socket.off(event))
+      socket.off("batch")
     }
   }, [])
 
@@ -189,6 +245,16 @@ export default function DashboardClient() {
                                     {task.result && (
                                          <div className="mt-2 text-sm bg-background/50 p-2 rounded border border-border/50">
                                             {task.result}
+                                            {task.result_digest && (
+                                                <a
+                                                    href={`http://localhost:8000/api/v1/artifacts/${task.result_digest}`}
+                                                    target="_blank"
+                                                    rel="noreferrer"
+                                                    className="mt-1 block text-xs underline opacity-70"
+                                                >
+                                                    Full result ({Math.ceil((task.result_size ?? 0) / 1024)} KB)
+                                                </a>
+                                            )}
                                          </div>
                                     )}
                                 </CardContent>
@@ -4,3 +4,9 @@ import { twMerge } from "tailwind-merge"
 export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs))
 }
+
+// The project this window follows: ?project=<id> in its URL, the default project when absent
+export function currentProject(): string | undefined {
+  if (typeof window === "undefined") return undefined
+  return new URLSearchParams(window.location.search).get("project") ?? undefined
+}